@@ -0,0 +1,224 @@
+# blender/charts.py
+""" data-driven bar chart / diagram builder. Template meshes are built once with bmesh and shared by every
+bar, box and arrow (bpy.data.objects.new + object-linked materials), so there is no bpy.ops call, undo push
+or depsgraph update per element. Scales to hundreds of bars / nodes. """
+
+import os
+import sys
+
+import bmesh
+import bpy
+from mathutils import Vector
+
+# shared helpers live in mvp/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+from keyframes import write_keyframes
+
+_templates = {}
+
+
+# =============================
+# Templates + object helpers
+# =============================
+def template_mesh(kind, bevel=0.0, segments=4):
+    """ shared unit meshes, origin at the base so scaling z grows them upward / along their axis:
+    "box" 1x1x1, "shaft" radius-1 cylinder of length 1 along +Z, "cone" radius-1 cone of length 1, "plane" 1x1;
+    and "cube", Blender's size-2 primitive cube centered on its origin, for objects that keep its geometry """
+    key = (kind, bevel, segments)
+    if key in _templates:
+        return _templates[key]
+
+    bm = bmesh.new()
+    if kind == "box":
+        bmesh.ops.create_cube(bm, size=1.0)
+    elif kind == "cube":
+        bmesh.ops.create_cube(bm, size=2.0)
+    elif kind == "shaft":
+        bmesh.ops.create_cone(bm, cap_ends=True, segments=12, radius1=1.0, radius2=1.0, depth=1.0)
+    elif kind == "cone":
+        bmesh.ops.create_cone(bm, cap_ends=True, segments=8, radius1=1.0, radius2=0.0, depth=1.0)
+    elif kind == "plane":
+        bmesh.ops.create_grid(bm, x_segments=1, y_segments=1, size=0.5)
+    else:
+        raise Exception(f"Unknown template: {kind}")
+
+    if kind not in ("plane", "cube"):
+        bmesh.ops.translate(bm, vec=(0, 0, 0.5), verts=bm.verts)
+
+    # baked once here instead of a Bevel modifier evaluated on every object. `bevel` keeps the modifier's
+    # meaning, a width on Blender's size-2 primitive cube, so it is halved on the unit templates. like the
+    # modifier (which worked in local space too), it is stretched with each object's scale
+    if bevel:
+        offset = bevel if kind == "cube" else bevel / 2
+        bmesh.ops.bevel(bm, geom=bm.edges[:], offset=offset, segments=segments,
+                        affect='EDGES', profile=0.5)
+
+    mesh = bpy.data.meshes.new(f"TPL_{kind}")
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.materials.append(None)  # one slot; objects fill it with their own material
+
+    _templates[key] = mesh
+    return mesh
+
+
+def new_collection(name):
+    coll = bpy.data.collections.new(name)
+    bpy.context.scene.collection.children.link(coll)
+    return coll
+
+
+def new_object(name, mesh, material, location, scale=(1, 1, 1), collection=None):
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+    obj.scale = scale
+    if material is not None:
+        slot = obj.material_slots[0]
+        slot.link = 'OBJECT'  # per-object material on the shared mesh
+        slot.material = material
+    (collection or bpy.context.scene.collection).objects.link(obj)
+    return obj
+
+
+def new_label(text, location, size, material=None, rotation=(0, 0, 0), collection=None):
+    curve = bpy.data.curves.new(f"Label_{text}", type='FONT')
+    curve.body = text
+    curve.size = size
+    if material is not None:
+        curve.materials.append(material)
+
+    obj = bpy.data.objects.new(f"Label_{text}", curve)
+    obj.location = location
+    obj.rotation_euler = rotation
+    (collection or bpy.context.scene.collection).objects.link(obj)
+    return obj
+
+
+def reveal_at(obj, frame):
+    """ hidden in renders until `frame` """
+    write_keyframes(obj, "hide_render", [1, frame], [1, 0], interpolation='CONSTANT')
+
+
+def grow(obj, final, frames):
+    """ animate the z scale from 0 to `final` over two frames, or 0 -> 5% overshoot -> final over three;
+    x / y stay as set """
+    sx, sy = obj.scale.x, obj.scale.y
+    values = [(sx, sy, 0), (sx, sy, final * 1.05), (sx, sy, final)]
+    if len(frames) == 2:
+        values = [values[0], values[2]]
+    write_keyframes(obj, "scale", frames, values)
+
+
+def floor(material, size=50, location=(0, 0, 0), collection=None):
+    return new_object("Floor", template_mesh("plane"), material, location, (size, size, 1), collection)
+
+
+# =============================
+# Bar chart
+# =============================
+def bar_chart(series, bar_material, text_material=None, base_material=None,
+              spacing=1.6, max_height=3.5, bar_width=0.9, base_height=0.2, base_depth=3.0,
+              label_offset=(-1.1, 0.02), label_size=0.32, value_size=0.3, label_rotation=(1.57, 0, 0),
+              start_frame=25, stagger=10, base_frames=(1, 20), reveal_values_at=None,
+              bevel=0.0, bevel_segments=5, margin=1.0, value_offset=0.6, collection=None):
+    """ one growing bar + category label + value label per (label, value) in `series`.
+    returns {"bars", "labels", "values", "base", "width"}; width is the bars' span plus `margin`.
+    bars and base keep the geometry of the scripts' primitive cubes (size 2, origin at the center, bevel as the
+    old modifier's width): the base is centered under the chart at z = base_height and grows from its middle,
+    each bar rises from z = base_height, its center moving up with its z scale """
+    coll = collection or new_collection("Chart")
+    max_val = max(v for _, v in series) or 1
+    height_scale = max_height / max_val
+    width = (len(series) - 1) * spacing + margin
+
+    out = {"bars": [], "labels": [], "values": [], "base": None, "width": width}
+
+    cube = template_mesh("cube", bevel, bevel_segments)
+
+    if base_material is not None:
+        base = new_object("ChartBase", cube, base_material,
+                          (width / 2, 0, base_height), (width / 2, base_depth / 2, 0), coll)
+        grow(base, base_height, base_frames)
+        out["base"] = base
+
+    for i, (label, value) in enumerate(series):
+        h = value * height_scale
+        x = i * spacing
+
+        bar = new_object(f"Bar_{i}", cube, bar_material, (x, 0, base_height), (bar_width / 2, bar_width / 2, 0), coll)
+        start = start_frame + i * stagger
+        frames = [start, start + 8, start + 14]
+        grow(bar, h, frames)
+        # flat -> 5% overshoot -> settle, as grow() keys the scale
+        write_keyframes(bar, "location", frames, [
+            (x, 0, base_height), (x, 0, base_height + h * 1.05 / 2), (x, 0, base_height + h / 2)
+        ])
+        out["bars"].append(bar)
+
+        out["labels"].append(new_label(
+            label, (x, label_offset[0], base_height + label_offset[1]), label_size,
+            text_material, label_rotation, coll
+        ))
+
+        val = new_label(str(value), (x, 0, h + value_offset), value_size, text_material, collection=coll)
+        if reveal_values_at is not None:
+            reveal_at(val, reveal_values_at)
+        out["values"].append(val)
+
+    return out
+
+
+# =============================
+# Diagram (nodes + edges)
+# =============================
+def diagram(nodes, edges, node_material, edge_material, text_material=None,
+            node_size=(1.4, 1.4, 1.0), label_height=0.75, label_size=0.25,
+            edge_radius=0.05, edge_shape="cone",
+            start_frame=20, stagger=10, edge_start_frame=40, edge_stagger=10, reveal_labels_at=None,
+            bevel=0.0, collection=None):
+    """ nodes: [(name, (x, y, z)) or (name, (x, y, z), material)], edges: [(from, to)] by index or name.
+    boxes pop up one after another, then each edge grows from its source toward its target.
+    pass start_frame / edge_start_frame = None for a static diagram. returns {"nodes", "labels", "edges"} """
+    coll = collection or new_collection("Diagram")
+    box = template_mesh("box", bevel)
+    edge_mesh = template_mesh(edge_shape)
+    sx, sy, sz = node_size
+
+    out = {"nodes": [], "labels": [], "edges": []}
+    index = {}
+
+    for i, node in enumerate(nodes):
+        name, loc = node[0], node[1]
+        material = node[2] if len(node) > 2 else node_material
+
+        obj = new_object(name, box, material, loc, (sx, sy, sz if start_frame is None else 0), coll)
+        if start_frame is not None:
+            start = start_frame + i * stagger
+            grow(obj, sz, [start, start + 8, start + 14])
+        out["nodes"].append(obj)
+        index[name] = i
+
+        label = new_label(name, (loc[0], loc[1], loc[2] + sz + label_height), label_size,
+                          text_material, collection=coll)
+        if reveal_labels_at is not None:
+            reveal_at(label, reveal_labels_at)
+        out["labels"].append(label)
+
+    for idx, (a, b) in enumerate(edges):
+        a = index[a] if isinstance(a, str) else a
+        b = index[b] if isinstance(b, str) else b
+
+        # connect box centers
+        start = Vector(nodes[a][1]) + Vector((0, 0, sz / 2))
+        end = Vector(nodes[b][1]) + Vector((0, 0, sz / 2))
+        direction = end - start
+
+        arrow = new_object(f"Edge_{idx}", edge_mesh, edge_material, start,
+                           (edge_radius, edge_radius, direction.length if edge_start_frame is None else 0), coll)
+        arrow.rotation_euler = direction.to_track_quat('Z', 'Y').to_euler()
+        if edge_start_frame is not None:
+            f = edge_start_frame + idx * edge_stagger
+            grow(arrow, direction.length, [f, f + 10])
+        out["edges"].append(arrow)
+
+    return out
@@ -1,6 +1,12 @@
 # blender/step2_animation.py
 
 import bpy
+import os
+import sys
+
+# shared helpers live in mvp/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+from frame_range import render_animation
 from mathutils import Vector
 
 # Reset scene
@@ -41,4 +47,4 @@ scene.render.image_settings.file_format = 'FFMPEG'
 scene.render.ffmpeg.format = 'MPEG4'
 
 # Render
-bpy.ops.render.render(animation=True)
+render_animation(scene)
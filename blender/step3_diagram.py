@@ -1,93 +1,56 @@
 import bpy
 import math
+import os
+import sys
+
+# shared helpers live in mvp/ and next to this script (blender -P doesn't add the script dir)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from keyframes import write_keyframes
+from frame_range import render_animation
+from charts import diagram
 
 # 0. Reset scene
 bpy.ops.wm.read_factory_settings(use_empty=True)
 
-# 1. Helper functions
-def create_box(name, location, color):
-    bpy.ops.mesh.primitive_cube_add(size=1.5, location=location)
-    obj = bpy.context.object
-    obj.name = name
-
-    # Assign material
-    mat = bpy.data.materials.new(name=f"{name}_mat")
+# 1. Materials
+def create_material(name, color):
+    mat = bpy.data.materials.new(name=name)
     mat.diffuse_color = (*color, 1)
-    obj.data.materials.append(mat)
-    return obj
-
-def add_text(text, location):
-    bpy.ops.object.text_add(location=location)
-    txt = bpy.context.object
-    txt.data.body = text
-    txt.data.size = 0.5
-    return txt
-
-def create_arrow(start, end):
-    # Create cylinder (shaft)
-    import mathutils
-    direction = mathutils.Vector(end) - mathutils.Vector(start)
-    length = direction.length
-    midpoint = mathutils.Vector(start) + direction/2
-
-    bpy.ops.mesh.primitive_cylinder_add(
-        radius=0.1, depth=length, location=midpoint
-    )
-    arrow = bpy.context.object
-
-    # Rotate to align with direction
-    arrow_vector = mathutils.Vector((0, 0, 1))
-    rot_quat = arrow_vector.rotation_difference(direction)
-    arrow.rotation_mode = 'QUATERNION'
-    arrow.rotation_quaternion = rot_quat
-
-    # Add material
-    mat = bpy.data.materials.new(name="Arrow_mat")
-    mat.diffuse_color = (1, 1, 0, 1)  # Yellow
-    arrow.data.materials.append(mat)
-
-    return arrow
-
-# 2. Create boxes
+    return mat
+
+arrow_mat = create_material("Arrow_mat", (1, 1, 0))  # Yellow
+
+# 2. Create boxes + arrows (connections)
 boxes = [
     ("API", (-3, 0, 0), (0.2, 0.6, 1.0)),     # Blue
     ("Worker", (0, 0, 0), (0.8, 0.4, 0.2)),    # Orange
     ("DB", (3, 0, 0), (0.4, 1.0, 0.4)),        # Green
 ]
 
-objs = []
-for name, loc, color in boxes:
-    obj = create_box(name, loc, color)
-    add_text(name, (loc[0], loc[1], 1.5))
-    objs.append(obj)
+nodes = [(name, loc, create_material(f"{name}_mat", color)) for name, loc, color in boxes]
+connections = [("API", "Worker"), ("Worker", "DB")]
+
+out = diagram(
+    nodes, connections, None, arrow_mat,
+    node_size=(1.5, 1.5, 1.5), label_height=0, label_size=0.5,
+    edge_radius=0.1, edge_shape="shaft",
+    start_frame=None, edge_start_frame=None,
+)
+objs = out["nodes"]
+arrow_objs = out["edges"]
 
 # 3. Animate boxes (pop + small rotation)
 for i, obj in enumerate(objs):
     start_frame = 1 + i * 20
     end_frame = 20 + i * 20
-    
-    # Scale animation
-    obj.scale = (0, 0, 0)
-    obj.keyframe_insert(data_path="scale", frame=start_frame)
-    obj.scale = (1.1, 1.1, 1.1)
-    obj.keyframe_insert(data_path="scale", frame=start_frame + 5)
-    obj.scale = (1, 1, 1)
-    obj.keyframe_insert(data_path="scale", frame=end_frame)
-    
-    # Small rotation
-    obj.rotation_euler = (0, 0, 0)
-    obj.keyframe_insert(data_path="rotation_euler", frame=start_frame)
-    obj.rotation_euler = (0, 0, math.radians(10))
-    obj.keyframe_insert(data_path="rotation_euler", frame=end_frame)
-
-# 4. Create arrows (connections)
-connections = [(objs[0], objs[1]), (objs[1], objs[2])]
-arrow_objs = []
-for start, end in connections:
-    arrow = create_arrow(start.location, end.location)
-    arrow_objs.append(arrow)
-
-# 5. Camera setup (fit all objects)
+
+    write_keyframes(obj, "scale", [start_frame, start_frame + 5, end_frame],
+                    [(0, 0, 0), (1.65, 1.65, 1.65), (1.5, 1.5, 1.5)])
+    write_keyframes(obj, "rotation_euler", [start_frame, end_frame],
+                    [(0, 0, 0), (0, 0, math.radians(10))])
+
+# 4. Camera setup (fit all objects)
 # Calculate bounding box center
 min_x = min(obj.location.x for obj in objs)
 max_x = max(obj.location.x for obj in objs)
@@ -105,7 +68,7 @@ constraint.target = objs[1]
 constraint.track_axis = 'TRACK_NEGATIVE_Z'
 constraint.up_axis = 'UP_Y'
 
-# 6. Lighting (3-point)
+# 5. Lighting (3-point)
 # Key light
 bpy.ops.object.light_add(type='AREA', location=(6, -6, 6))
 key = bpy.context.object
@@ -121,7 +84,7 @@ bpy.ops.object.light_add(type='AREA', location=(0, 6, 6))
 back = bpy.context.object
 back.data.energy = 500
 
-# 7. Render settings
+# 6. Render settings
 scene = bpy.context.scene
 scene.render.engine = 'BLENDER_EEVEE'
 scene.eevee.taa_render_samples = 64
@@ -137,5 +100,5 @@ scene.render.filepath = '/tmp/step3_demo_arrows.mp4'
 scene.render.image_settings.file_format = 'FFMPEG'
 scene.render.ffmpeg.format = 'MPEG4'
 
-# 8. Render animation
-bpy.ops.render.render(animation=True)
+# 7. Render animation
+render_animation(scene)
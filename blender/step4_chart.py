@@ -1,5 +1,14 @@
 # blender/step4_chart.py
 import bpy
+import os
+import sys
+
+# shared helpers live in mvp/ and next to this script (blender -P doesn't add the script dir)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from keyframes import write_keyframes
+from frame_range import render_animation
+from charts import bar_chart, floor
 
 # 0. Reset scene
 bpy.ops.wm.read_factory_settings(use_empty=True)
@@ -15,8 +24,6 @@ data = [
     ("Jun", 520),
 ]
 
-max_val = max(v for _, v in data)
-height_scale = 3.5 / max_val
 spacing = 1.6
 num_bars = len(data)
 chart_width = (num_bars - 1) * spacing + 1.0  # add margin for aesthetics
@@ -33,73 +40,15 @@ bar_mat = mat("Bar", (0.25, 0.6, 1.0))
 text_mat = mat("Text", (1, 1, 1))
 
 # 3. Infinite floor
-bpy.ops.mesh.primitive_plane_add(size=50, location=(chart_width/2, 0, 0))
-floor = bpy.context.object
-floor.data.materials.append(floor_mat)
-
-# 4. Chart base / stand
-bpy.ops.mesh.primitive_cube_add(location=(chart_width/2, 0, 0.2))
-base = bpy.context.object
-base.scale = (chart_width/2, 1.5, 0.2)  # full width + slight depth
-base.data.materials.append(base_mat)
-
-# Animate base appearance
-base.scale.z = 0
-base.keyframe_insert("scale", frame=1)
-base.scale.z = 0.2
-base.keyframe_insert("scale", frame=20)
-
-# 5. Bars + labels
-bars = []
-
-for i, (label, value) in enumerate(data):
-    h = value * height_scale
-    x = i * spacing
-
-    # Bar origin at base top
-    bpy.ops.mesh.primitive_cube_add(location=(x, 0, 0.2))
-    bar = bpy.context.object
-    bar.scale = (0.45, 0.45, 0)  # start at 0 height
-    bar.data.materials.append(bar_mat)
-    bars.append((bar, h))
-
-    # Month label (on base)
-    bpy.ops.object.text_add(location=(x, -1.1, 0.22))
-    txt = bpy.context.object
-    txt.data.body = label
-    txt.data.size = 0.32
-    txt.rotation_euler = (1.57, 0, 0)
-    txt.data.materials.append(text_mat)
-
-    # Value label (above bar)
-    bpy.ops.object.text_add(location=(x, 0, h + 0.6))
-    val = bpy.context.object
-    val.data.body = str(value)
-    val.data.size = 0.3
-    val.data.materials.append(text_mat)
-
-# 6. Animate bars (emerge from base)
-for i, (bar, h) in enumerate(bars):
-    start = 25 + i * 10
-    peak = start + 8
-    settle = start + 14
-
-    bar.scale.z = 0
-    bar.location.z = 0.2
-    bar.keyframe_insert("scale", frame=start)
-    bar.keyframe_insert("location", frame=start)
-
-    # Overshoot
-    bar.scale.z = h * 1.05
-    bar.location.z = 0.2 + (h * 1.05)/2
-    bar.keyframe_insert("scale", frame=peak)
-    bar.keyframe_insert("location", frame=peak)
-
-    # Settle
-    bar.scale.z = h
-    bar.location.z = 0.2 + h/2
-    bar.keyframe_insert("scale", frame=settle)
-    bar.keyframe_insert("location", frame=settle)
+floor(floor_mat, size=50, location=(chart_width/2, 0, 0))
+
+# 4-6. Chart base, bars + labels (bars emerge from the base: flat -> overshoot -> settle)
+chart = bar_chart(
+    data, bar_mat, text_mat, base_mat,
+    spacing=spacing, max_height=3.5, base_height=0.2,
+    label_offset=(-1.1, 0.02), label_size=0.32,
+)
+bars = chart["bars"]
 
 # 7. Camera (intentional framing + motion)
 bpy.ops.object.camera_add(location=(-2, -chart_width - 5, 4))
@@ -116,14 +65,12 @@ track.target = target
 track.track_axis = 'TRACK_NEGATIVE_Z'
 track.up_axis = 'UP_Y'
 
-# Side-follow motion while bars appear
-cam.keyframe_insert("location", frame=20)
-cam.location = (chart_width + 2, -chart_width -5, 4)
-cam.keyframe_insert("location", frame=90)
-
-# Hero final shot
-cam.location = (chart_width/2, -chart_width -8, 6)
-cam.keyframe_insert("location", frame=160)
+# Side-follow motion while bars appear, then hero final shot
+write_keyframes(cam, "location", [20, 90, 160], [
+    (-2, -chart_width - 5, 4),
+    (chart_width + 2, -chart_width -5, 4),
+    (chart_width/2, -chart_width -8, 6),
+])
 
 # 8. Lighting
 def add_light(loc, energy):
@@ -152,4 +99,4 @@ scene.render.image_settings.file_format = 'FFMPEG'
 scene.render.ffmpeg.format = 'MPEG4'
 
 # 10. Render
-bpy.ops.render.render(animation=True)
+render_animation(scene)
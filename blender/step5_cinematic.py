@@ -1,7 +1,15 @@
 """ Blender script to create a cinematic 3D bar chart animation"""
 
 import bpy
-from mathutils import Vector
+import os
+import sys
+
+# shared helpers live in mvp/ and next to this script (blender -P doesn't add the script dir)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from keyframes import write_keyframes
+from frame_range import render_animation
+from charts import bar_chart, floor
 
 # =============================
 # 0. Reset scene
@@ -20,8 +28,6 @@ data = [
     ("May", 420),
     ("Jun", 520),
 ]
-max_val = max(v for _, v in data)
-height_scale = 3.5 / max_val
 spacing = 1.8
 num_bars = len(data)
 chart_width = (num_bars - 1) * spacing + 1.2  # add margin
@@ -46,98 +52,19 @@ text_mat  = create_material("Text",  (1,1,1), 0, 0.0)
 # =============================
 # 3. Infinite floor
 # =============================
-bpy.ops.mesh.primitive_plane_add(size=50, location=(chart_width/2,0,0))
-floor = bpy.context.object
-floor.data.materials.append(floor_mat)
+floor(floor_mat, size=50, location=(chart_width/2,0,0))
 
 # =============================
-# 4. Chart base (stand)
+# 4-6. Chart base, bars and labels
 # =============================
-bpy.ops.mesh.primitive_cube_add(location=(chart_width/2,0,0.15))
-base = bpy.context.object
-base.scale = (chart_width/2,1.5,0.15)
-base.data.materials.append(base_mat)
-
-# Bevel modifier for smooth edges
-bevel = base.modifiers.new(name="BevelBase", type='BEVEL')
-bevel.width = 0.05
-bevel.segments = 5
-
-# Animate base appearance
-base.scale.z = 0
-base.keyframe_insert("scale", frame=1)
-base.scale.z = 0.15
-base.keyframe_insert("scale", frame=20)
-for fcu in base.animation_data.action.fcurves:
-    for kp in fcu.keyframe_points:
-        kp.interpolation = 'BEZIER'
-
-# =============================
-# 5. Bars and labels
-# =============================
-bars = []
-
-for i, (label, value) in enumerate(data):
-    h = value * height_scale
-    x = i * spacing
-
-    # Bar origin at base top
-    bpy.ops.mesh.primitive_cube_add(location=(x,0,0.15))
-    bar = bpy.context.object
-    bar.scale = (0.45,0.45,0)
-    bar.data.materials.append(bar_mat)
-
-    # Rounded edges via bevel
-    b_bevel = bar.modifiers.new(name="BevelBar", type='BEVEL')
-    b_bevel.width = 0.05
-    b_bevel.segments = 5
-    bars.append((bar, h))
-
-    # Month text
-    bpy.ops.object.text_add(location=(x,-1.0,0.17))
-    t = bpy.context.object
-    t.data.body = label
-    t.data.size = 0.35
-    t.rotation_euler = (1.57,0,0)
-    t.data.materials.append(text_mat)
-
-    # Value text (floating above, start invisible)
-    bpy.ops.object.text_add(location=(x,0,h+0.6))
-    val = bpy.context.object
-    val.data.body = str(value)
-    val.data.size = 0.3
-    val.data.materials.append(text_mat)
-    val.hide_render = True
-    val.keyframe_insert("hide_render", frame=1)
-    val.hide_render = False
-    val.keyframe_insert("hide_render", frame=40)
-
-# =============================
-# 6. Bars animation (emerge from base)
-# =============================
-for i, (bar, h) in enumerate(bars):
-    start = 25 + i*10
-    peak  = start + 8
-    settle= start + 14
-
-    bar.scale.z = 0
-    bar.location.z = 0.15
-    bar.keyframe_insert("scale", frame=start)
-    bar.keyframe_insert("location", frame=start)
-
-    bar.scale.z = h*1.05
-    bar.location.z = 0.15 + (h*1.05)/2
-    bar.keyframe_insert("scale", frame=peak)
-    bar.keyframe_insert("location", frame=peak)
-
-    bar.scale.z = h
-    bar.location.z = 0.15 + h/2
-    bar.keyframe_insert("scale", frame=settle)
-    bar.keyframe_insert("location", frame=settle)
-
-    for fcu in bar.animation_data.action.fcurves:
-        for kp in fcu.keyframe_points:
-            kp.interpolation = 'BEZIER'
+# bevel is baked into the shared template mesh; value labels stay hidden until frame 40
+chart = bar_chart(
+    data, bar_mat, text_mat, base_mat,
+    spacing=spacing, max_height=3.5, base_height=0.15,
+    label_offset=(-1.0, 0.02), label_size=0.35,
+    reveal_values_at=40, bevel=0.05, margin=1.2,
+)
+bars = chart["bars"]
 
 # =============================
 # 7. Camera (dynamic cinematic)
@@ -155,14 +82,12 @@ track.target = target
 track.track_axis = 'TRACK_NEGATIVE_Z'
 track.up_axis = 'UP_Y'
 
-# Camera side-follow
-cam.keyframe_insert("location", frame=20)
-cam.location = (chart_width+2,-chart_width-5,4)
-cam.keyframe_insert("location", frame=90)
-
-# Final hero pull-back
-cam.location = (chart_width/2,-chart_width-9,6)
-cam.keyframe_insert("location", frame=180)
+# Camera side-follow, then final hero pull-back
+write_keyframes(cam, "location", [20, 90, 180], [
+    (-2,-chart_width-5,4),
+    (chart_width+2,-chart_width-5,4),
+    (chart_width/2,-chart_width-9,6),
+])
 
 # =============================
 # 8. Lighting (studio-quality)
@@ -196,4 +121,4 @@ scene.render.ffmpeg.format = 'MPEG4'
 # =============================
 # 10. Render
 # =============================
-bpy.ops.render.render(animation=True)
+render_animation(scene)
@@ -2,7 +2,15 @@
 set up camera and lighting, and render the animation to a video file."""
 
 import bpy
-from mathutils import Vector
+import os
+import sys
+
+# shared helpers live in mvp/ and next to this script (blender -P doesn't add the script dir)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from keyframes import write_keyframes
+from frame_range import render_animation
+from charts import diagram, floor
 
 # =============================
 # 0. Reset scene
@@ -43,88 +51,22 @@ text_mat  = create_material("Text",  (1,1,1))
 # =============================
 # 3. Floor
 # =============================
-bpy.ops.mesh.primitive_plane_add(size=50, location=(0,0,0))
-floor = bpy.context.object
-floor.data.materials.append(floor_mat)
-
-# =============================
-# 4. Components (cubes) + labels
-# =============================
-comp_objs = []
-label_objs = []
-
-for name, loc in components:
-    bpy.ops.mesh.primitive_cube_add(location=(loc[0], loc[1], 0.15))
-    comp = bpy.context.object
-    comp.scale = (0.7,0.7,0)  # start flat
-    comp.data.materials.append(comp_mat)
-    # Bevel
-    b = comp.modifiers.new("Bevel","BEVEL")
-    b.width = 0.05
-    b.segments = 6
-    comp_objs.append(comp)
-
-    # Label text
-    bpy.ops.object.text_add(location=(loc[0], loc[1], 0.9))
-    txt = bpy.context.object
-    txt.data.body = name
-    txt.data.size = 0.25
-    txt.data.materials.append(text_mat)
-    txt.rotation_euler = (0,0,0)
-    txt.hide_render = True
-    txt.keyframe_insert("hide_render", frame=1)
-    txt.hide_render = False
-    txt.keyframe_insert("hide_render", frame=15)
-    label_objs.append(txt)
-
-# =============================
-# 5. Animate components popping up
-# =============================
-for i, comp in enumerate(comp_objs):
-    start = 20 + i*10
-    peak  = start + 8
-    settle= start + 14
-    h = 1.0  # cube height
-
-    comp.scale.z = 0
-    comp.keyframe_insert("scale", frame=start)
-
-    comp.scale.z = h*1.05
-    comp.keyframe_insert("scale", frame=peak)
-
-    comp.scale.z = h
-    comp.keyframe_insert("scale", frame=settle)
-
-    for fcu in comp.animation_data.action.fcurves:
-        for kp in fcu.keyframe_points:
-            kp.interpolation = 'BEZIER'
+floor(floor_mat, size=50)
 
 # =============================
-# 6. Arrows (edges) between components
+# 4-6. Components (boxes pop up one after another) + labels + arrows between them
 # =============================
 connections = [
     (0,1),(1,2),(2,3),(2,4),(3,5),(4,5),(2,6)
 ]
 
-for idx, (start_idx,end_idx) in enumerate(connections):
-    start = Vector(comp_objs[start_idx].location)
-    end   = Vector(comp_objs[end_idx].location)
-    mid = (start + end)/2
-    bpy.ops.mesh.primitive_cone_add(vertices=8, radius1=0.05, depth=(end-start).length, location=mid)
-    arrow = bpy.context.object
-    arrow.data.materials.append(arrow_mat)
-    # rotate arrow to face
-    direction = end - start
-    arrow.rotation_euler = direction.to_track_quat('-Z','Y').to_euler()
-    arrow.scale = (1,1,1)
-    # animate arrow appearing
-    arrow.scale.z = 0
-    arrow.keyframe_insert("scale", frame=40 + idx*10)
-    arrow.scale.z = 1
-    arrow.keyframe_insert("scale", frame=50 + idx*10)
-    for fcu in arrow.animation_data.action.fcurves:
-        for kp in fcu.keyframe_points:
-            kp.interpolation = 'BEZIER'
+net = diagram(
+    components, connections, comp_mat, arrow_mat, text_mat,
+    node_size=(1.4, 1.4, 1.0), label_height=0.2, label_size=0.25,
+    edge_radius=0.05, edge_shape="cone",
+    start_frame=20, edge_start_frame=40, reveal_labels_at=15, bevel=0.05,
+)
+comp_objs = net["nodes"]
 
 # =============================
 # 7. Camera (cinematic)
@@ -142,11 +84,7 @@ track.track_axis = 'TRACK_NEGATIVE_Z'
 track.up_axis = 'UP_Y'
 
 # Camera animation
-cam.keyframe_insert("location", frame=20)
-cam.location = (12,-12,10)
-cam.keyframe_insert("location", frame=100)
-cam.location = (0,-20,12)
-cam.keyframe_insert("location", frame=180)
+write_keyframes(cam, "location", [20, 100, 180], [(-10,-10,7), (12,-12,10), (0,-20,12)])
 
 # =============================
 # 8. Lighting (studio-quality)
@@ -179,4 +117,4 @@ scene.render.ffmpeg.format = 'MPEG4'
 # =============================
 # 10. Render
 # =============================
-bpy.ops.render.render(animation=True)
+render_animation(scene)
@@ -1,6 +1,12 @@
 """ Blender script to animate a character walking to a car,
 set up camera and lighting, and render the animation to a video file."""
 import bpy
+import os
+import sys
+
+# shared helpers live in mvp/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mvp"))
+from frame_range import render_animation
 from mathutils import Vector
 
 
@@ -95,4 +101,4 @@ scene.render.ffmpeg.format = "MPEG4"
 scene.render.ffmpeg.codec = "H264"
 
 # RENDER
-bpy.ops.render.render(animation=True)
+render_animation(scene)
@@ -0,0 +1,72 @@
+# mvp/asset_import.py
+""" import layer: every import lands in its own fresh collection, so the new datablocks are known directly
+instead of diffing set(bpy.data.objects) before / after (O(total objects) per import). """
+
+from dataclasses import dataclass, field
+
+import bpy
+
+
+@dataclass
+class ImportResult:
+    collection: object                              # bpy.types.Collection holding exactly the new objects
+    objects: list = field(default_factory=list)
+    roots: list = field(default_factory=list)       # new objects without a parent
+    meshes: list = field(default_factory=list)
+    armatures: list = field(default_factory=list)
+    actions: list = field(default_factory=list)
+
+
+def collect(collection):
+    """ structured view of the objects in `collection` (and the actions they use) """
+    objects = list(collection.objects)
+    actions = []
+    for obj in objects:
+        anim = obj.animation_data
+        if not anim:
+            continue
+        if anim.action and anim.action not in actions:
+            actions.append(anim.action)
+        for track in anim.nla_tracks:
+            for strip in track.strips:
+                if strip.action and strip.action not in actions:
+                    actions.append(strip.action)
+
+    return ImportResult(
+        collection=collection,
+        objects=objects,
+        roots=[o for o in objects if o.parent is None],
+        meshes=[o for o in objects if o.type == 'MESH'],
+        armatures=[o for o in objects if o.type == 'ARMATURE'],
+        actions=actions,
+    )
+
+
+def new_scene_collection(name):
+    coll = bpy.data.collections.new(name)
+    bpy.context.scene.collection.children.link(coll)
+    return coll
+
+
+def import_asset(path, collection_name=None):
+    """ run the glTF / FBX importer into a fresh collection linked to the scene """
+    lower = path.lower()
+    if lower.endswith(".fbx"):
+        importer = bpy.ops.import_scene.fbx
+    elif lower.endswith(".glb") or lower.endswith(".gltf"):
+        importer = bpy.ops.import_scene.gltf
+    else:
+        raise Exception("Unsupported format: " + path)
+
+    coll = new_scene_collection(collection_name or "IMPORT")
+
+    # importers link new objects into the active collection
+    view_layer = bpy.context.view_layer
+    previous = view_layer.active_layer_collection
+    view_layer.active_layer_collection = view_layer.layer_collection.children[coll.name]
+    try:
+        importer(filepath=path)
+    finally:
+        view_layer.active_layer_collection = previous
+
+    return collect(coll)
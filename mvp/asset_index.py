@@ -0,0 +1,154 @@
+# mvp/asset_index.py
+""" single SQLite index of asset manifests, keyed by asset id and source file hash/mtime.
+pure Python (no bpy) so the planner can query it by id, tag, type or dimensions. """
+
+import hashlib
+import json
+import os
+import sqlite3
+
+# assets and their manifests/index, shared by ingest, the planners, the assembler and the engine so they all use
+# one index and one scene manifest; "assets" in the working directory as always, ASSETS_ROOT in the environment
+# overrides it
+ASSETS_ROOT = os.environ.get("ASSETS_ROOT", "assets")
+INDEX_FILENAME = "asset_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id     TEXT PRIMARY KEY,
+    source_path  TEXT NOT NULL,
+    source_hash  TEXT NOT NULL,
+    source_mtime REAL NOT NULL,
+    source_size  INTEGER NOT NULL,
+    type         TEXT,
+    width        REAL,
+    depth        REAL,
+    height       REAL,
+    manifest     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS asset_tags (
+    asset_id TEXT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    tag      TEXT NOT NULL,
+    PRIMARY KEY (tag, asset_id)
+);
+CREATE INDEX IF NOT EXISTS assets_type ON assets(type);
+CREATE INDEX IF NOT EXISTS assets_height ON assets(height);
+"""
+
+DIMENSIONS = ("width", "depth", "height")
+
+_hash_memo = {}  # (path, size, mtime) -> hash, saves re-reading big files in resident workers
+
+
+def source_hash(path):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime)
+    if key not in _hash_memo:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _hash_memo[key] = h.hexdigest()[:16]
+    return _hash_memo[key]
+
+
+def open_index(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def needs_update(conn, asset_id, source_path):
+    """ True if the asset is new or its source file changed since it was indexed """
+    row = conn.execute(
+        "SELECT source_hash, source_mtime, source_size FROM assets WHERE asset_id = ?", (asset_id,)
+    ).fetchone()
+    if row is None:
+        return True
+
+    st = os.stat(source_path)
+    if row["source_mtime"] == st.st_mtime and row["source_size"] == st.st_size:
+        return False
+
+    # touched but maybe not changed (copied, re-downloaded): compare content
+    if row["source_hash"] != source_hash(source_path):
+        return True
+
+    with conn:
+        conn.execute(
+            "UPDATE assets SET source_mtime = ? WHERE asset_id = ?", (st.st_mtime, asset_id)
+        )
+    return False
+
+
+def indexed_hash(conn, asset_id, source_path):
+    """ the content hash the index holds for the asset, if it was indexed from `source_path` and the file is
+    unchanged since (by mtime / size, like needs_update), else None; saves hashing a known file again """
+    row = conn.execute("SELECT source_path, source_hash FROM assets WHERE asset_id = ?", (asset_id,)).fetchone()
+    if row is None or os.path.abspath(row["source_path"]) != os.path.abspath(source_path):
+        return None
+    if needs_update(conn, asset_id, source_path):
+        return None
+    return row["source_hash"]
+
+
+def put(conn, manifest, source_path):
+    """ insert or replace one asset manifest; `manifest` needs asset_id and may carry type, tags, dimensions """
+    st = os.stat(source_path)
+    dims = manifest.get("dimensions") or [None, None, None]
+    asset_id = manifest["asset_id"]
+
+    with conn:
+        conn.execute("DELETE FROM asset_tags WHERE asset_id = ?", (asset_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                asset_id, source_path, source_hash(source_path), st.st_mtime, st.st_size,
+                manifest.get("type"), dims[0], dims[1], dims[2], json.dumps(manifest),
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO asset_tags VALUES (?, ?)",
+            [(asset_id, tag) for tag in manifest.get("tags", [])],
+        )
+
+
+def get(conn, asset_id):
+    row = conn.execute("SELECT manifest FROM assets WHERE asset_id = ?", (asset_id,)).fetchone()
+    return json.loads(row["manifest"]) if row else None
+
+
+def find(conn, tag=None, asset_type=None, **ranges):
+    """ manifests matching every given filter, e.g. find(conn, tag="ball", height=(0.1, 0.5)).
+    ranges are (min, max) per dimension in DIMENSIONS; either bound may be None """
+    sql = "SELECT a.manifest FROM assets a"
+    where = []
+    params = []
+
+    if tag is not None:
+        sql += " JOIN asset_tags t ON t.asset_id = a.asset_id"
+        where.append("t.tag = ?")
+        params.append(tag)
+
+    if asset_type is not None:
+        where.append("a.type = ?")
+        params.append(asset_type)
+
+    for dim, (lo, hi) in ranges.items():
+        if dim not in DIMENSIONS:
+            raise Exception(f"Unknown dimension: {dim}")
+        if lo is not None:
+            where.append(f"a.{dim} >= ?")
+            params.append(lo)
+        if hi is not None:
+            where.append(f"a.{dim} <= ?")
+            params.append(hi)
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY a.asset_id"
+
+    return [json.loads(row["manifest"]) for row in conn.execute(sql, params)]
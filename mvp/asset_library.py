@@ -0,0 +1,109 @@
+# mvp/asset_library.py
+""" compiled asset library: each source glTF/FBX is imported once and saved as a .blend keyed by its content hash,
+builders then append from that .blend instead of re-running the importer every job. given the asset's current
+normalization (see normalization.py), the .blend holds the asset already normalized, in a file of its own. """
+
+import os
+import sys
+
+import bpy
+from mathutils import Euler, Matrix
+
+# run as `blender -b -P asset_library.py`, the script's directory is not on the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import asset_import
+from asset_index import source_hash
+
+# CONFIG
+LIBRARY_DIR = os.path.join("assets", "library")
+
+
+def library_path(path, normalization=None):
+    """ the .blend for a source file, keyed by its content hash. a normalization carries the hash of the content it
+    was measured on (and is only passed when current, see normalization.is_current), so a normalized asset's file
+    is found without hashing the source again """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if normalization is None:
+        return os.path.join(LIBRARY_DIR, f"{stem}_{source_hash(path)}.blend")
+    key = f"{normalization['source_hash']}_n{normalization['version']}_{normalization['meta_hash']}"
+    return os.path.join(LIBRARY_DIR, f"{stem}_{key}.blend")
+
+
+def normalize(objects, normalization):
+    """ bake a manifest normalization into freshly imported objects: their roots get the rotation + scale that
+    normalization.apply gives the empty wrapping them """
+    s = normalization["scale_factor"]
+    matrix = Matrix.LocRotScale(None, Euler(normalization["rotation"], "XYZ"), (s, s, s))
+    for obj in objects:
+        if obj.parent is None:
+            obj.matrix_basis = matrix @ obj.matrix_basis
+
+
+def compile_asset(path, objects, normalization=None):
+    """ write freshly imported objects (+ meshes, materials, images, actions) to the library .blend, normalized
+    first when given a normalization """
+    os.makedirs(LIBRARY_DIR, exist_ok=True)
+    lib_path = library_path(path, normalization)
+    if normalization is not None:
+        normalize(objects, normalization)
+
+    # external textures (.gltf + pngs) must travel inside the .blend
+    for img in {
+        node.image
+        for obj in objects
+        for slot in obj.material_slots if slot.material and slot.material.node_tree
+        for node in slot.material.node_tree.nodes if getattr(node, "image", None)
+    }:
+        if not img.packed_file and img.source == 'FILE':
+            img.pack()
+
+    # write to a temp name first so a crash never leaves a half-written library; one per process, as shards
+    # starting on a cold cache compile the same asset at once (the last replace wins, each file is complete)
+    tmp_path = f"{lib_path}.{os.getpid()}.tmp"
+    try:
+        bpy.data.libraries.write(tmp_path, set(objects), fake_user=True)
+        os.replace(tmp_path, lib_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    print("Compiled asset:", path, "→", lib_path)
+    return lib_path
+
+
+def load_asset(path, normalization=None):
+    """ bring the asset at `path` into the current scene, with `normalization` (a current one) already applied;
+    returns an asset_import.ImportResult whose collection (linked to the scene) holds exactly the new objects """
+    lib_path = library_path(path, normalization)
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    try:
+        # a library file that is missing (or was deleted) is compiled again below
+        with bpy.data.libraries.load(lib_path, link=False) as (data_from, data_to):
+            data_to.objects = data_from.objects
+    except OSError:
+        result = asset_import.import_asset(path, name)
+        compile_asset(path, result.objects, normalization)
+        return result
+
+    coll = asset_import.new_scene_collection(name)
+    for obj in data_to.objects:
+        if obj is not None:
+            obj.use_fake_user = False
+            coll.objects.link(obj)
+
+    print("Appended from library:", lib_path)
+    return asset_import.collect(coll)
+
+
+# Usage: blender -b -P mvp/asset_library.py -- assets/kid.glb assets/court.fbx ...
+# Pre-compiles assets so the first scene build doesn't pay the import either.
+if __name__ == "__main__":
+    sep = sys.argv.index("--")
+
+    for source in sys.argv[sep + 1:]:
+        if os.path.exists(library_path(source)):
+            print("Up to date:", source)
+            continue
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        compile_asset(source, asset_import.import_asset(source).objects)
@@ -0,0 +1,78 @@
+# mvp/bbox.py
+""" shared world-space bounding box helpers: pull bound_box / matrix_world into NumPy once and reduce in bulk
+instead of building a mathutils.Vector per corner. """
+
+import numpy as np
+from mathutils import Vector
+
+
+def _mesh_objects(objects):
+    return [o for o in objects if o.type == 'MESH']
+
+
+def _world_matrices(objects, meshes):
+    """ (n, 4, 4) world matrices of `meshes`, the mesh objects of `objects`. foreach_get only exists on a
+    bpy_prop_collection (e.g. a collection's .objects): those are read in one call, plain lists such as
+    children_recursive one matrix per object """
+    if hasattr(objects, "foreach_get"):
+        flat = np.empty(len(objects) * 16, dtype=np.float32)
+        objects.foreach_get("matrix_world", flat)
+        mats = flat.reshape(-1, 4, 4).transpose(0, 2, 1)  # stored column-major
+        is_mesh = np.fromiter((o.type == 'MESH' for o in objects), dtype=bool, count=len(objects))
+        return mats[is_mesh].astype(np.float64)
+
+    mats = np.empty((len(meshes), 4, 4), dtype=np.float64)
+    for i, m in enumerate(meshes):
+        mats[i] = m.matrix_world
+    return mats
+
+
+def _corner_points(meshes):
+    # bound_box is 8 local-space corners per object; foreach_get copies them without Python floats
+    corners = np.empty((len(meshes), 24), dtype=np.float32)
+    for i, m in enumerate(meshes):
+        m.bound_box.foreach_get(corners[i])
+    return corners.reshape(-1, 8, 3).astype(np.float64)
+
+
+def _to_world(points, mat):
+    return points @ mat[:3, :3].T + mat[:3, 3]
+
+
+def objects_bbox(objects, exact=False):
+    """ combined world-space (min, max) Vectors over the mesh objects in `objects` (a list, or a collection's
+    .objects to read the world matrices in bulk), or None if there are none.
+    exact=True uses every mesh vertex (undeformed) instead of the 8 bound_box corners per object """
+    meshes = _mesh_objects(objects)
+    if not meshes:
+        return None
+
+    mats = _world_matrices(objects, meshes)
+
+    if not exact:
+        # (n, 8, 3) @ (n, 3, 3)^T + (n, 1, 3) — one batched transform for every corner
+        corners = _corner_points(meshes)
+        world = np.einsum("nij,nkj->nki", mats[:, :3, :3], corners) + mats[:, None, :3, 3]
+        world = world.reshape(-1, 3)
+        return Vector(world.min(axis=0)), Vector(world.max(axis=0))
+
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    for m, mat in zip(meshes, mats):
+        verts = m.data.vertices
+        if not len(verts):
+            continue
+        co = np.empty(len(verts) * 3, dtype=np.float32)
+        verts.foreach_get("co", co)
+        world = _to_world(co.reshape(-1, 3).astype(np.float64), mat)
+        lo = np.minimum(lo, world.min(axis=0))
+        hi = np.maximum(hi, world.max(axis=0))
+
+    if not np.isfinite(lo).all():
+        return None
+    return Vector(lo), Vector(hi)
+
+
+def get_combined_bbox(obj, exact=False):
+    """ combined world-space bbox of every mesh under `obj` (drop-in for the old per-script copies) """
+    return objects_bbox(obj.children_recursive, exact=exact)
@@ -0,0 +1,112 @@
+# mvp/bench/bench_engine.py
+""" benchmark of engine_v1_scene_builder.py builds on synthetic assets: per repeat, a fresh session builds every
+generated scene manifest and the engine's own stages (import, normalize, attach, animate, render) are collected
+from its timing record, plus bounding boxes over the loaded asset prototypes. runs in Blender, or anywhere with
+--backend stub. """
+
+import os
+import shutil
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+import engine_v1_scene_builder as engine
+import harness
+import scene_plan
+import synth
+import timing
+
+LIBRARY_DIR = None  # compiled asset library of the blender backend, set by configure()
+
+
+def configure(work, manifests, paths):
+    """ point the engine's asset config at the synthetic assets """
+    global LIBRARY_DIR
+    engine.ASSETS_ROOT = os.path.join(work, "assets")
+    engine.ASSET_FILES = {asset_id: os.path.basename(path) for asset_id, path in paths.items()}
+    synth.normalize_assets(manifests, paths)
+    engine.MANIFESTS = dict(manifests)
+    engine.OUTPUT_DIR = os.path.join(work, "outputs")
+
+    if engine.backend.name == "blender":
+        import asset_library
+        LIBRARY_DIR = asset_library.LIBRARY_DIR = os.path.join(work, "library")
+
+
+def fresh_session(backend_name, cold):
+    """ empty scene and engine state, like a new process; cold also drops the compiled asset library """
+    engine.use_backend(backend_name)
+    if cold and LIBRARY_DIR:
+        shutil.rmtree(LIBRARY_DIR, ignore_errors=True)
+
+
+def time_bbox(exact):
+    roots = [
+        obj for asset in engine.RESIDENT.values() for obj in asset.objects if obj.name.startswith("PROTO_")
+    ]
+    name = "bbox_exact" if exact else "bbox"
+    with timing.stage(name):
+        for root in roots:
+            engine.backend.bbox(root, exact=exact)
+
+
+def run(args):
+    work = os.path.abspath(args.work_dir)
+    manifests, paths = synth.make_assets(
+        os.path.join(work, "assets"), args.assets, args.meshes, args.vertices, args.depth, args.seed
+    )
+    scenes = synth.make_scene_manifests(list(paths), args.scenes, args.objects, args.animations, args.seed)
+    scenes = [scene_plan.compile_plan(s) for s in scenes]
+    engine.use_backend(args.backend)
+    configure(work, manifests, paths)
+
+    stages = {}
+    for i in range(args.repeat + 1):
+        fresh_session(args.backend, cold=not args.warm_library)
+        with timing.job(f"bench_{i}") as record:
+            for scene in scenes:
+                engine.reset_scene()
+                engine.build_scene(scene)
+                if args.render:
+                    engine.render_scene(scene["scene_id"])
+            time_bbox(exact=False)
+            time_bbox(exact=True)
+
+        # the first pass warms caches (and, with --warm-library, compiles the library)
+        if i == 0:
+            continue
+        data = record.to_dict()
+        for name, seconds in data["stages"].items():
+            stages.setdefault(name, []).append(seconds)
+        stages.setdefault("total", []).append(data["total"])
+
+    return stages
+
+
+# Usage: blender -b -P mvp/bench/bench_engine.py -- [--assets N --meshes N --vertices N --depth N
+#        --scenes N --objects N --animations N --repeat N --render --warm-library --label NOTE]
+#        python mvp/bench/bench_engine.py --backend stub [...]
+# --warm-library keeps the compiled .blend library between repeats (append path instead of the glTF importer)
+if __name__ == "__main__":
+    in_blender = "bpy" in sys.modules
+    p = harness.parser(__doc__)
+    p.add_argument("--backend", default="blender" if in_blender else "stub", help="scene_backend to build with")
+    p.add_argument("--render", action="store_true", help="also render every scene (slow)")
+    p.add_argument("--warm-library", action="store_true", help="reuse compiled assets between repeats")
+    if "--" in sys.argv:
+        argv = sys.argv[sys.argv.index("--") + 1:]
+    else:
+        argv = [] if in_blender else sys.argv[1:]
+    args = p.parse_args(argv)
+
+    # backend and flags change what is measured, so they're part of the suite name runs are compared by
+    suite = "engine" + ("" if args.backend == "blender" else "_" + args.backend)
+    suite += ("_warm" if args.warm_library else "") + ("_render" if args.render else "")
+    extra = {}
+    if in_blender:
+        import bpy
+        extra["blender"] = bpy.app.version_string
+
+    stages = run(args)
+    harness.save(harness.result(suite, args, stages, **extra), os.path.abspath(args.results))
@@ -0,0 +1,148 @@
+# mvp/bench/bench_pipeline.py
+""" benchmark of the pipeline without Blender: synthetic asset generation, asset index writes / queries, planner,
+assembler, scene manifest I/O (one .scene.json per scene, JSONL, and compiled .splan plans) and engine builds of
+the assembled scenes on the in-memory stub backend. """
+
+import json
+import os
+import shutil
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "planner"))
+sys.path.insert(0, HERE)
+import asset_index
+import engine_v1_scene_builder as engine
+import harness
+import scene_plan
+import synth
+
+SCENE_TYPES = ("static_scene", "move_actor", "carry_object")
+
+
+def plan_requests(count):
+    return [
+        {"scene_type": SCENE_TYPES[i % len(SCENE_TYPES)], "actor": "kid", "object": "ball", "environment": "court"}
+        for i in range(count)
+    ]
+
+
+def build_index(path, manifests, paths):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = asset_index.open_index(path)
+    for asset_id, manifest in manifests.items():
+        asset_index.put(conn, manifest, paths[asset_id])
+    return conn
+
+
+def write_manifests(directory, scenes):
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    for scene in scenes:
+        with open(os.path.join(directory, scene["scene_id"] + ".scene.json"), "w") as f:
+            json.dump(scene, f, indent=2)
+
+
+def read_manifests(directory):
+    out = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".scene.json"):
+            with open(os.path.join(directory, name)) as f:
+                out.append(json.load(f))
+    return out
+
+
+def write_jsonl(path, scenes):
+    with open(path, "w") as f:
+        for scene in scenes:
+            f.write(json.dumps(scene) + "\n")
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run(args):
+    work = os.path.abspath(args.work_dir)
+    asset_dir = os.path.join(work, "assets")
+    index_path = os.path.join(work, "manifests", asset_index.INDEX_FILENAME)
+    repeat = args.repeat
+    stages = {}
+
+    # the planner / assembler modules write under relative "assets/" paths on import
+    os.makedirs(work, exist_ok=True)
+    os.chdir(work)
+    import scene_planner_v1
+    import planner_v1_scene_assembler as assembler
+
+    manifests, paths = synth.make_assets(asset_dir, args.assets, args.meshes, args.vertices, args.depth, args.seed)
+    synth.normalize_assets(manifests, paths)
+    asset_ids = list(manifests)
+
+    stages["generate_asset"] = harness.measure(
+        lambda: synth.make_glb(
+            os.path.join(asset_dir, "_timed.glb"), args.meshes, args.vertices, args.depth, args.seed
+        ),
+        repeat,
+    )
+
+    stages["index_put"] = harness.measure(lambda: build_index(index_path, manifests, paths).close(), repeat)
+    conn = build_index(index_path, manifests, paths)
+    stages["index_find"] = harness.measure(
+        lambda: [asset_index.find(conn, tag=f"group_{g}") for g in range(5)]
+        + [asset_index.find(conn, asset_type=t, height=(0.5, 2.0)) for t in synth.ASSET_TYPES],
+        repeat,
+    )
+
+    requests = plan_requests(args.scenes)
+    stages["plan"] = harness.measure(lambda: [scene_planner_v1.plan_scene(r) for r in requests], repeat)
+
+    specs = [
+        synth.scene_spec(f"bench_{i:04d}", asset_ids, args.objects, args.animations, seed=args.seed + i)
+        for i in range(args.scenes)
+    ]
+    assembler._index = conn
+    stages["assemble"] = harness.measure(lambda: [assembler.build_scene(s) for s in specs], repeat)
+
+    # assembled scenes through the engine, each run in a fresh session (so assets are imported again)
+    assembled = [assembler.build_scene(s) for s in specs]
+    engine.ASSETS_ROOT = asset_dir
+    engine.ASSET_FILES = {asset_id: os.path.basename(path) for asset_id, path in paths.items()}
+    engine.MANIFESTS = dict(manifests)
+
+    def build_all():
+        engine.use_backend("stub")
+        for scene in assembled:
+            engine.reset_scene()
+            engine.build_scene(scene)
+
+    stages["build_stub"] = harness.measure(build_all, repeat)
+
+    scenes = synth.make_scene_manifests(asset_ids, args.scenes, args.objects, args.animations, args.seed)
+    scene_dir = os.path.join(work, "scenes")
+    jsonl_path = os.path.join(work, "scenes.jsonl")
+    stages["manifest_write"] = harness.measure(lambda: write_manifests(scene_dir, scenes), repeat)
+    stages["manifest_read"] = harness.measure(lambda: read_manifests(scene_dir), repeat)
+    stages["jsonl_write"] = harness.measure(lambda: write_jsonl(jsonl_path, scenes), repeat)
+    stages["jsonl_read"] = harness.measure(lambda: read_jsonl(jsonl_path), repeat)
+
+    plan_path = os.path.join(work, "scenes" + scene_plan.PLAN_EXT)
+    stages["plan_compile"] = harness.measure(lambda: [scene_plan.compile_plan(s) for s in scenes], repeat)
+    plans = [scene_plan.compile_plan(s) for s in scenes]
+    stages["plan_write"] = harness.measure(lambda: scene_plan.save_plans(plan_path, plans), repeat)
+    stages["plan_read"] = harness.measure(lambda: list(scene_plan.read_plans(plan_path)), repeat)
+
+    conn.close()
+    return stages
+
+
+# Usage: python mvp/bench/bench_pipeline.py [--assets N --meshes N --vertices N --depth N
+#        --scenes N --objects N --animations N --repeat N --label NOTE]
+if __name__ == "__main__":
+    args = harness.parser(__doc__).parse_args()
+    results_path = os.path.abspath(args.results)
+    stages = run(args)
+    harness.save(harness.result("pipeline", args, stages), results_path)
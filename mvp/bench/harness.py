@@ -0,0 +1,132 @@
+# mvp/bench/harness.py
+""" shared benchmark plumbing: common CLI knobs, per-stage samples -> min / median / p90, one JSON line per run
+(with the git revision and environment) in a results file, and a comparison against the last run of the same
+suite + parameters. pure Python (no bpy). """
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import timing
+
+RESULTS_PATH = os.path.join("outputs", "bench", "results.jsonl")
+WORK_DIR = os.path.join("outputs", "bench", "work")
+
+# parameters that identify a run; only runs with equal values are compared
+PARAMS = ("assets", "meshes", "vertices", "depth", "scenes", "objects", "animations", "repeat", "seed")
+
+
+def parser(description):
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--assets", type=int, default=5, help="distinct synthetic assets")
+    p.add_argument("--meshes", type=int, default=10, help="mesh objects per asset")
+    p.add_argument("--vertices", type=int, default=1000, help="vertices per mesh")
+    p.add_argument("--depth", type=int, default=3, help="node hierarchy depth per asset")
+    p.add_argument("--scenes", type=int, default=20, help="scene manifests per run")
+    p.add_argument("--objects", type=int, default=10, help="placed assets per scene")
+    p.add_argument("--animations", type=int, default=5, help="animations per scene")
+    p.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--work-dir", default=WORK_DIR, help="generated assets / manifests go here")
+    p.add_argument("--results", default=RESULTS_PATH, help="JSONL file results are appended to")
+    p.add_argument("--label", default=None, help="free-form note stored with the result, e.g. a branch name")
+    return p
+
+
+def params(args):
+    return {name: getattr(args, name) for name in PARAMS}
+
+
+def measure(fn, repeat, warmup=1):
+    """ seconds per call of fn() over `repeat` timed calls, after `warmup` untimed ones """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def summarize(samples):
+    values = sorted(samples)
+    return {
+        "runs": len(values),
+        "min": round(values[0], 6),
+        "median": round(statistics.median(values), 6),
+        "p90": round(timing.percentile(values, 90), 6),
+        "max": round(values[-1], 6),
+    }
+
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def result(suite, args, stages, **extra):
+    """ one comparable result: suite name, parameters, environment and {stage: summary} """
+    return {
+        "suite": suite,
+        "params": params(args),
+        "label": args.label,
+        "created_at": time.time(),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "cpus": os.cpu_count(),
+        "max_rss_mb": round(timing.max_rss_mb(), 1),
+        **extra,
+        "stages": {name: summarize(samples) for name, samples in stages.items() if samples},
+    }
+
+
+def previous(path, data):
+    """ the last result in `path` with the same suite and parameters as `data`, or None """
+    if not os.path.exists(path):
+        return None
+
+    match = None
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            old = json.loads(line)
+            if old.get("suite") == data["suite"] and old.get("params") == data["params"]:
+                match = old
+    return match
+
+
+def report(data, baseline=None):
+    """ print per-stage medians, with the change against `baseline` when there is one """
+    print(f"\n=== {data['suite']} @ {data['git'] or '?'} {data['params']} ===")
+    if baseline:
+        print(f"    vs {baseline['git'] or '?'} ({baseline.get('label') or 'no label'})")
+
+    for name, s in data["stages"].items():
+        line = f"{name:<20} median {s['median'] * 1000:10.2f} ms   min {s['min'] * 1000:10.2f} ms"
+        old = (baseline or {}).get("stages", {}).get(name)
+        if old and old["median"]:
+            change = (s["median"] - old["median"]) / old["median"] * 100
+            line += f"   {change:+6.1f}%"
+        print(line)
+
+
+def save(data, path):
+    """ report against the previous comparable run, then append `data` to the results file """
+    report(data, previous(path, data))
+    timing.write_record(data, path)
+    print("Results appended to", path)
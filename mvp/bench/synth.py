@@ -0,0 +1,264 @@
+# mvp/bench/synth.py
+""" procedural benchmark inputs: .glb assets with a chosen mesh count, vertices per mesh and node hierarchy
+depth, plus the asset manifests, scene specs and scene manifests the planner / assembler / engine consume.
+pure Python (struct + array, no bpy), output is deterministic for a given seed. """
+
+import json
+import math
+import os
+import random
+import struct
+import sys
+from array import array
+
+GLB_MAGIC = 0x46546C67      # "glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+FLOAT = 5126                # glTF componentType
+UINT32 = 5125
+ARRAY_BUFFER = 34962        # bufferView target
+ELEMENT_ARRAY_BUFFER = 34963
+
+ASSET_TYPES = ("character", "prop", "environment")
+
+
+# ---------- MESHES ----------
+def sphere_grid(vertices):
+    """ (rings, segments) of a UV sphere with roughly `vertices` vertices """
+    segments = max(3, int(round(math.sqrt(2 * vertices))))
+    rings = max(2, vertices // segments - 1)
+    return rings, segments
+
+
+def sphere(vertices, radius=0.5):
+    """ positions, normals (flat float arrays) and triangle indices of a UV sphere sitting on z=0 """
+    rings, segments = sphere_grid(vertices)
+    positions, normals = array("f"), array("f")
+
+    for r in range(rings + 1):
+        theta = math.pi * r / rings
+        for s in range(segments):
+            phi = 2 * math.pi * s / segments
+            n = (math.sin(theta) * math.cos(phi), math.sin(theta) * math.sin(phi), math.cos(theta))
+            normals.extend(n)
+            positions.extend((n[0] * radius, n[1] * radius, n[2] * radius + radius))
+
+    indices = array("I")
+    for r in range(rings):
+        for s in range(segments):
+            a = r * segments + s
+            b = r * segments + (s + 1) % segments
+            c, d = a + segments, b + segments
+            indices.extend((a, c, b, b, c, d))
+
+    return positions, normals, indices
+
+
+def _bounds(positions):
+    xs, ys, zs = positions[0::3], positions[1::3], positions[2::3]
+    return [min(xs), min(ys), min(zs)], [max(xs), max(ys), max(zs)]
+
+
+def _pad(data, fill):
+    return data + fill * (-len(data) % 4)
+
+
+def _le(arr):
+    # glTF buffers are little-endian
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+# ---------- GLB ----------
+def make_glb(path, meshes=1, vertices=500, depth=1, seed=0):
+    """ write a .glb with `meshes` mesh nodes of ~`vertices` vertices each, chained `depth` levels deep under one
+    root node (every level offset and scaled, so world matrices aren't all identity). returns stats """
+    rng = random.Random(seed)
+    depth = max(1, depth)
+    gltf = {
+        "asset": {"version": "2.0", "generator": "mvp bench synth"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"name": "root", "children": []}],
+        "meshes": [],
+        "accessors": [],
+        "bufferViews": [],
+        "buffers": [],
+    }
+    binary = bytearray()
+
+    def add_view(data, target):
+        offset = len(binary)
+        binary.extend(_pad(data, b"\x00"))
+        gltf["bufferViews"].append(
+            {"buffer": 0, "byteOffset": offset, "byteLength": len(data), "target": target}
+        )
+        return len(gltf["bufferViews"]) - 1
+
+    def add_accessor(view, component, count, kind, **extra):
+        gltf["accessors"].append(
+            {"bufferView": view, "componentType": component, "count": count, "type": kind, **extra}
+        )
+        return len(gltf["accessors"]) - 1
+
+    total_vertices = 0
+    parent = 0
+    for i in range(meshes):
+        # unique data per mesh, so the importer can't share anything between them
+        positions, normals, indices = sphere(vertices, radius=rng.uniform(0.25, 0.75))
+        lo, hi = _bounds(positions)
+        count = len(positions) // 3
+        total_vertices += count
+
+        pos = add_accessor(add_view(_le(positions), ARRAY_BUFFER), FLOAT, count, "VEC3", min=lo, max=hi)
+        nrm = add_accessor(add_view(_le(normals), ARRAY_BUFFER), FLOAT, count, "VEC3")
+        idx = add_accessor(add_view(_le(indices), ELEMENT_ARRAY_BUFFER), UINT32, len(indices), "SCALAR")
+        gltf["meshes"].append({
+            "name": f"mesh_{i}",
+            "primitives": [{"attributes": {"POSITION": pos, "NORMAL": nrm}, "indices": idx}],
+        })
+
+        # every `depth` meshes start a new chain under the root
+        if i % depth == 0:
+            parent = 0
+        node = {
+            "name": f"node_{i}",
+            "mesh": i,
+            "translation": [rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(0, 0.5)],
+            "scale": [rng.uniform(0.8, 1.2)] * 3,
+        }
+        gltf["nodes"].append(node)
+        gltf["nodes"][parent].setdefault("children", []).append(len(gltf["nodes"]) - 1)
+        parent = len(gltf["nodes"]) - 1
+
+    gltf["buffers"].append({"byteLength": len(binary)})
+
+    json_chunk = _pad(json.dumps(gltf, separators=(",", ":")).encode(), b" ")
+    length = 12 + 8 + len(json_chunk) + 8 + len(binary)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<III", GLB_MAGIC, 2, length))
+        f.write(struct.pack("<II", len(json_chunk), CHUNK_JSON))
+        f.write(json_chunk)
+        f.write(struct.pack("<II", len(binary), CHUNK_BIN))
+        f.write(binary)
+
+    return {"path": path, "meshes": meshes, "vertices": total_vertices, "depth": depth, "bytes": length}
+
+
+# ---------- MANIFESTS ----------
+def asset_manifest(asset_id, index, height=1.0):
+    """ asset manifest in the shape mvp_with_manifest.py indexes; every third asset is of each type """
+    asset_type = ASSET_TYPES[index % len(ASSET_TYPES)]
+    return {
+        "asset_id": asset_id,
+        "root_object": f"ROOT_{asset_id.upper()}",
+        "type": asset_type,
+        "tags": [asset_type, f"group_{index % 5}"],
+        "dimensions": [height, height, height],
+        "reference": {"dimension": "height", "size": height},
+    }
+
+
+def make_assets(directory, count, meshes=1, vertices=500, depth=1, seed=0):
+    """ `count` .glb files + their manifests in `directory`; returns (manifests, paths) keyed by asset id """
+    manifests, paths = {}, {}
+    for i in range(count):
+        asset_id = f"synth_{i}"
+        path = os.path.join(directory, asset_id + ".glb")
+        make_glb(path, meshes, vertices, depth, seed=seed + i)
+        manifests[asset_id] = asset_manifest(asset_id, i)
+        paths[asset_id] = path
+    return manifests, paths
+
+
+def normalize_assets(manifests, paths):
+    """ what ingest does for real assets: measure each asset once (on the NumPy stub backend) and store its
+    normalization and normalized dimensions in its manifest """
+    import normalization
+    import stub_backend
+
+    backend = stub_backend.Backend()
+    for asset_id, manifest in manifests.items():
+        root = backend.wrap(asset_id, backend.load_asset(paths[asset_id]))
+        manifest["normalization"] = normalization.measure(backend, root, manifest, paths[asset_id])
+        manifest["dimensions"] = manifest["normalization"]["dimensions"]
+    return manifests
+
+
+def scene_spec(name, asset_ids, objects, animations, seed=0):
+    """ assembler input (see planner_v1_scene_assembler.SCENE_SPEC): `objects` placements drawn from
+    `asset_ids` (some by tag / type instead of id, some auto-placed) and `animations` linear moves """
+    rng = random.Random(seed)
+    spec = {"scene": name, "objects": [], "animations": [], "attachments": []}
+
+    for i in range(objects):
+        asset_id = asset_ids[i % len(asset_ids)]
+        obj = {"id": f"obj_{i}"}
+        pick = i % 4
+        if pick == 0:
+            obj["tag"] = f"group_{asset_ids.index(asset_id) % 5}"
+        elif pick == 1:
+            obj["type"] = ASSET_TYPES[asset_ids.index(asset_id) % len(ASSET_TYPES)]
+        else:
+            obj["asset"] = asset_id
+        if pick != 3:
+            obj["position"] = [rng.uniform(-10, 10), rng.uniform(-10, 10), 0]
+        spec["objects"].append(obj)
+
+    for i in range(animations):
+        spec["animations"].append({
+            "asset": f"obj_{rng.randrange(objects)}",
+            "type": "linear_move",
+            "start": [0, 0, 0],
+            "end": [rng.uniform(-5, 5), rng.uniform(-5, 5), 0],
+            "frames": [1, rng.randint(24, 240)],
+        })
+
+    return spec
+
+
+def scene_manifest(scene_id, asset_ids, assets, animations, seed=0):
+    """ engine input (what the assembler emits): `assets` placements and `animations` linear moves """
+    rng = random.Random(seed)
+    placements = {}
+    for i in range(assets):
+        asset_id = asset_ids[i % len(asset_ids)]
+        placements[f"obj_{i}"] = {
+            "asset_id": asset_id,
+            "root_object": f"ROOT_{asset_id.upper()}",
+            "location": [rng.uniform(-10, 10), rng.uniform(-10, 10), 0],
+            "scale": [1, 1, 1],
+        }
+
+    keys = list(placements)
+    anims = [
+        {
+            "asset_id": rng.choice(keys),
+            "type": "linear_move",
+            "start": [0, 0, 0],
+            "end": [rng.uniform(-5, 5), rng.uniform(-5, 5), 0],
+            "frames": [1, 120],
+        }
+        for _ in range(animations)
+    ]
+
+    return {
+        "scene_id": scene_id,
+        "frame_start": 1,
+        "frame_end": 120,
+        "assets": placements,
+        "animations": anims,
+        "attachments": [],
+    }
+
+
+def make_scene_manifests(asset_ids, scenes, assets, animations, seed=0):
+    return [
+        scene_manifest(f"bench_{i:04d}", asset_ids, assets, animations, seed=seed + i)
+        for i in range(scenes)
+    ]
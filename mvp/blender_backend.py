@@ -0,0 +1,110 @@
+# mvp/blender_backend.py
+""" scene_backend implementation on bpy: assets come through the compiled asset library, stored assets are
+collections instanced by empties, keys go through keyframes.write_keyframes. """
+
+import os
+
+import bpy
+from mathutils import Matrix, Vector
+
+import asset_library
+from bbox import get_combined_bbox
+from keyframes import write_keyframes
+from scene_backend import SceneBackend
+
+
+class Backend(SceneBackend):
+    name = "blender"
+
+    def reset(self):
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+
+    def load_asset(self, path, normalization=None):
+        # the compiled library holds the asset already normalized
+        return asset_library.load_asset(path, normalization)
+
+    def wrap(self, name, asset):
+        root = bpy.data.objects.new(name, None)
+
+        # the import collection becomes the asset's prototype; scenes place it through collection instances
+        asset.collection.name = name
+        asset.collection.objects.link(root)
+
+        for obj in asset.roots:
+            obj.parent = root
+
+        return root
+
+    def store(self, asset):
+        # only objects in the view layer get evaluated, so callers measure before storing
+        bpy.context.scene.collection.children.unlink(asset.collection)
+        asset.collection.use_fake_user = True  # kept alive by us, not by the scene
+
+    def instance(self, name, asset):
+        """ one placement = an empty instancing the prototype; every placement shares its mesh/material data """
+        placement = bpy.data.objects.new(name, None)
+        placement.instance_type = 'COLLECTION'
+        placement.instance_collection = asset.collection
+        bpy.context.scene.collection.objects.link(placement)
+        return placement
+
+    def remove(self, obj):
+        action = obj.animation_data.action if obj.animation_data else None
+        bpy.data.objects.remove(obj, do_unlink=True)
+        if action and action.users == 0:
+            bpy.data.actions.remove(action)
+
+    def bbox(self, obj, exact=False):
+        return get_combined_bbox(obj, exact=exact)
+
+    def set_location(self, obj, location):
+        obj.location = Vector(location)
+
+    def set_rotation(self, obj, rotation):
+        obj.rotation_mode = "XYZ"
+        obj.rotation_euler = rotation
+
+    def scale(self, obj, factor):
+        obj.scale *= factor
+
+    def set_scale(self, obj, scale):
+        obj.scale = Vector(scale)
+
+    def attach(self, child, parent, offset):
+        """ like CHILD_OF without set-inverse, but through plain parenting + matrix assignment:
+        no operators, no selection context """
+        child.parent = parent
+        child.matrix_parent_inverse = Matrix.Identity(4)
+
+        # keep the child's own rotation / scale, only its placement becomes parent-relative
+        loc, rot, scale = child.matrix_basis.decompose()
+        child.matrix_basis = Matrix.LocRotScale(Vector(offset), rot, scale)
+
+    def update(self):
+        bpy.context.view_layer.update()
+
+    def keyframe(self, obj, data_path, frames, values):
+        write_keyframes(obj, data_path, frames, values)
+
+    def set_frame_range(self, start, end):
+        bpy.context.scene.frame_start = start
+        bpy.context.scene.frame_end = end
+
+    def render(self, directory):
+        """ PNG sequence into directory/frame_####.png """
+        scene = bpy.context.scene
+
+        if scene.camera is None:
+            # created once and kept for the whole batch, like the assets
+            cam = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+            sun = bpy.data.objects.new("Sun", bpy.data.lights.new("Sun", type="SUN"))
+            scene.collection.objects.link(cam)
+            scene.collection.objects.link(sun)
+            cam.location = (12, -12, 8)
+            cam.rotation_euler = (Vector((0, 0, 0)) - cam.location).to_track_quat("-Z", "Y").to_euler()
+            scene.camera = cam
+
+        scene.render.image_settings.file_format = "PNG"
+        scene.render.filepath = os.path.join(directory, "frame_")
+        bpy.ops.render.render(animation=True)
+        print("Rendered:", scene.render.filepath)
@@ -1,13 +1,25 @@
 # mvp/engine_v1_scene_builder.py
-""" script to build the scene in Blender based on the manifest generated by the planner. """
+""" script to build the scene in Blender based on the manifest generated by the planner.
+batch mode builds many scene manifests in one Blender session, keeping loaded assets resident between scenes.
+all scene work goes through a scene_backend, so `--backend stub` runs the same build without Blender. """
 
-import bpy
 import json
 import os
-from mathutils import Vector
-
-ASSETS_ROOT = "assets"
-MANIFEST_PATH = os.path.join(ASSETS_ROOT, "manifests", "scene_auto.scene.json")
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import asset_index
+import normalization
+import scene_backend
+import scene_plan
+import timing
+from timing import stage
+
+ASSETS_ROOT = asset_index.ASSETS_ROOT
+MANIFEST_PATH = os.path.join(ASSETS_ROOT, "manifests", "scene_auto" + scene_plan.PLAN_EXT)
+INDEX_PATH = os.path.join(ASSETS_ROOT, "manifests", asset_index.INDEX_FILENAME)
+OUTPUT_DIR = "outputs"
+TIMINGS_PATH = os.path.join(OUTPUT_DIR, "timings.jsonl")   # one JSON line of stage timings per scene
 
 ASSET_FILES = {
     "kid_1": "kid.glb",
@@ -15,150 +27,263 @@ ASSET_FILES = {
     "court_1": "court.glb"
 }
 
+# real-world size references for assets without a manifest (the sizes used before normalization moved to ingest)
 TARGET_SIZES = {
-    "kid_1": 1.2,
-    "ball_1": 0.24,
-    "court_1": 15.0
+    "kid_1": {"dimension": "height", "size": 1.2},
+    "ball_1": {"dimension": "height", "size": 0.24},
+    "court_1": {"dimension": "footprint", "size": 15.0}
 }
 
-bpy.ops.wm.read_factory_settings(use_empty=True)
-
-
-def import_asset(filepath):
-    before = set(bpy.data.objects)
-
-    if filepath.lower().endswith(".fbx"):
-        bpy.ops.import_scene.fbx(filepath=filepath)
-    elif filepath.lower().endswith(".glb") or filepath.lower().endswith(".gltf"):
-        bpy.ops.import_scene.gltf(filepath=filepath)
-    else:
-        raise Exception("Unsupported format")
-
-    after = set(bpy.data.objects)
-    return list(after - before)
-
-
-def wrap_asset(asset_id, objects):
-    root_name = f"ASSET_{asset_id.upper()}"
-    root = bpy.data.objects.new(root_name, None)
-    bpy.context.scene.collection.objects.link(root)
-
-    for obj in objects:
-        if obj.parent is None:
-            obj.parent = root
-
-    return root
-
-
-def get_combined_bbox(obj):
-    meshes = [o for o in obj.children_recursive if o.type == 'MESH']
-    if not meshes:
-        return None
-
-    min_v = Vector((1e9, 1e9, 1e9))
-    max_v = Vector((-1e9, -1e9, -1e9))
-
-    for m in meshes:
-        for corner in m.bound_box:
-            world_corner = m.matrix_world @ Vector(corner)
-            min_v = Vector(map(min, min_v, world_corner))
-            max_v = Vector(map(max, max_v, world_corner))
-
-    return min_v, max_v
-
-
-def normalize_asset(root, asset_id):
-    bpy.context.view_layer.update()
-
-    bbox = get_combined_bbox(root)
-    if not bbox:
-        return
-
-    min_v, max_v = bbox
-    size_vec = max_v - min_v
-
-    if asset_id == "court_1":
-        current_size = max(size_vec.x, size_vec.y)
-    else:
-        current_size = size_vec.z
-
-    if current_size == 0:
+# asset_id -> its manifest (with the "normalization" computed at ingest), read from the index on first use
+MANIFESTS = {}
+
+# the scene_backend everything below builds through; set by use_backend()
+backend = None
+
+
+def use_backend(name=None):
+    """ switch to a fresh, empty backend (scene_backend.BACKENDS name) and forget resident assets """
+    global backend
+    backend = scene_backend.get_backend(name)
+    backend.reset()
+    RESIDENT.clear()
+    PLACEMENTS.clear()
+    return backend
+
+
+def wrap_asset(asset_id, imported):
+    return backend.wrap(f"PROTO_{asset_id.upper()}", imported)
+
+
+def get_manifest(asset_id):
+    """ the indexed manifest (mvp_with_manifest.py), or a stand-in; either gets the asset's TARGET_SIZES reference
+    if it has none of its own """
+    if asset_id not in MANIFESTS:
+        manifest = None
+        if os.path.exists(INDEX_PATH):
+            conn = asset_index.open_index(INDEX_PATH)
+            manifest = asset_index.get(conn, asset_id)
+            conn.close()
+        manifest = manifest or {"asset_id": asset_id}
+        if not manifest.get("reference") and asset_id in TARGET_SIZES:
+            manifest["reference"] = TARGET_SIZES[asset_id]
+        MANIFESTS[asset_id] = manifest
+    return MANIFESTS[asset_id]
+
+
+def current_normalization(asset_id, filepath):
+    """ the manifest's normalization if it is current for `filepath` (see normalization.is_current), else None;
+    a file unchanged since ingest isn't hashed again, the index's hash of it stands in """
+    manifest = get_manifest(asset_id)
+    content_hash = None
+    if os.path.exists(INDEX_PATH):
+        conn = asset_index.open_index(INDEX_PATH)
+        content_hash = asset_index.indexed_hash(conn, asset_id, filepath)
+        conn.close()
+
+    norm = manifest.get("normalization")
+    return norm if normalization.is_current(norm, filepath, manifest, content_hash) else None
+
+
+def normalize_asset(root, asset_id, filepath):
+    """ measure + apply the normalization of an asset loaded without a current one """
+    manifest = get_manifest(asset_id)
+    # not ingested, or ingested from another file / metadata / version: measure it once this session
+    print(f"[WARN] {asset_id}: no current normalization for {filepath} in the asset index; "
+          f"run mvp_with_manifest.py")
+    norm = manifest["normalization"] = normalization.measure(backend, root, manifest, filepath)
+    if norm is None:
         return
 
-    target = TARGET_SIZES.get(asset_id)
-    if not target:
-        return
-
-    scale_factor = target / current_size
-    root.scale *= scale_factor
-
-    bpy.context.view_layer.update()
-    print(f"Normalized {asset_id} scale → factor {scale_factor:.3f}")
-
-
-def apply_attachment(child_obj, parent_obj, offset):
-    constraint = child_obj.constraints.new(type='CHILD_OF')
-    constraint.target = parent_obj
-
-    child_obj.location = Vector(offset)
-
-    bpy.context.view_layer.update()
-    bpy.ops.object.select_all(action='DESELECT')
-    child_obj.select_set(True)
-    bpy.context.view_layer.objects.active = child_obj
-    bpy.ops.object.visual_transform_apply()
-
-
-with open(MANIFEST_PATH) as f:
-    scene_manifest = json.load(f)
-
-ASSETS = {}
-
-for asset_id, asset_data in scene_manifest["assets"].items():
-    filepath = os.path.join(ASSETS_ROOT, ASSET_FILES[asset_id])
-    print("Importing:", filepath)
-
-    objs = import_asset(filepath)
-    root = wrap_asset(asset_id, objs)
+    normalization.apply(backend, root, norm)
+    print(f"Normalized {asset_id} scale → factor {norm['scale_factor']:.3f}")
 
-    normalize_asset(root, asset_id)
 
-    root.location = Vector(asset_data["location"])
+def apply_attachments(assets, attachments):
+    """ hold each child at `offset` in its parent's space (see SceneBackend.attach), one update for the whole batch """
+    for attach in attachments:
+        child = assets[attach["child"]]
+        parent = assets[attach["parent"]]
+        offset = attach.get("offset", [0, 0, 0])
 
-    ASSETS[asset_id] = root
+        print(f"Attaching {attach['child']} → {attach['parent']}")
+        backend.attach(child, parent, offset)
 
+    if attachments:
+        backend.update()
 
-for attach in scene_manifest.get("attachments", []):
-    child = ASSETS[attach["child"]]
-    parent = ASSETS[attach["parent"]]
-    offset = attach.get("offset", [0, 0, 0])
 
-    print(f"Attaching {attach['child']} → {attach['parent']}")
-    apply_attachment(child, parent, offset)
-
-
-bpy.context.scene.frame_start = scene_manifest["frame_start"]
-bpy.context.scene.frame_end = scene_manifest["frame_end"]
-
-
-def animate_linear_move(obj, start, end, f1, f2):
-    obj.location = Vector(start)
-    obj.keyframe_insert(data_path="location", frame=f1)
-
-    obj.location = Vector(end)
-    obj.keyframe_insert(data_path="location", frame=f2)
-
-
-for anim in scene_manifest.get("animations", []):
-    obj = ASSETS[anim["asset_id"]]
-
-    if anim["type"] == "linear_move":
-        animate_linear_move(
-            obj,
-            anim["start"],
-            anim["end"],
-            anim["frames"][0],
-            anim["frames"][1]
-        )
-
-print("\nScene Rebuilt Successfully")
+# RESIDENT ASSETS
+# asset_id -> stored prototype asset (normalized, at the origin). Loaded once, survives between scenes in batch mode.
+RESIDENT = {}
+
+# placement empties created for the current scene
+PLACEMENTS = []
+
+
+def get_asset(asset_id):
+    """ prototype for an asset: imported + normalized once per session """
+    if asset_id not in RESIDENT:
+        filepath = os.path.join(ASSETS_ROOT, ASSET_FILES[asset_id])
+        print("Importing:", filepath)
+
+        # an ingested asset comes in already normalized (baked into its compiled library .blend)
+        norm = current_normalization(asset_id, filepath)
+        with stage("import"):
+            imported = backend.load_asset(filepath, norm)
+            root = wrap_asset(asset_id, imported)
+
+        # only un-ingested assets get measured (while still linked)
+        with stage("normalize"):
+            if norm is None:
+                normalize_asset(root, asset_id, filepath)
+        backend.store(imported)
+
+        RESIDENT[asset_id] = imported
+
+    return RESIDENT[asset_id]
+
+
+def place_asset(key, asset_id):
+    """ one placement = an empty instancing the prototype; every placement shares its mesh/material data """
+    placement = backend.instance(f"ASSET_{key.upper()}", get_asset(asset_id))
+    PLACEMENTS.append(placement)
+    return placement
+
+
+def reset_scene():
+    """ drop everything scene-specific (placements + their parenting, keyframes) but keep asset datablocks loaded """
+    for placement in PLACEMENTS:
+        backend.remove(placement)
+    PLACEMENTS.clear()
+
+
+def build_scene(plan):
+    """ build a compiled scene_plan; a JSON scene manifest is compiled (and validated) first """
+    if not scene_plan.is_plan(plan):
+        plan = scene_plan.compile_plan(plan)
+    ASSETS = {}
+
+    # keys are placement names; repeated assets point back at their source via "asset_id"
+    # (placing a new asset also times its import / normalize stages). a placement's scale is on top of the
+    # asset's normalization, which its prototype carries
+    for placement in plan["placements"]:
+        root = place_asset(placement["key"], placement["asset_id"])
+        backend.set_location(root, placement["location"])
+        if any(s != 1.0 for s in placement["scale"]):
+            backend.set_scale(root, placement["scale"])
+        ASSETS[placement["key"]] = root
+
+    with stage("attach"):
+        apply_attachments(ASSETS, plan["attachments"])
+
+    backend.set_frame_range(plan["frame_start"], plan["frame_end"])
+
+    with stage("animate"):
+        for track in plan["tracks"]:
+            backend.keyframe(ASSETS[track["target"]], track["data_path"], track["frames"], scene_plan.track_rows(track))
+
+    return ASSETS
+
+
+def render_scene(scene_id):
+    """ render the frame range into outputs/<scene_id>/ (a PNG sequence in Blender) """
+    with stage("render"):
+        backend.render(os.path.join(OUTPUT_DIR, scene_id))
+
+
+# MANIFEST SOURCES
+def iter_manifests(sources):
+    """ yield compiled plans from .splan files, scene manifests from .json / .jsonl files, both from directories of
+    *.splan / *.scene.json, and either from "-" (a plan stream or JSONL on stdin) """
+    for source in sources:
+        if source == "-":
+            if sys.stdin.buffer.peek(len(scene_plan.MAGIC))[:len(scene_plan.MAGIC)] == scene_plan.MAGIC:
+                yield from scene_plan.read_plans("-")
+                continue
+            for line in sys.stdin:
+                if line.strip():
+                    yield json.loads(line)
+        elif os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.endswith(scene_plan.PLAN_EXT):
+                    yield from scene_plan.read_plans(os.path.join(source, name))
+                elif name.endswith(".scene.json"):
+                    with open(os.path.join(source, name)) as f:
+                        yield json.load(f)
+        elif source.endswith(scene_plan.PLAN_EXT):
+            yield from scene_plan.read_plans(source)
+        elif source.endswith(".jsonl"):
+            with open(source) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            with open(source) as f:
+                yield json.load(f)
+
+
+def run_batch(sources, render=False, cprofile=False):
+    """ build (and optionally render) every manifest; per-scene stage timings go to TIMINGS_PATH and,
+    with cprofile, a cProfile dump per scene to outputs/profiles/<scene_id>.prof """
+    built, failed = 0, []
+    seen_ids = set()
+
+    for i, scene_manifest in enumerate(iter_manifests(sources)):
+        scene_id = scene_manifest.get("scene_id", "scene")
+        if scene_id in seen_ids:
+            scene_id = f"{scene_id}_{i:05d}"
+        seen_ids.add(scene_id)
+
+        print(f"\n=== Scene {i}: {scene_id} ===")
+        profile_path = os.path.join(OUTPUT_DIR, "profiles", scene_id + ".prof") if cprofile else None
+        record = None
+        try:
+            with timing.job(scene_id) as record, timing.profiled(profile_path):
+                reset_scene()
+                record.fields["assets"] = len(build_scene(scene_manifest))
+                if render:
+                    render_scene(scene_id)
+            built += 1
+        except Exception as e:
+            # one bad manifest shouldn't sink a nightly batch
+            print(f"[FAILED] {scene_id}: {e}")
+            failed.append(scene_id)
+        if record is not None:
+            timing.write_record(record, TIMINGS_PATH)
+
+    print(f"\nBatch done: {built} built, {len(failed)} failed")
+    for scene_id in failed:
+        print("  failed:", scene_id)
+
+
+# Usage:
+#   blender -b -P engine_v1_scene_builder.py                          (MANIFEST_PATH, like before)
+#   blender -b -P engine_v1_scene_builder.py -- manifests/ more.splan   (batch; .json / .jsonl manifests too)
+#   ... -- --render -                                                  (JSONL on stdin, render each scene)
+#   ... -- --cprofile manifests/                                       (+ cProfile dump per scene)
+#   python engine_v1_scene_builder.py --backend stub manifests/         (no Blender: in-memory stub backend)
+# --backend picks the scene_backend; it defaults to "blender" inside Blender and "stub" outside it
+if __name__ == "__main__":
+    in_blender = "bpy" in sys.modules
+    if "--" in sys.argv:
+        args = sys.argv[sys.argv.index("--") + 1:]
+    else:
+        args = [] if in_blender else sys.argv[1:]
+
+    backend_name = None
+    if "--backend" in args:
+        i = args.index("--backend")
+        backend_name = args[i + 1]
+        del args[i:i + 2]
+    use_backend(backend_name or ("blender" if in_blender else "stub"))
+
+    render = "--render" in args
+    cprofile = "--cprofile" in args
+    sources = [a for a in args if a not in ("--render", "--cprofile")] or [MANIFEST_PATH]
+
+    if not args:
+        build_scene(scene_plan.load_plan(MANIFEST_PATH))
+        print("\nScene Rebuilt Successfully")
+    else:
+        run_batch(sources, render=render, cprofile=cprofile)
@@ -0,0 +1,62 @@
+# mvp/frame_manifest.py
+""" per-frame manifest of a rendered PNG sequence: <dir>/manifest.jsonl gets one {"frame", "size"} line as each
+frame file is finished. pure Python (no bpy) so both the Blender side (frame_range.py) and the runner
+(frame_shards.py) can tell which frames of an interrupted render are done. """
+
+import json
+import os
+
+SEQUENCE_PREFIX = "frame_"  # Blender appends the 4-digit frame number: frame_0001.png
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def frame_path(directory, frame):
+    return os.path.join(directory, f"{SEQUENCE_PREFIX}{frame:04d}.png")
+
+
+def record_frame(directory, frame):
+    line = json.dumps({"frame": frame, "size": os.path.getsize(frame_path(directory, frame))}) + "\n"
+
+    # one short O_APPEND write per frame, so parallel shards can share the manifest
+    fd = os.open(os.path.join(directory, MANIFEST_NAME), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode())
+    finally:
+        os.close(fd)
+
+
+def completed_frames(directory):
+    """ frame -> size for every recorded frame whose file is still on disk at that size """
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+
+    done = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            done[entry["frame"]] = entry["size"]
+
+    return {
+        frame: size for frame, size in done.items()
+        if os.path.exists(frame_path(directory, frame)) and os.path.getsize(frame_path(directory, frame)) == size
+    }
+
+
+def missing_frames(directory, frame_start, frame_end):
+    done = completed_frames(directory)
+    return [f for f in range(frame_start, frame_end + 1) if f not in done]
+
+
+def frame_runs(frames):
+    """ sorted frame numbers -> contiguous inclusive (start, end) runs """
+    runs = []
+    for f in frames:
+        if runs and f == runs[-1][1] + 1:
+            runs[-1][1] = f
+        else:
+            runs.append([f, f])
+    return [tuple(r) for r in runs]
@@ -0,0 +1,79 @@
+# mvp/frame_range.py
+""" sharded animation renders, Blender side: render one frame range to a PNG sequence instead of the whole
+animation into one FFMPEG container, so several processes (or VMs) can split an animation and a final
+ffmpeg step encodes the joined sequence (see vm instance files/frame_shards.py).
+every finished frame is recorded in the sequence's frame manifest (frame_manifest.py), so a crashed or
+preempted render resumes with only the frames that are missing from it. """
+
+import os
+import sys
+
+import bpy
+
+from frame_manifest import SEQUENCE_PREFIX, completed_frames, frame_path, record_frame
+from render_profiles import apply_render_settings, profile_args
+
+
+def shard_args(argv=None):
+    """ (frame_start, frame_end, sequence_dir) from `-- ... --frames START END --sequence DIR`, or None """
+    argv = sys.argv if argv is None else argv
+    if "--" not in argv:
+        return None
+    args = argv[argv.index("--") + 1:]
+    if "--frames" not in args or "--sequence" not in args:
+        return None
+
+    i = args.index("--frames")
+    start, end = int(args[i + 1]), int(args[i + 2])
+    return start, end, args[args.index("--sequence") + 1]
+
+
+def render_sequence(scene, frame_start, frame_end, directory):
+    """ render frame_start..frame_end (inclusive) of `scene` to directory/frame_####.png,
+    skipping frames a previous run already finished """
+    os.makedirs(directory, exist_ok=True)
+
+    # files without a manifest entry were cut off mid-write; drop them so Blender redraws them
+    done = completed_frames(directory)
+    for frame in range(frame_start, frame_end + 1):
+        if frame not in done and os.path.exists(frame_path(directory, frame)):
+            os.remove(frame_path(directory, frame))
+
+    todo = [f for f in range(frame_start, frame_end + 1) if f not in done]
+    if not todo:
+        print(f"Frames {frame_start}-{frame_end} already rendered in {directory}")
+        return
+
+    scene.frame_start = todo[0]
+    scene.frame_end = todo[-1]
+    scene.render.image_settings.file_format = 'PNG'
+    scene.render.filepath = os.path.join(directory, SEQUENCE_PREFIX)
+    scene.render.use_overwrite = False  # finished frames in between are skipped
+    scene.render.use_placeholder = False
+
+    def handler(scene, *args):
+        # render_write runs once the frame's file is fully written
+        record_frame(directory, scene.frame_current)
+
+    bpy.app.handlers.render_write.append(handler)
+    try:
+        print(f"Rendering {len(todo)} frames of {frame_start}-{frame_end} to {directory}")
+        bpy.ops.render.render(animation=True)
+    finally:
+        bpy.app.handlers.render_write.remove(handler)
+
+
+def render_animation(scene):
+    """ drop-in for bpy.ops.render.render(animation=True) in the step scripts: renders the configured
+    video as before, or only the shard passed on the command line by frame_shards.py.
+    `--profile NAME` / `--time-budget SECONDS` replace the script's own quality settings (engine kept) """
+    profile, time_budget = profile_args()
+    if profile or time_budget:
+        apply_render_settings(scene, {"base": profile, "engine": scene.render.engine}, time_budget)
+
+    shard = shard_args()
+    if shard is None:
+        bpy.ops.render.render(animation=True)
+        return
+
+    render_sequence(scene, *shard)
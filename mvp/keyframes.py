@@ -0,0 +1,112 @@
+# mvp/keyframes.py
+""" batched keyframe writer: whole key arrays go straight into fcurves via keyframe_points.add(n) + foreach_set,
+instead of one obj.keyframe_insert() (and a Python loop over keyframe_points) per key. """
+
+import bpy
+import numpy as np
+
+DEFAULT_INTERPOLATION = 'BEZIER'
+FRAME_EPSILON = 0.01   # keys closer than this are the same key, as keyframe_insert treats them
+
+
+def ensure_action(obj):
+    anim = obj.animation_data or obj.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{obj.name}Action")
+    return anim.action
+
+
+def ensure_fcurve(obj, action, data_path, index):
+    # Blender 4.4+ (slotted actions) wants fcurves created through the datablock's slot
+    if hasattr(action, "fcurve_ensure_for_datablock"):
+        return action.fcurve_ensure_for_datablock(obj, data_path, index=index)
+
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index)
+    return fcurve
+
+
+def _merge_targets(old_frames, frames):
+    """ for each new key, the index of the old key at the same frame (within FRAME_EPSILON), else -1 """
+    targets = np.full(len(frames), -1)
+    if not len(old_frames):
+        return targets
+    order = np.argsort(old_frames, kind="stable")
+    ordered = old_frames[order]
+    hi = np.clip(np.searchsorted(ordered, frames), 0, len(ordered) - 1)
+    lo = np.clip(hi - 1, 0, len(ordered) - 1)
+    nearest = np.where(np.abs(ordered[lo] - frames) < np.abs(ordered[hi] - frames), lo, hi)
+    match = np.abs(ordered[nearest] - frames) < FRAME_EPSILON
+    targets[match] = order[nearest[match]]
+    return targets
+
+
+def _last_per_frame(frames):
+    """ indices of the keys to keep when the same frame (within FRAME_EPSILON) is given more than once: the last """
+    order = np.argsort(frames, kind="stable")
+    starts = np.flatnonzero(np.diff(frames[order], prepend=-np.inf) >= FRAME_EPSILON)
+    return np.sort(np.maximum.reduceat(order, starts))
+
+
+def fill_fcurve(fcurve, frames, values, interpolation=DEFAULT_INTERPOLATION):
+    """ write (frame, value) keys into one fcurve; `interpolation` is one name or one per key.
+    like keyframe_insert, a frame that is already keyed gets the new value instead of a second key (and a frame
+    given twice keeps the last) """
+    points = fcurve.keyframe_points
+    existing = len(points)
+    if not len(frames):
+        return fcurve
+
+    co = np.empty((len(frames), 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    interps = [interpolation] * len(co) if isinstance(interpolation, str) else list(interpolation)
+
+    keep = _last_per_frame(co[:, 0])
+    co, interps = co[keep], [interps[i] for i in keep]
+
+    # foreach_set covers the whole collection, so carry the old keys along, overwriting the re-keyed ones
+    old = np.empty(existing * 2, dtype=np.float32)
+    if existing:
+        points.foreach_get("co", old)
+    old = old.reshape(-1, 2)
+    targets = _merge_targets(old[:, 0], co[:, 0])
+    replaced = targets >= 0
+    old[targets[replaced]] = co[replaced]
+    added = np.flatnonzero(~replaced)
+
+    if len(added):
+        points.add(len(added))
+    points.foreach_set("co", np.concatenate([old, co[added]]).ravel())
+
+    # enums can't go through foreach_set; new keys get the user-pref default (BEZIER), so usually nothing to do
+    for i in np.flatnonzero(replaced):
+        points[targets[i]].interpolation = interps[i]
+    if isinstance(interpolation, str):
+        if len(added) and points[existing].interpolation != interpolation:
+            for i in range(existing, len(points)):
+                points[i].interpolation = interpolation
+    else:
+        for j, i in enumerate(added):
+            points[existing + j].interpolation = interps[i]
+
+    fcurve.update()  # sorts keys and recalculates auto handles once
+    return fcurve
+
+
+def write_keyframes(obj, data_path, frames, values, interpolation=DEFAULT_INTERPOLATION):
+    """ key `data_path` on obj at every frame in one go.
+    values: shape (n,) for a scalar property, (n, k) for array properties like location / scale """
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32)
+    if values.ndim == 1:
+        values = values[:, None]
+    if len(frames) != len(values):
+        raise Exception(f"{data_path}: {len(frames)} frames but {len(values)} values")
+
+    action = ensure_action(obj)
+    return [
+        fill_fcurve(ensure_fcurve(obj, action, data_path, i), frames, values[:, i], interpolation)
+        for i in range(values.shape[1])
+    ]
@@ -3,27 +3,19 @@
 test script to import 3 assets, normalize their scale, and animate them moving across the scene."""
 
 import bpy
+import os
+import sys
 from mathutils import Vector
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from asset_import import import_asset
+from bbox import get_combined_bbox
+from keyframes import write_keyframes
+
 # RESET SCENE
 bpy.ops.wm.read_factory_settings(use_empty=True)
 
 
-# IMPORT ASSET AND DETECT NEW OBJECTS
-def import_asset(path):
-    before = set(bpy.data.objects)
-
-    if path.lower().endswith(".fbx"):
-        bpy.ops.import_scene.fbx(filepath=path)
-    elif path.lower().endswith(".glb") or path.lower().endswith(".gltf"):
-        bpy.ops.import_scene.gltf(filepath=path)
-    else:
-        raise Exception("Unsupported format: " + path)
-
-    after = set(bpy.data.objects)
-    return list(after - before)
-
-
 # SAFE WRAP (PRESERVE INTERNAL HIERARCHY)
 def wrap_asset(name, objects):
     root = bpy.data.objects.new(name, None)
@@ -44,24 +36,6 @@ def apply_transforms(obj):
     obj.select_set(False)
 
 
-# COMBINED BOUNDING BOX (ALL CHILD MESHES)
-def get_combined_bbox(obj):
-    meshes = [o for o in obj.children_recursive if o.type == 'MESH']
-    if not meshes:
-        return None
-
-    min_v = Vector((1e9, 1e9, 1e9))
-    max_v = Vector((-1e9, -1e9, -1e9))
-
-    for m in meshes:
-        for corner in m.bound_box:
-            world_corner = m.matrix_world @ Vector(corner)
-            min_v = Vector(map(min, min_v, world_corner))
-            max_v = Vector(map(max, max_v, world_corner))
-
-    return min_v, max_v
-
-
 # NORMALIZE HEIGHT
 def normalize_height(root, target_height):
     bpy.context.view_layer.update()
@@ -92,17 +66,13 @@ def debug_height(name, root):
 
 # SIMPLE MOVE ANIMATION
 def animate_move(obj, start, end, frame_start, frame_end):
-    obj.location = start
-    obj.keyframe_insert(data_path="location", frame=frame_start)
-
-    obj.location = end
-    obj.keyframe_insert(data_path="location", frame=frame_end)
+    write_keyframes(obj, "location", [frame_start, frame_end], [start, end])
 
 
 # IMPORT YOUR ASSETS (EDIT PATHS)
-kid_objs = import_asset("assets/kid.glb")
-ball_objs = import_asset("assets/ball.glb")
-court_objs = import_asset("assets/court.glb")
+kid_objs = import_asset("assets/kid.glb").roots
+ball_objs = import_asset("assets/ball.glb").roots
+court_objs = import_asset("assets/court.glb").roots
 
 kid = wrap_asset("ASSET_KID", kid_objs)
 ball = wrap_asset("ASSET_BALL", ball_objs)
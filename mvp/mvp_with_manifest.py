@@ -1,13 +1,20 @@
 # mvp/mvp_with_manifest.py
 """ load multiple assets, standardize them, generate manifests, and create a simple animated scene """
 import bpy
-import json
 import os
+import sys
 from mathutils import Vector
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import asset_index
+import asset_library
+import normalization
+from bbox import get_combined_bbox
+from keyframes import write_keyframes
+
 # CONFIG
 
-ASSETS_ROOT = "assets"
+ASSETS_ROOT = asset_index.ASSETS_ROOT
 
 ASSET_FILES = {
     "kid_1": "kid.fbx",
@@ -15,30 +22,29 @@ ASSET_FILES = {
     "court_1": "court.fbx"
 }
 
+# planner lookups by type / tag go through the index; "reference" is the real-world size normalization
+# scales to (see normalization.py; "units" and "up_axis" may be declared too, otherwise they're detected)
+ASSET_META = {
+    "kid_1": {"type": "character", "tags": ["kid", "actor"], "reference": {"dimension": "height", "size": 1.2}},
+    "ball_1": {"type": "prop", "tags": ["ball", "holdable"], "reference": {"dimension": "height", "size": 0.24}},
+    "court_1": {"type": "environment", "tags": ["court", "ground"],
+                "reference": {"dimension": "footprint", "size": 15.0}}
+}
+
 MANIFEST_DIR = os.path.join(ASSETS_ROOT, "manifests")
+INDEX_PATH = os.path.join(MANIFEST_DIR, asset_index.INDEX_FILENAME)
 os.makedirs(MANIFEST_DIR, exist_ok=True)
 
+# Usage: blender -b -P mvp_with_manifest.py [-- --index-only]
+# --index-only refreshes the index and skips the demo scene, so unchanged assets aren't loaded at all
+INDEX_ONLY = "--index-only" in sys.argv
+
 
 # RESET SCENE
 
 bpy.ops.wm.read_factory_settings(use_empty=True)
 
 
-# IMPORT ASSET
-def import_asset(path):
-    before = set(bpy.data.objects)
-
-    if path.lower().endswith(".fbx"):
-        bpy.ops.import_scene.fbx(filepath=path)
-    elif path.lower().endswith(".glb") or path.lower().endswith(".gltf"):
-        bpy.ops.import_scene.gltf(filepath=path)
-    else:
-        raise Exception("Unsupported format: " + path)
-
-    after = set(bpy.data.objects)
-    return list(after - before)
-
-
 # SAFE WRAP (PRESERVE INTERNAL HIERARCHY)
 def wrap_asset(name, objects):
     root = bpy.data.objects.new(name, None)
@@ -59,121 +65,119 @@ def apply_transforms(obj):
     obj.select_set(False)
 
 
-# COMBINED BOUNDING BOX
-def get_combined_bbox(obj):
-    meshes = [o for o in obj.children_recursive if o.type == 'MESH']
-    if not meshes:
-        return None
-
-    min_v = Vector((1e9, 1e9, 1e9))
-    max_v = Vector((-1e9, -1e9, -1e9))
-
-    for m in meshes:
-        for corner in m.bound_box:
-            world_corner = m.matrix_world @ Vector(corner)
-            min_v = Vector(map(min, min_v, world_corner))
-            max_v = Vector(map(max, max_v, world_corner))
-
-    return min_v, max_v
-
-
-# NORMALIZE HEIGHT
-def normalize_height(root, target_height):
+# NORMALIZE (measured once here, stored in the manifest, applied by the engine without measuring)
+def measure_normalization(root, meta, source_path):
     bpy.context.view_layer.update()
 
     bbox = get_combined_bbox(root)
     if not bbox:
-        return
+        return None
+    return normalization.stamp(normalization.compute(bbox[0], bbox[1], meta), source_path, meta)
 
-    min_v, max_v = bbox
-    height = max_v.z - min_v.z
-    if height == 0:
-        return
 
-    scale_factor = target_height / height
-    root.scale *= scale_factor
+def apply_normalization(root, norm):
+    if any(norm["rotation"]):
+        root.rotation_mode = "XYZ"
+        root.rotation_euler = norm["rotation"]
+    root.scale *= norm["scale_factor"]
 
 
 # MANIFEST GENERATOR
-def generate_manifest(asset_id, root):
+def generate_manifest(index, asset_id, root, source_path, norm):
     meshes = [o.name for o in root.children_recursive if o.type == 'MESH']
     armatures = [o.name for o in root.children_recursive if o.type == 'ARMATURE']
 
-    bbox = get_combined_bbox(root)
-    height = None
-    if bbox:
-        min_v, max_v = bbox
-        height = float(max_v.z - min_v.z)
+    # the normalized size follows from the measurement, no need to measure again
+    dimensions = norm["dimensions"] if norm else None
+    height = dimensions[2] if dimensions else None
 
     manifest = {
         "asset_id": asset_id,
         "root_object": root.name,
+        "type": ASSET_META.get(asset_id, {}).get("type"),
+        "tags": ASSET_META.get(asset_id, {}).get("tags", []),
+        # what the normalization was computed from (normalization.META_FIELDS)
+        "reference": ASSET_META.get(asset_id, {}).get("reference"),
+        "units": ASSET_META.get(asset_id, {}).get("units"),
+        "up_axis": ASSET_META.get(asset_id, {}).get("up_axis"),
         "meshes": meshes,
         "mesh_count": len(meshes),
         "has_armature": len(armatures) > 0,
         "armatures": armatures,
         "height": height,
+        "dimensions": dimensions,
+        # where objects placed "on" it stand, above its base (optional, see placement.surface_height)
+        "surface_height": ASSET_META.get(asset_id, {}).get("surface_height"),
+        "scale_factor": norm["scale_factor"] if norm else 1.0,
+        "normalization": norm,
         "object_count": len(root.children_recursive),
     }
 
-    path = os.path.join(MANIFEST_DIR, f"{asset_id}.json")
-    with open(path, "w") as f:
-        json.dump(manifest, f, indent=2)
+    asset_index.put(index, manifest, source_path)
 
-    print("Manifest saved:", path)
+    print("Manifest indexed:", asset_id)
     return manifest
 
 
-# IMPORT + STANDARDIZE + MANIFEST
+# SIMPLE WORLD-SPACE ANIMATION
+def animate_move(obj, start, end, f1, f2):
+    write_keyframes(obj, "location", [f1, f2], [start, end])
 
+
+# IMPORT + STANDARDIZE + MANIFEST (only new / changed assets are re-measured)
+
+index = asset_index.open_index(INDEX_PATH)
 ASSETS = {}
 
 for asset_id, filename in ASSET_FILES.items():
 
     full_path = os.path.join(ASSETS_ROOT, filename)
+    meta = ASSET_META.get(asset_id, {})
+    # re-measure on a new source file, changed metadata (e.g. its reference size) or a new normalization version
+    changed = asset_index.needs_update(index, asset_id, full_path) or not normalization.is_current(
+        asset_index.get(index, asset_id).get("normalization"), full_path, meta
+    )
+
+    if not changed and INDEX_ONLY:
+        print("Up to date:", asset_id)
+        continue
+
     print("\nImporting:", asset_id, "from", full_path)
 
-    objs = import_asset(full_path)
-    root = wrap_asset(f"ASSET_{asset_id.upper()}", objs)
+    imported = asset_library.load_asset(full_path)
+    root = wrap_asset(f"ASSET_{asset_id.upper()}", imported.roots)
 
-    apply_transforms(root)
+    if changed:
+        apply_transforms(root)
 
-    # Normalize based on type
-    if "kid" in asset_id:
-        normalize_height(root, 1.2)
-    elif "ball" in asset_id:
-        normalize_height(root, 0.24)
+        norm = measure_normalization(root, meta, full_path)
+        if norm:
+            apply_normalization(root, norm)
+        generate_manifest(index, asset_id, root, full_path, norm)
     else:
-        normalize_height(root, 10.0)
+        # reuse the indexed normalization instead of re-measuring
+        norm = asset_index.get(index, asset_id).get("normalization")
+        if norm:
+            apply_normalization(root, norm)
 
-    manifest = generate_manifest(asset_id, root)
     ASSETS[asset_id] = root
 
 
 # SIMPLE SCENE ASSEMBLY
 
-court = ASSETS["court_1"]
-kid = ASSETS["kid_1"]
-ball = ASSETS["ball_1"]
-
-court.location = (0, 0, 0)
-kid.location = (0, 0, 0)
-ball.location = (0.3, 0, 1)
-
-
-# SIMPLE WORLD-SPACE ANIMATION
-def animate_move(obj, start, end, f1, f2):
-    obj.location = start
-    obj.keyframe_insert(data_path="location", frame=f1)
-
-    obj.location = end
-    obj.keyframe_insert(data_path="location", frame=f2)
+if not INDEX_ONLY:
+    court = ASSETS["court_1"]
+    kid = ASSETS["kid_1"]
+    ball = ASSETS["ball_1"]
 
+    court.location = (0, 0, 0)
+    kid.location = (0, 0, 0)
+    ball.location = (0.3, 0, 1)
 
-bpy.context.scene.frame_start = 1
-bpy.context.scene.frame_end = 120
+    bpy.context.scene.frame_start = 1
+    bpy.context.scene.frame_end = 120
 
-animate_move(kid, Vector((0, 0, 0)), Vector((3, 0, 0)), 1, 120)
-animate_move(ball, Vector((0.3, 0, 1)), Vector((3.3, 0, 1)), 1, 120)
+    animate_move(kid, Vector((0, 0, 0)), Vector((3, 0, 0)), 1, 120)
+    animate_move(ball, Vector((0.3, 0, 1)), Vector((3.3, 0, 1)), 1, 120)
 
 print("\nMVP + Manifest ready")
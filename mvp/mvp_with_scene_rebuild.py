@@ -4,8 +4,15 @@
 import bpy
 import json
 import os
+import sys
 from mathutils import Vector
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from asset_import import import_asset
+from bbox import get_combined_bbox
+from keyframes import write_keyframes
+import scene_plan
+
 # CONFIG
 
 ASSETS_ROOT = "assets"
@@ -25,21 +32,6 @@ os.makedirs(MANIFEST_DIR, exist_ok=True)
 bpy.ops.wm.read_factory_settings(use_empty=True)
 
 
-# IMPORT ASSET
-def import_asset(path):
-    before = set(bpy.data.objects)
-
-    if path.lower().endswith(".fbx"):
-        bpy.ops.import_scene.fbx(filepath=path)
-    elif path.lower().endswith(".glb") or path.lower().endswith(".gltf"):
-        bpy.ops.import_scene.gltf(filepath=path)
-    else:
-        raise Exception("Unsupported format: " + path)
-
-    after = set(bpy.data.objects)
-    return list(after - before)
-
-
 # SAFE WRAP (PRESERVE INTERNAL HIERARCHY)
 def wrap_asset(name, objects):
     root = bpy.data.objects.new(name, None)
@@ -60,24 +52,6 @@ def apply_transforms(obj):
     obj.select_set(False)
 
 
-# COMBINED BOUNDING BOX
-def get_combined_bbox(obj):
-    meshes = [o for o in obj.children_recursive if o.type == 'MESH']
-    if not meshes:
-        return None
-
-    min_v = Vector((1e9, 1e9, 1e9))
-    max_v = Vector((-1e9, -1e9, -1e9))
-
-    for m in meshes:
-        for corner in m.bound_box:
-            world_corner = m.matrix_world @ Vector(corner)
-            min_v = Vector(map(min, min_v, world_corner))
-            max_v = Vector(map(max, max_v, world_corner))
-
-    return min_v, max_v
-
-
 # NORMALIZE HEIGHT
 def normalize_height(root, target_height):
     bpy.context.view_layer.update()
@@ -134,7 +108,7 @@ for asset_id, filename in ASSET_FILES.items():
     full_path = os.path.join(ASSETS_ROOT, filename)
     print("\nImporting:", asset_id, "from", full_path)
 
-    objs = import_asset(full_path)
+    objs = import_asset(full_path).roots
     root = wrap_asset(f"ASSET_{asset_id.upper()}", objs)
 
     apply_transforms(root)
@@ -164,11 +138,7 @@ ball.location = (0.3, 0, 1)
 
 # SIMPLE WORLD-SPACE ANIMATION
 def animate_move(obj, start, end, f1, f2):
-    obj.location = start
-    obj.keyframe_insert(data_path="location", frame=f1)
-
-    obj.location = end
-    obj.keyframe_insert(data_path="location", frame=f2)
+    write_keyframes(obj, "location", [f1, f2], [start, end])
 
 # 
 def save_scene_manifest(scene_id, assets, frame_start, frame_end):
@@ -186,11 +156,8 @@ def save_scene_manifest(scene_id, assets, frame_start, frame_end):
             "scale": list(obj.scale),
         }
 
-    path = os.path.join(MANIFEST_DIR, f"{scene_id}.scene.json")
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
-
-    print("Scene manifest saved:", path)
+    path = os.path.join(MANIFEST_DIR, scene_id + scene_plan.PLAN_EXT)
+    scene_plan.save_plan(path, scene_plan.compile_plan(data))
 
 
 bpy.context.scene.frame_start = 1
@@ -0,0 +1,153 @@
+# mvp/normalization.py
+""" per-asset normalization, computed once at ingest from the imported asset's bounds and the real-world size
+reference in its metadata, and stored in the asset manifest under "normalization":
+    units          the file's unit system (declared, or detected from the reference size)
+    up_axis        the axis the asset stands along as imported ("Z" = already upright)
+    rotation       XYZ euler (radians) turning that axis to +Z
+    reference      which dimension the reference size is of (see REFERENCE_DIMENSIONS) and its size in metres
+    scale_factor   uniform scale bringing the asset to real-world size
+    dimensions     width, depth, height once normalized
+    source_hash    content hash of the file it was measured on
+    meta_hash      hash of the metadata it was computed from (see META_FIELDS)
+at build time it is applied as a plain rotation + scale, without measuring anything, as long as it is current
+(see is_current): same version, same file, same metadata. anything else is measured again. the compiled asset
+library bakes a current normalization into the .blend, so loading from it applies nothing at all.
+pure Python (no bpy). """
+
+import hashlib
+import json
+import math
+
+from asset_index import source_hash
+
+NORMALIZATION_VERSION = 1
+
+# metres per unit
+UNITS = {"m": 1.0, "cm": 0.01, "mm": 0.001, "in": 0.0254}
+
+# reference dimension -> size of the (width, depth, height) it measures
+REFERENCE_DIMENSIONS = {
+    "width": lambda size: size[0],
+    "depth": lambda size: size[1],
+    "height": lambda size: size[2],
+    "footprint": lambda size: max(size[0], size[1]),
+    "longest": lambda size: max(size),
+}
+
+# used when the asset's metadata has no "reference" of its own
+TYPE_REFERENCES = {
+    "character": {"dimension": "height", "size": 1.7},
+    "environment": {"dimension": "footprint", "size": 15.0},
+}
+
+# up axis -> (rotation to +Z, the imported axes that become width, depth, height)
+UP_AXES = {
+    "Z": ((0.0, 0.0, 0.0), (0, 1, 2)),
+    "Y": ((math.pi / 2, 0.0, 0.0), (0, 2, 1)),
+    "X": ((0.0, -math.pi / 2, 0.0), (2, 1, 0)),
+}
+UPRIGHT_TYPES = ("character",)   # types whose up axis is detected: they are taller than wide
+UPRIGHT_RATIO = 1.5              # a lying character is this much longer along its up axis than along Z
+
+META_FIELDS = ("type", "reference", "units", "up_axis")   # the metadata a normalization depends on
+
+
+def reference_of(meta):
+    """ {"dimension", "size"} for an asset's metadata (type, optional "reference"), or None """
+    reference = meta.get("reference") or TYPE_REFERENCES.get(meta.get("type"))
+    if reference is None:
+        return None
+    if reference["dimension"] not in REFERENCE_DIMENSIONS:
+        raise Exception(f"Unknown reference dimension: {reference['dimension']}")
+    return reference
+
+
+def detect_up_axis(size, meta):
+    """ the declared "up_axis", or for upright types the horizontal axis it is clearly longest along """
+    if meta.get("up_axis"):
+        if meta["up_axis"] not in UP_AXES:
+            raise Exception(f"Unknown up axis: {meta['up_axis']}")
+        return meta["up_axis"]
+    if meta.get("type") in UPRIGHT_TYPES:
+        longest = max(range(3), key=lambda i: size[i])
+        if longest != 2 and size[longest] > size[2] * UPRIGHT_RATIO:
+            return "XY"[longest]
+    return "Z"
+
+
+def detect_units(measured, target):
+    """ the unit system in which `measured` (a size in file units) is closest to the real-world `target` """
+    return min(UNITS, key=lambda unit: abs(math.log(measured * UNITS[unit] / target)))
+
+
+def compute(min_v, max_v, meta):
+    """ normalization for an asset whose imported bounds are (min_v, max_v); `meta` is its manifest metadata
+    (type, optional "reference", "units", "up_axis") """
+    up_axis = detect_up_axis([float(max_v[i] - min_v[i]) for i in range(3)], meta)
+    rotation, axes = UP_AXES[up_axis]
+    size = [float(max_v[i] - min_v[i]) for i in axes]
+
+    reference = reference_of(meta)
+    units = meta.get("units")
+    if units is not None and units not in UNITS:
+        raise Exception(f"Unknown units: {units}")
+
+    measured = REFERENCE_DIMENSIONS[reference["dimension"]](size) if reference else 0.0
+    if measured > 0:
+        scale_factor = reference["size"] / measured
+        units = units or detect_units(measured, reference["size"])
+    else:
+        # nothing to measure against: trust the units
+        units = units or "m"
+        scale_factor = UNITS[units]
+
+    return {
+        "version": NORMALIZATION_VERSION,
+        "units": units,
+        "up_axis": up_axis,
+        "rotation": list(rotation),
+        "reference": reference,
+        "scale_factor": scale_factor,
+        "dimensions": [s * scale_factor for s in size],
+    }
+
+
+def meta_hash(meta):
+    relevant = {field: meta.get(field) for field in META_FIELDS}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def stamp(normalization, source_path, meta):
+    """ record what a normalization was computed from, for is_current """
+    normalization["source_hash"] = source_hash(source_path)
+    normalization["meta_hash"] = meta_hash(meta)
+    return normalization
+
+
+def is_current(normalization, source_path, meta, content_hash=None):
+    """ True if `normalization` was computed by this version from this file's content and this metadata;
+    `content_hash` is the file's hash when already known (asset_index.indexed_hash), else it is hashed """
+    return (
+        normalization is not None
+        and normalization.get("version") == NORMALIZATION_VERSION
+        and normalization.get("meta_hash") == meta_hash(meta)
+        and normalization.get("source_hash") == (content_hash or source_hash(source_path))
+    )
+
+
+def measure(backend, root, meta, source_path):
+    """ normalization of a freshly imported, wrapped asset (root still linked to the scene) loaded from
+    `source_path`, or None if it has no meshes; one scene update + bounding box, for ingest """
+    backend.update()
+    bbox = backend.bbox(root)
+    if not bbox:
+        return None
+    return stamp(compute(bbox[0], bbox[1], meta), source_path, meta)
+
+
+def apply(backend, root, normalization):
+    """ rotate + scale the asset's root as stored in its manifest; no scene update needed """
+    if any(normalization["rotation"]):
+        backend.set_rotation(root, normalization["rotation"])
+    if normalization["scale_factor"] != 1.0:
+        backend.scale(root, normalization["scale_factor"])
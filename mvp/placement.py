@@ -0,0 +1,472 @@
+# mvp/placement.py
+""" collision-aware auto placement for the assembler: every object is an axis-aligned footprint (width x depth from
+its asset manifest's dimensions) on a level (the ground, or the top of a surface object), and a uniform-grid
+spatial hash per level answers "does this footprint overlap anything" in O(1) on average.
+the bulk of the props is packed in rows, deepest first (O(n log n) for the sort, rows skip past anything already
+placed). an object and the ones "near" / "on" it form a cluster, laid out around it by spiral search among the
+cluster only and then packed as one footprint, so dependents always get room next to their target and the cost
+stays linear in the number of clusters. only clusters anchored to a fixed object or floor, and objects whose
+constraints span two clusters, are spiral-searched among everything placed.
+pure Python (no bpy). """
+
+import math
+from collections import defaultdict, deque
+
+MARGIN = 0.1                   # gap kept between neighbouring footprints
+DEFAULT_DIMENSIONS = (1.0, 1.0, 1.0)
+MIN_CELL = 0.25
+MAX_RINGS = 4096               # spiral search limit on the unbounded ground
+PACK_SLACK = 1.2               # row width on the open ground, relative to the side of a square of the packed area
+
+GROUND = None                  # level of objects not standing on a surface
+FLOORS = "__floors__"          # level floors are packed on, so they don't overlap each other
+
+
+class Rect:
+    __slots__ = ("min_x", "min_y", "max_x", "max_y")
+
+    def __init__(self, min_x, min_y, max_x, max_y):
+        self.min_x, self.min_y, self.max_x, self.max_y = min_x, min_y, max_x, max_y
+
+    @classmethod
+    def around(cls, x, y, width, depth):
+        return cls(x - width / 2, y - depth / 2, x + width / 2, y + depth / 2)
+
+    def overlaps(self, other):
+        # touching edges don't count
+        return (self.min_x < other.max_x and other.min_x < self.max_x and
+                self.min_y < other.max_y and other.min_y < self.max_y)
+
+    def contains(self, other):
+        return (self.min_x <= other.min_x and other.max_x <= self.max_x and
+                self.min_y <= other.min_y and other.max_y <= self.max_y)
+
+    @property
+    def center(self):
+        return (self.min_x + self.max_x) / 2, (self.min_y + self.max_y) / 2
+
+
+class SpatialGrid:
+    """ uniform grid hash: each rect is listed in every cell it touches """
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.cells = defaultdict(list)
+
+    def _cells(self, rect):
+        c = self.cell
+        for i in range(math.floor(rect.min_x / c), math.floor(rect.max_x / c) + 1):
+            for j in range(math.floor(rect.min_y / c), math.floor(rect.max_y / c) + 1):
+                yield i, j
+
+    def insert(self, rect):
+        for key in self._cells(rect):
+            self.cells[key].append(rect)
+
+    def first_overlap(self, rect):
+        for key in self._cells(rect):
+            for other in self.cells.get(key, ()):
+                if other.overlaps(rect):
+                    return other
+        return None
+
+    def overlaps(self, rect):
+        return self.first_overlap(rect) is not None
+
+
+def surface_height(item):
+    """ height above its base that objects "on" an item stand at: its "surface" when given, else 0 for floors
+    (walls, hoops or a skybox don't raise the ground) and the full height for anything else """
+    if item.get("surface") is not None:
+        return float(item["surface"])
+    return 0.0 if item.get("floor") else item["dims"][2]
+
+
+def footprint(manifest):
+    """ (width, depth, height) of an asset from its manifest's dimensions """
+    dims = (manifest or {}).get("dimensions") or DEFAULT_DIMENSIONS
+    return tuple(float(d) for d in dims)
+
+
+class Placer:
+    """ places footprints without overlap, one level (ground or surface) at a time """
+
+    def __init__(self, cell, margin=MARGIN):
+        self.cell = max(cell, MIN_CELL)
+        self.step = self.cell / 2
+        self.margin = margin
+        self.grids = {}
+        self.placed = {}        # key -> (rect, level, z of its base, height of its top surface above that)
+        self.start_ring = {}    # (level, anchor) -> first spiral ring worth trying again
+
+    def grid(self, level):
+        if level not in self.grids:
+            self.grids[level] = SpatialGrid(self.cell)
+        return self.grids[level]
+
+    def add(self, key, x, y, z, dims, level=GROUND, block=True, surface=None):
+        """ record an object at a given spot, blocking its footprint on `level` (floors block the ground too);
+        block=False for objects inside an area that is already blocked. `surface` is the height of its top
+        above z, where objects "on" it stand (its full height when None) """
+        if block:
+            rect = Rect.around(x, y, dims[0] + self.margin, dims[1] + self.margin)
+            self.grid(level).insert(rect)
+            if level == FLOORS:
+                self.grid(GROUND).insert(rect)
+        self.placed[key] = (Rect.around(x, y, dims[0], dims[1]), level, z, dims[2] if surface is None else surface)
+
+    def top(self, key):
+        """ (level, footprint, z) of the surface on top of a placed object """
+        rect, _level, z, height = self.placed[key]
+        return key, rect, z + height
+
+    def find(self, dims, level=GROUND, region=None, anchor=(0.0, 0.0), max_distance=None):
+        """ centre (x, y) of the free spot for a width x depth footprint closest to `anchor` along a square spiral,
+        inside `region` when given and within `max_distance` of the anchor when given """
+        width, depth = dims[0] + self.margin, dims[1] + self.margin
+        grid = self.grid(level)
+        ax, ay = anchor
+
+        if region is not None:
+            reach = max(ax - region.min_x, region.max_x - ax, ay - region.min_y, region.max_y - ay)
+            max_rings = int(reach / self.step) + 1
+        else:
+            max_rings = MAX_RINGS
+        if max_distance is not None:
+            max_rings = min(max_rings, int(max_distance / self.step) + 1)
+
+        # earlier searches for the same footprint around the same anchor filled the inner rings; start just inside
+        # where they stopped (a smaller footprint may still fit closer, so it has its own memo)
+        memo = (level, anchor, width, depth)
+        first = self.start_ring.get(memo, 0)
+
+        for ring in range(first, max_rings + 1):
+            for i, j in _ring(ring):
+                x, y = ax + i * self.step, ay + j * self.step
+                # rings are squares: their corners are further out than `max_distance`
+                if max_distance is not None and math.hypot(x - ax, y - ay) > max_distance:
+                    continue
+                rect = Rect.around(x, y, width, depth)
+                if region is not None and not region.contains(Rect.around(x, y, dims[0], dims[1])):
+                    continue
+                if not grid.overlaps(rect):
+                    self.start_ring[memo] = max(0, ring - 1)
+                    return x, y
+        return None
+
+    def pack(self, items, level=GROUND, region=None, z=0.0):
+        """ shelf-pack items (deepest first) in rows across a square around the region's center (the origin on the
+        open ground) sized to their total area, clipped to `region`; returns {key: [x, y, z]} """
+        m = self.margin
+        grid = self.grid(level)
+        items = sorted(items, key=lambda item: -item["dims"][1])
+
+        side = math.sqrt(sum((i["dims"][0] + m) * (i["dims"][1] + m) for i in items)) * PACK_SLACK
+        cx, cy = region.center if region is not None else (0.0, 0.0)
+        x0, x1, y, y_max = cx - side / 2, cx + side / 2, cy - side / 2, math.inf
+        if region is not None:
+            # footprints must stay on the surface; the margin may hang over its edge
+            x0, x1 = max(x0, region.min_x - m / 2), min(x1, region.max_x + m / 2)
+            y, y_max = max(y, region.min_y - m / 2), region.max_y + m / 2
+
+        positions = {}
+        x, row_depth = x0, 0.0
+        for item in items:
+            w, d = item["dims"][0] + m, item["dims"][1] + m
+            while True:
+                if x + w > x1:
+                    if x == x0:
+                        # wider than the packing square: it gets a row of its own
+                        if region is not None and x + w > region.max_x + m / 2:
+                            raise Exception(f"No room for {item['key']} on {level}: wider than the surface")
+                    else:
+                        x, y, row_depth = x0, y + max(row_depth, self.step), 0.0
+                        continue
+                if y + d > y_max:
+                    raise Exception(f"No room for {item['key']} on {level}")
+                blocker = grid.first_overlap(Rect(x, y, x + w, y + d))
+                if blocker is None:
+                    break
+                x = blocker.max_x
+
+            px, py = x + w / 2, y + d / 2
+            self.add(item["key"], px, py, z, item["dims"], level, surface=surface_height(item))
+            positions[item["key"]] = [px, py, z]
+            x += w
+            row_depth = max(row_depth, d)
+        return positions
+
+
+def _ring(r):
+    """ integer offsets on the square ring at Chebyshev distance r, nearest to the axes first """
+    if r == 0:
+        yield 0, 0
+        return
+    for k in sorted(range(-r, r + 1), key=abs):
+        yield r, k
+        yield -r, k
+        if abs(k) != r:
+            yield k, r
+            yield k, -r
+
+
+def place_objects(items, margin=MARGIN):
+    """ positions for scene objects. each item: {"key", "dims": (w, d, h), "position" (fixed, optional),
+    "floor": bool (environments others stand on), "surface": height of the top others stand on (see
+    surface_height), "on": surface key, "near": key, "distance": max distance}.
+    objects without "on" stand on the largest floor (or the ground); fixed positions are absolute and kept as
+    given. floors stand on the ground. order: fixed objects, floors, then every
+    object with the ones "near" / "on" it laid out as one cluster (see layout_cluster), and clusters and
+    unconstrained objects packed in rows per surface; clusters whose root is itself "near" a fixed object or a
+    floor take the free spot closest to it instead. returns {key: [x, y, z]} """
+    sizes = sorted(max(item["dims"][0], item["dims"][1]) for item in items) or [1.0]
+    placer = Placer(sizes[len(sizes) // 2] + margin, margin)
+    by_key = {item["key"]: item for item in items}
+    positions = {}
+    floors = []
+
+    for item in items:
+        for k in ("near", "on"):
+            if item.get(k) is not None and item[k] not in by_key:
+                raise Exception(f"Placement target missing for {item['key']}: {item[k]}")
+        if item.get("floor") and item.get("on") is not None:
+            raise Exception(f"Floors stand on the ground, not on another object: {item['key']} on {item['on']}")
+
+    # fixed floors, then fixed objects, kept where they are given; they block the surface they stand on (their
+    # "on" target, else the floor they stand in)
+    fixed = [item for item in items if item.get("position") is not None]
+    waiting = []
+    for item in fixed:
+        if item.get("floor"):
+            x, y, z = item["position"]
+            placer.add(item["key"], x, y, z, item["dims"], FLOORS, surface=surface_height(item))
+            positions[item["key"]] = [x, y, z]
+            floors.append(item["key"])
+        else:
+            on = item.get("on")
+            if on is not None and by_key[on].get("position") is None:
+                raise Exception(f"Fixed object {item['key']} is on {on}, which has no fixed position")
+            waiting.append(item)
+
+    while waiting:
+        later = []
+        for item in waiting:
+            on = item.get("on")
+            if on is not None and on not in placer.placed:
+                later.append(item)
+                continue
+            x, y, z = item["position"]
+            if on is None:
+                on = next((f for f in floors if placer.placed[f][0].contains(Rect.around(x, y, 0, 0))), None)
+            level = GROUND if on is None else on
+            placer.add(item["key"], x, y, z, item["dims"], level, surface=surface_height(item))
+            positions[item["key"]] = [x, y, z]
+
+        if len(later) == len(waiting):
+            keys = ", ".join(item["key"] for item in later)
+            raise Exception(f"Placement targets circular for: {keys}")
+        waiting = later
+
+    pending = [item for item in items if item["key"] not in positions]
+
+    # objects without "on" stand on the largest floor, if it has room for all of them, else on the ground
+    unplaced = [item for item in pending if not item.get("floor") and "on" not in item]
+    needed = sum((item["dims"][0] + margin) * (item["dims"][1] + margin) for item in unplaced) * PACK_SLACK ** 2
+    floor_items = [item for item in items if item.get("floor")]
+    largest = max(floor_items, key=lambda item: item["dims"][0] * item["dims"][1], default=None)
+    default_surface = None
+    if largest is not None and largest["dims"][0] * largest["dims"][1] >= needed:
+        default_surface = largest["key"]
+
+    def surface_of(item):
+        if item.get("floor"):
+            return None
+        return item.get("on", default_surface)
+
+    def level_of(item, surface):
+        if surface is not None:
+            return placer.top(surface)
+        return (FLOORS if item.get("floor") else GROUND), None, 0.0
+
+    def spiral(item, dims, anchor_offset=(0.0, 0.0)):
+        """ free spot for `item` (or a cluster of `dims` it is at `anchor_offset` in) on its surface, closest
+        to its "near" target, else to the surface's center """
+        key, surface, near = item["key"], surface_of(item), item.get("near")
+        level, region, z = level_of(item, surface)
+        if near is not None:
+            nx, ny = placer.placed[near][0].center
+            anchor = (nx - anchor_offset[0], ny - anchor_offset[1])
+        elif region is not None:
+            anchor = region.center
+        else:
+            anchor = (0.0, 0.0)
+
+        spot = placer.find(dims, level, region, anchor, item.get("distance"))
+        if spot is None:
+            where = f"on {surface}" if surface is not None else "on the ground"
+            raise Exception(f"No room for {key} {where}" + (f" near {near}" if near else ""))
+        return spot, level, z
+
+    # --- floors: spiral search on their own level, largest first ---
+    for item in sorted(pending, key=lambda item: -item["dims"][0] * item["dims"][1]):
+        if item.get("floor"):
+            (x, y), level, z = spiral(item, item["dims"])
+            placer.add(item["key"], x, y, z, item["dims"], level, surface=surface_height(item))
+            positions[item["key"]] = [x, y, z]
+            floors.append(item["key"])
+
+    # --- constraint trees: every object hangs off its "near" target, else its "on" target, whichever is movable
+    # (an object on a movable surface near a fixed object waits for its surface) ---
+    movable = {item["key"]: item for item in pending if not item.get("floor")}
+
+    def parent_of(item):
+        for target in (item.get("near"), item.get("on")):
+            if target in movable:
+                return target
+        return None
+
+    children = defaultdict(list)
+    roots = []
+    for item in movable.values():
+        parent = parent_of(item)
+        if parent is None:
+            roots.append(item)
+        else:
+            children[parent].append(item)
+
+    # objects whose targets form a loop hang off no root
+    reached = {item["key"] for item in roots}
+    for root in roots:
+        reached.update(below["key"] for below in _subtree(root, children))
+    if len(reached) < len(movable):
+        keys = ", ".join(key for key in movable if key not in reached)
+        raise Exception(f"Placement targets circular for: {keys}")
+
+    # --- clusters: near roots spiral-searched, the rest packed in rows per surface ---
+    clusters = {}
+    late = []
+    groups = {}
+    for root in roots:
+        if children[root["key"]]:
+            cluster = layout_cluster(root, children, parent_of, surface_of, placer.cell, margin)
+            late += cluster.pop("late")
+            clusters[cluster["key"]] = cluster
+        else:
+            cluster = root
+
+        if root.get("near") is not None:
+            offset = cluster["members"][root["key"]][:2] if cluster is not root else (0.0, 0.0)
+            (x, y), level, z = spiral(root, cluster["dims"], offset)
+            if cluster is root:
+                placer.add(root["key"], x, y, z, root["dims"], level, surface=surface_height(root))
+                positions[root["key"]] = [x, y, z]
+            else:
+                positions.update(place_cluster(placer, cluster, x, y, z, level, block=True))
+            continue
+
+        surface = surface_of(root)
+        if surface is not None and surface not in placer.placed:
+            raise Exception(f"Placement target missing for {root['key']}: {surface}")
+        groups.setdefault(surface, []).append(cluster)
+
+    for surface, group in groups.items():
+        level, region, z = level_of(group[0], surface)
+        for key, (x, y, z) in placer.pack(group, level, region, z).items():
+            if key in clusters:
+                # the packed box already blocks the cluster's footprint
+                positions.update(place_cluster(placer, clusters[key], x, y, z, level, block=False))
+            else:
+                positions[key] = [x, y, z]
+
+    # --- objects whose constraints span clusters: spiral search, targets first ---
+    while late:
+        waiting = []
+        for item in late:
+            targets = (surface_of(item), item.get("near"))
+            if any(target is not None and target not in placer.placed for target in targets):
+                waiting.append(item)
+                continue
+            (x, y), level, z = spiral(item, item["dims"])
+            placer.add(item["key"], x, y, z, item["dims"], level, surface=surface_height(item))
+            positions[item["key"]] = [x, y, z]
+
+        if len(waiting) == len(late):
+            keys = ", ".join(item["key"] for item in waiting)
+            raise Exception(f"Placement targets missing or circular for: {keys}")
+        late = waiting
+
+    return {item["key"]: positions[item["key"]] for item in items}
+
+
+def layout_cluster(root, children, parent_of, surface_of, cell, margin):
+    """ lay out `root` and the objects below it in its constraint tree around the origin: each one near its
+    "near" target / on top of its "on" target, by spiral search among the cluster only. returns a packable item
+    {"key": "cluster:<root key>" (as it shows in errors), "dims" of the cluster's footprint, "members": {key: (x, y, z) from the footprint's center and the
+    cluster's base}, "late": objects that also depend on something outside the cluster, with their subtrees} """
+    local = Placer(cell, margin)
+    local.add(root["key"], 0.0, 0.0, 0.0, root["dims"], surface=surface_height(root))
+    base = surface_of(root)
+    late = []
+
+    queue = deque(children[root["key"]])
+    while queue:
+        item = queue.popleft()
+        key, near, on = item["key"], item.get("near"), item.get("on")
+        outside = near is not None and near not in local.placed
+        if on is not None and on in local.placed:
+            level, region, z = local.top(on)
+        elif surface_of(item) == base:
+            level, region, z = GROUND, None, 0.0
+        else:
+            outside = True
+        if outside:
+            # stands on or is near something outside the cluster
+            late.append(item)
+            late += list(_subtree(item, children))
+            continue
+
+        if near is not None:
+            anchor = local.placed[near][0].center
+        elif region is not None:
+            anchor = region.center
+        else:
+            anchor = (0.0, 0.0)
+
+        spot = local.find(item["dims"], level, region, anchor, item.get("distance"))
+        if spot is None:
+            where = f"on {on}" if level != GROUND else f"around {root['key']}"
+            raise Exception(f"No room for {key} {where}" + (f" near {near}" if near else ""))
+        local.add(key, spot[0], spot[1], z, item["dims"], level, surface=surface_height(item))
+        queue.extend(children[key])
+
+    ground = [rect for rect, level, _z, _h in local.placed.values() if level == GROUND]
+    min_x, min_y = min(r.min_x for r in ground), min(r.min_y for r in ground)
+    max_x, max_y = max(r.max_x for r in ground), max(r.max_y for r in ground)
+    cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+
+    members = {}
+    for key, (rect, level, z, height) in local.placed.items():
+        x, y = rect.center
+        members[key] = (x - cx, y - cy, z, (rect.max_x - rect.min_x, rect.max_y - rect.min_y, height), level)
+    return {"key": f"cluster:{root['key']}", "dims": (max_x - min_x, max_y - min_y, 0.0), "members": members,
+            "late": late}
+
+
+def _subtree(item, children):
+    stack = list(children[item["key"]])
+    while stack:
+        below = stack.pop()
+        yield below
+        stack.extend(children[below["key"]])
+
+
+def place_cluster(placer, cluster, x, y, z, level, block):
+    """ members of a layout_cluster centered at (x, y) on `level` at height z; returns {key: [x, y, z]} """
+    positions = {}
+    for key, (dx, dy, dz, dims, member_level) in cluster["members"].items():
+        # members on top of other members keep that surface as their level
+        on_base = member_level == GROUND
+        px, py, pz = x + dx, y + dy, z + dz
+        placer.add(key, px, py, pz, dims, level if on_base else member_level, block=block or not on_base)
+        positions[key] = [px, py, pz]
+    return positions
@@ -0,0 +1,224 @@
+# planner/batch_planner.py
+""" streaming planner for dataset-scale runs: reads scene requests as JSON lines (files or stdin), plans them in a
+process pool and streams the compiled plans out as uniquely named .splan files or one plan stream, in input order.
+a bad record is reported (line, scene id, error) and skipped; it never aborts the run.
+
+a record with "objects" is an assembler scene spec (see planner_v1_scene_assembler.SCENE_SPEC), anything else a
+planner request (see scene_planner_v1.REQUEST); either may name its scene with "scene_id" (specs also "scene"). """
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+import scene_plan
+
+CHUNK_SIZE = 64          # records per pool task; amortizes pickling and IPC
+WINDOW_PER_WORKER = 4    # chunks in flight per worker, bounds memory on endless input
+PROGRESS_EVERY = 1000
+SCENE_ID = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]{0,127}")   # scene ids become file names
+
+
+# ---------- INPUT ----------
+def iter_records(sources):
+    """ (source, line number, record or None, parse error or None) per non-empty line; "-" = stdin """
+    for source in sources:
+        f = sys.stdin if source == "-" else open(source)
+        try:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("record is not a JSON object")
+                except ValueError as e:
+                    yield source, line_no, None, f"bad JSON: {e}"
+                    continue
+                yield source, line_no, record, None
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def chunks(records, size):
+    chunk = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------- PLANNING (runs in the workers) ----------
+def init_worker(index_path):
+    if index_path:
+        import planner_v1_scene_assembler as assembler
+        assembler.INDEX_PATH = index_path
+
+
+def requested_id(record, line_no):
+    """ the record's scene id, or one made from its line number; ids that aren't safe file names are errors """
+    scene_id = record.get("scene_id") or record.get("scene") or f"scene_{line_no:06d}"
+    if not isinstance(scene_id, str) or not SCENE_ID.fullmatch(scene_id):
+        raise ValueError(f"invalid scene id {scene_id!r}: letters, digits, '.', '_' and '-' only")
+    return scene_id
+
+
+def plan_record(record, scene_id):
+    if "objects" in record:
+        import planner_v1_scene_assembler as assembler
+        plan = assembler.build_scene({**record, "scene": scene_id})
+    else:
+        import scene_planner_v1
+        plan = scene_planner_v1.compile_request(record, scene_id)
+    return plan
+
+
+def plan_chunk(chunk):
+    """ [(source, line, record, parse error)] -> [(source, line, scene id, plan or None, error or None)] """
+    out = []
+    for source, line_no, record, error in chunk:
+        scene_id = None
+        plan = None
+        if error is None:
+            try:
+                scene_id = requested_id(record, line_no)
+                plan = plan_record(record, scene_id)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        out.append((source, line_no, scene_id, plan, error))
+    return out
+
+
+def plan_stream(records, workers, chunk_size=CHUNK_SIZE, index_path=None):
+    """ plan_chunk results for every record, in input order; workers=0 plans in this process """
+    if workers == 0:
+        init_worker(index_path)
+        for chunk in chunks(records, chunk_size):
+            yield from plan_chunk(chunk)
+        return
+
+    window = deque()
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(index_path,)) as pool:
+        for chunk in chunks(records, chunk_size):
+            window.append(pool.submit(plan_chunk, chunk))
+            if len(window) >= workers * WINDOW_PER_WORKER:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+# ---------- OUTPUT ----------
+class PlanSink:
+    """ where plans go: one <scene_id>.splan per plan in a directory, or one stream (.splan, "-" = stdout)
+    or JSON lines (.jsonl) in a single file """
+
+    def __init__(self, out_dir=None, out=None):
+        self.out_dir = out_dir
+        self.f = None
+        self.jsonl = False
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        elif out == "-":
+            self.f = sys.stdout.buffer
+            scene_plan.write_header(self.f)
+        else:
+            os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+            self.jsonl = out.endswith(".jsonl")
+            self.f = open(out, "w" if self.jsonl else "wb")
+            if not self.jsonl:
+                scene_plan.write_header(self.f)
+
+    def write(self, plan):
+        if self.out_dir:
+            scene_plan.save_plans(os.path.join(self.out_dir, plan["scene_id"] + scene_plan.PLAN_EXT), [plan])
+        elif self.jsonl:
+            self.f.write(json.dumps(scene_plan.to_json(plan)) + "\n")
+        else:
+            scene_plan.write_plan(self.f, plan)
+
+    def close(self):
+        if self.f is not None and self.f is not sys.stdout.buffer:
+            self.f.close()
+        elif self.f is not None:
+            self.f.flush()
+
+
+def run(sources, sink, workers, chunk_size=CHUNK_SIZE, index_path=None, errors_path=None):
+    """ plan everything, write plans to `sink` and errors as JSON lines to `errors_path` (or stderr);
+    returns (planned, failed) """
+    planned, failed = 0, 0
+    seen_ids = set()
+    source_index = {source: i for i, source in reversed(list(enumerate(sources)))}
+    errors = open(errors_path, "w") if errors_path else sys.stderr
+
+    def report(source, line_no, scene_id, error):
+        errors.write(json.dumps({"source": source, "line": line_no, "scene_id": scene_id, "error": error}) + "\n")
+
+    try:
+        for source, line_no, scene_id, plan, error in plan_stream(
+                iter_records(sources), workers, chunk_size, index_path):
+            if error is not None:
+                failed += 1
+                report(source, line_no, scene_id, error)
+                continue
+
+            # ids come from the requests, so make them unique here, where the order is known; the suffix
+            # names the record (source, line), and may itself be taken by an explicit id
+            if plan["scene_id"] in seen_ids:
+                base = f"{scene_id}_{source_index[source]}_{line_no:06d}"
+                unique, n = base, 1
+                while unique in seen_ids:
+                    unique, n = f"{base}_{n}", n + 1
+                plan["scene_id"] = unique
+            seen_ids.add(plan["scene_id"])
+
+            try:
+                sink.write(plan)
+            except Exception as e:
+                # a plan that can't be written (disk full, bad path) is one failed record, not a failed run
+                failed += 1
+                report(source, line_no, plan["scene_id"], f"write failed: {type(e).__name__}: {e}")
+                continue
+            planned += 1
+            if planned % PROGRESS_EVERY == 0:
+                print(f"[batch_planner] {planned} planned, {failed} failed", file=sys.stderr)
+    finally:
+        sink.close()
+        if errors is not sys.stderr:
+            errors.close()
+
+    print(f"[batch_planner] done: {planned} planned, {failed} failed", file=sys.stderr)
+    return planned, failed
+
+
+# Usage:
+#   python mvp/planner/batch_planner.py requests.jsonl --out-dir plans/        (one <scene_id>.splan per scene)
+#   cat requests.jsonl | python mvp/planner/batch_planner.py - --out plans.splan --errors errors.jsonl
+#   ... --out - | blender -b -P mvp/engine_v1_scene_builder.py -- -             (plan stream straight into the engine)
+#   ... --out plans.jsonl                                                       (JSON lines, for inspection)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("sources", nargs="+", help="JSONL files of requests, or - for stdin")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out-dir", help="write one .splan per scene here")
+    target.add_argument("--out", help="write one .splan stream (- = stdout) or .jsonl file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="planner processes (0 = in-process)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="records per pool task")
+    parser.add_argument("--index", default=None, help="asset index for assembler specs")
+    parser.add_argument("--errors", default=None, help="JSONL file of failed records (default: stderr)")
+    args = parser.parse_args()
+
+    planned, failed = run(
+        args.sources, PlanSink(args.out_dir, args.out), args.workers, args.chunk, args.index, args.errors
+    )
+    sys.exit(1 if failed and not planned else 0)
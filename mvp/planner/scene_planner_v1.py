@@ -1,15 +1,18 @@
 # planner/scene_planner_v1.py
 """Deterministic rule-based scene planner that generates a scene manifest for the Blender engine."""
 
-import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asset_index
+import scene_plan
 
 # OUTPUT PATH
-ASSETS_ROOT = "assets"
+ASSETS_ROOT = asset_index.ASSETS_ROOT
 MANIFEST_DIR = os.path.join(ASSETS_ROOT, "manifests")
-os.makedirs(MANIFEST_DIR, exist_ok=True)
 
-OUTPUT_MANIFEST = os.path.join(MANIFEST_DIR, "scene_auto.scene.json")
+OUTPUT_MANIFEST = os.path.join(MANIFEST_DIR, "scene_auto" + scene_plan.PLAN_EXT)
 
 
 # ASSET REGISTRY (logical name → asset id used by engine)
@@ -102,11 +105,12 @@ def plan_scene(request):
     raise Exception(f"Unknown scene_type: {scene_type}")
 
 
-def build_scene_manifest(request):
+def compile_request(request, scene_id="scene_auto"):
+    """ request -> validated scene_plan """
     scene_data = plan_scene(request)
 
     manifest = {
-        "scene_id": "scene_auto",
+        "scene_id": scene_id,
         "frame_start": 1,
         "frame_end": 120,
         "assets": {},
@@ -118,10 +122,13 @@ def build_scene_manifest(request):
             "location": data["location"]
         }
 
-    with open(OUTPUT_MANIFEST, "w") as f:
-        json.dump(manifest, f, indent=2)
+    # validated once here; the engine trusts the compiled plan
+    return scene_plan.compile_plan(manifest)
 
-    print("Scene manifest generated →", OUTPUT_MANIFEST)
+
+def build_scene_manifest(request):
+    # save_plan creates MANIFEST_DIR; nothing is created at import, as batch_planner's workers import this module
+    scene_plan.save_plan(OUTPUT_MANIFEST, compile_request(request))
 
 
 REQUEST = {
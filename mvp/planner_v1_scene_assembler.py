@@ -1,32 +1,48 @@
 # mvp/planner_v1_scene_assembler.py
 """ simple script to assemble a scene manifest for the MVP, based on a hardcoded spec."""
 
-import json
 import os
-from math import ceil
+
+import asset_index
+import placement
+import scene_plan
 
 # CONFIG
-ASSETS_ROOT = "/home/nahom/Downloads/blender/assets"
+ASSETS_ROOT = asset_index.ASSETS_ROOT
 MANIFEST_DIR = os.path.join(ASSETS_ROOT, "manifests")
-SCENE_OUTPUT = os.path.join(MANIFEST_DIR, "scene_auto.scene.json")
+INDEX_PATH = os.path.join(MANIFEST_DIR, asset_index.INDEX_FILENAME)
+SCENE_OUTPUT = os.path.join(MANIFEST_DIR, "scene_auto" + scene_plan.PLAN_EXT)
 
-GRID_SPACING = 2.0  # used for auto placement
 DEFAULT_FRAMES = [1, 120]
+FLOOR_TYPES = ("environment",)  # asset types other objects are placed on top of
+
+
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = asset_index.open_index(INDEX_PATH)
+    return _index
 
 
 def load_asset_manifest(asset_id):
-    path = os.path.join(MANIFEST_DIR, f"{asset_id}.json")
-    if not os.path.exists(path):
+    manifest = asset_index.get(get_index(), asset_id)
+    if manifest is None:
         raise Exception(f"Missing asset manifest: {asset_id}")
-    with open(path) as f:
-        return json.load(f)
+    return manifest
 
 
-def auto_place(index):
-    cols = 3
-    row = index // cols
-    col = index % cols
-    return [col * GRID_SPACING, row * GRID_SPACING, 0]
+def resolve_asset_id(obj):
+    """ objects name an asset directly ("asset") or ask for one by "tag" / "type" """
+    if "asset" in obj:
+        return obj["asset"]
+
+    matches = asset_index.find(get_index(), tag=obj.get("tag"), asset_type=obj.get("type"))
+    if not matches:
+        raise Exception(f"No asset matches: {obj}")
+    return matches[0]["asset_id"]
 
 
 # VALIDATE + BUILD SCENE
@@ -35,23 +51,41 @@ def build_scene(scene_spec):
     assets_out = {}
     animations_out = []
 
-    # --- Validate + place objects ---
+    # --- Validate objects ---
+    items = []
     for i, obj in enumerate(scene_spec["objects"]):
 
-        asset_id = obj["asset"]
+        asset_id = resolve_asset_id(obj)
         manifest = load_asset_manifest(asset_id)
 
-        position = obj.get("position")
-        if position is None:
-            position = auto_place(i)
+        # the same asset may be placed several times; the engine instances it
+        key = obj.get("id", asset_id)
+        if key in assets_out:
+            key = f"{asset_id}_{i}"
 
-        assets_out[asset_id] = {
+        assets_out[key] = {
             "asset_id": asset_id,
             "root_object": manifest["root_object"],
-            "location": position,
             "scale": [1, 1, 1]
         }
 
+        # objects without a position are packed by their manifest footprint, optionally
+        # "on" a surface object or "near" another object (within "distance")
+        item = {
+            "key": key,
+            "dims": placement.footprint(manifest),
+            "position": obj.get("position"),
+            "floor": manifest.get("type") in FLOOR_TYPES,
+            # height of the walkable top above the asset's base; floors default to 0 (see placement.surface_height)
+            "surface": manifest.get("surface_height"),
+        }
+        item.update({k: obj[k] for k in ("on", "near", "distance") if k in obj})
+        items.append(item)
+
+    # --- Place objects ---
+    for key, position in placement.place_objects(items).items():
+        assets_out[key]["location"] = position
+
     # --- Build animation ---
     for anim in scene_spec.get("animations", []):
 
@@ -65,7 +99,7 @@ def build_scene(scene_spec):
             "frames": anim.get("frames", DEFAULT_FRAMES)
         })
 
-    # --- Scene manifest ---
+    # --- Scene plan (validated here, once) ---
     scene_manifest = {
         "scene_id": scene_spec["scene"],
         "frame_start": DEFAULT_FRAMES[0],
@@ -75,13 +109,11 @@ def build_scene(scene_spec):
         "attachments": scene_spec.get("attachments", [])
     }
 
-    return scene_manifest
+    return scene_plan.compile_plan(scene_manifest)
 
 
-def save_scene(scene_data):
-    with open(SCENE_OUTPUT, "w") as f:
-        json.dump(scene_data, f, indent=2)
-    print("Scene manifest generated:", SCENE_OUTPUT)
+def save_scene(plan):
+    scene_plan.save_plan(SCENE_OUTPUT, plan)
 
 
 # MVP SCENE SPEC (manual for now)
@@ -90,8 +122,8 @@ SCENE_SPEC = {
 
     "objects": [
         {"asset": "court_1", "position": [0, 0, 0]},
-        {"asset": "kid_1"},  # auto place
-        {"asset": "ball_1"}  # auto place
+        {"asset": "kid_1"},  # auto placed on the court (the largest environment)
+        {"asset": "ball_1", "near": "kid_1", "distance": 2.0}
     ],
 
     "animations": [
@@ -0,0 +1,145 @@
+# mvp/render_profiles.py
+""" named render quality profiles (preview / draft / final) applied to a scene in one call, plus a time-budget
+mode that picks the Cycles sample count from two quick calibration renders. a job split across several
+processes calibrates once and passes the result to every part as an explicit `samples`. """
+
+import sys
+import time
+
+import bpy
+
+PROFILES = {
+    # quick look: a quarter of the pixels, few samples, denoised
+    "preview": {
+        "engine": "CYCLES",
+        "samples": 16,
+        "adaptive_threshold": 0.1,
+        "denoise": True,
+        "resolution_percentage": 50,
+        "tile_size": 512,     # small tiles: less memory per render, so previews can share a machine
+        "threads": 0,  # 0 = all cores
+    },
+    "draft": {
+        "engine": "CYCLES",
+        "samples": 64,
+        "adaptive_threshold": 0.05,
+        "denoise": True,
+        "resolution_percentage": 100,
+        "tile_size": 1024,
+        "threads": 0,
+    },
+    "final": {
+        "engine": "CYCLES",
+        "samples": 256,
+        "adaptive_threshold": 0.01,
+        "denoise": True,
+        "resolution_percentage": 100,
+        "tile_size": 2048,    # one tile per 1080p frame: fastest, at the most memory
+        "threads": 0,
+    },
+}
+DEFAULT_PROFILE = "draft"
+
+CALIBRATION_SAMPLES = 8   # samples in the first timing render; the second one uses twice as many
+MIN_SAMPLES = 4
+
+
+def get_profile(profile=None):
+    """ profile name (or None for DEFAULT_PROFILE) -> settings dict; a dict is taken as overrides of its
+    "base" profile, e.g. {"base": "final", "samples": 512} """
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise Exception(f"Unknown render profile: {profile} (expected one of {', '.join(PROFILES)})")
+        return dict(PROFILES[profile])
+
+    settings = get_profile(profile.get("base"))
+    settings.update({k: v for k, v in profile.items() if k != "base"})
+    return settings
+
+
+def apply_profile(scene, profile=None):
+    """ set engine, samples, adaptive threshold, denoising, resolution %, tiles and threads on `scene` """
+    settings = get_profile(profile)
+
+    scene.render.engine = settings["engine"]
+    scene.render.resolution_percentage = settings["resolution_percentage"]
+
+    if settings["threads"]:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = settings["threads"]
+    else:
+        scene.render.threads_mode = 'AUTO'
+
+    if settings["engine"] == "CYCLES":
+        cycles = scene.cycles
+        cycles.samples = settings["samples"]
+        cycles.use_adaptive_sampling = settings["adaptive_threshold"] > 0
+        cycles.adaptive_threshold = settings["adaptive_threshold"]
+        cycles.use_denoising = settings["denoise"]
+        cycles.use_auto_tile = True
+        cycles.tile_size = settings["tile_size"]
+    else:
+        # EEVEE: samples are TAA samples; no adaptive sampling, tiles or denoiser
+        scene.eevee.taa_render_samples = settings["samples"]
+
+    return settings
+
+
+def _samples_property(scene):
+    return (scene.cycles, "samples") if scene.render.engine == "CYCLES" else (scene.eevee, "taa_render_samples")
+
+
+def _timed_render(owner, prop, samples):
+    setattr(owner, prop, samples)
+    t0 = time.perf_counter()
+    bpy.ops.render.render()  # into Render Result, nothing written
+    return time.perf_counter() - t0
+
+
+def calibrate_samples(scene, budget_seconds, max_samples=None):
+    """ time two renders of the current frame, at CALIBRATION_SAMPLES and at twice that, and set the sample
+    count that fits `budget_seconds` per frame. their difference is the time per sample; the rest (BVH build,
+    denoising) is fixed per-frame overhead, taken off the budget first. returns the chosen sample count """
+    owner, prop = _samples_property(scene)
+    max_samples = max_samples or getattr(owner, prop)
+
+    low = _timed_render(owner, prop, CALIBRATION_SAMPLES)
+    high = _timed_render(owner, prop, 2 * CALIBRATION_SAMPLES)
+    per_sample = max(high - low, 0.0) / CALIBRATION_SAMPLES
+    overhead = max(low - per_sample * CALIBRATION_SAMPLES, 0.0)
+
+    samples = int((budget_seconds - overhead) / per_sample) if per_sample > 0 else max_samples
+    samples = max(MIN_SAMPLES, min(samples, max_samples))
+    setattr(owner, prop, samples)
+
+    print(f"Calibrated {samples} samples for {budget_seconds}s/frame "
+          f"({per_sample:.3f}s per sample + {overhead:.2f}s overhead)")
+    return samples
+
+
+def apply_render_settings(scene, profile=None, time_budget=None, samples=None):
+    """ apply a profile, then, given a per-frame time budget in seconds, calibrate its sample count
+    (the profile's samples become the upper bound). an explicit `samples` (calibrated once for a whole
+    sharded job) wins over both """
+    settings = apply_profile(scene, profile)
+    if samples:
+        owner, prop = _samples_property(scene)
+        setattr(owner, prop, int(samples))
+        settings["samples"] = int(samples)
+    elif time_budget:
+        settings["samples"] = calibrate_samples(scene, float(time_budget), settings["samples"])
+    return settings
+
+
+def profile_args(argv=None):
+    """ (profile, time_budget) from `-- ... --profile NAME --time-budget SECONDS`; either may be None """
+    argv = sys.argv if argv is None else argv
+    if "--" not in argv:
+        return None, None
+    args = argv[argv.index("--") + 1:]
+
+    profile = args[args.index("--profile") + 1] if "--profile" in args else None
+    budget = float(args[args.index("--time-budget") + 1]) if "--time-budget" in args else None
+    return profile, budget
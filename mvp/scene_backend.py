@@ -0,0 +1,94 @@
+# mvp/scene_backend.py
+""" the operations the scene engine needs from a 3D backend (import, wrap, transform, keyframe, render).
+engine_v1_scene_builder.py only goes through these, so the same build runs in Blender ("blender") or in the
+in-memory NumPy stand-in ("stub") for tests and benchmarks without a Blender binary.
+pure Python (no bpy); backends are imported on demand. """
+
+import abc
+import importlib
+
+# backend name -> module defining `Backend`
+BACKENDS = {
+    "blender": "blender_backend",
+    "stub": "stub_backend",
+}
+DEFAULT_BACKEND = "blender"
+
+
+class SceneBackend(abc.ABC):
+    """ asset / object handles are backend-specific and only passed back into the same backend.
+    an asset handle has .roots (objects without a parent), .objects and .meshes """
+    name = None
+
+    @abc.abstractmethod
+    def reset(self):
+        """ start from an empty scene """
+
+    @abc.abstractmethod
+    def load_asset(self, path, normalization=None):
+        """ bring a glTF / FBX file into the scene as a new asset, with `normalization` (a current one from its
+        manifest, see normalization.py) already applied to it """
+
+    @abc.abstractmethod
+    def wrap(self, name, asset):
+        """ new empty called `name` inside the asset, parenting all of its roots; returns it """
+
+    @abc.abstractmethod
+    def store(self, asset):
+        """ take the asset out of the scene but keep it loaded, as a prototype for instance() """
+
+    @abc.abstractmethod
+    def instance(self, name, asset):
+        """ new empty in the scene that instances the stored asset; returns it """
+
+    @abc.abstractmethod
+    def remove(self, obj):
+        """ delete an object (and its animation, if nothing else uses it) """
+
+    @abc.abstractmethod
+    def bbox(self, obj, exact=False):
+        """ world-space (min, max) over the meshes under obj, each indexable as [x, y, z], or None """
+
+    @abc.abstractmethod
+    def set_location(self, obj, location):
+        """ move obj to xyz `location` """
+
+    @abc.abstractmethod
+    def set_rotation(self, obj, rotation):
+        """ set obj's rotation to an XYZ euler (radians), keeping its scale """
+
+    @abc.abstractmethod
+    def scale(self, obj, factor):
+        """ multiply obj's scale by `factor` """
+
+    @abc.abstractmethod
+    def set_scale(self, obj, scale):
+        """ set obj's scale to xyz `scale`, keeping its rotation """
+
+    @abc.abstractmethod
+    def attach(self, child, parent, offset):
+        """ parent child to parent, placed at `offset` in parent space, keeping its rotation / scale """
+
+    @abc.abstractmethod
+    def update(self):
+        """ make world matrices current after transform changes """
+
+    @abc.abstractmethod
+    def keyframe(self, obj, data_path, frames, values):
+        """ key `data_path` on obj at every frame (see keyframes.write_keyframes) """
+
+    @abc.abstractmethod
+    def set_frame_range(self, start, end):
+        """ frames render() covers, inclusive """
+
+    @abc.abstractmethod
+    def render(self, directory):
+        """ render the frame range into `directory` """
+
+
+def get_backend(name=None):
+    """ a fresh backend by name (None for DEFAULT_BACKEND) """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise Exception(f"Unknown backend: {name} (expected one of {', '.join(BACKENDS)})")
+    return importlib.import_module(BACKENDS[name]).Backend()
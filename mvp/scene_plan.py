@@ -0,0 +1,398 @@
+# mvp/scene_plan.py
+""" compiled scene plan: the one shape the planner, assembler and rebuild script hand to the builders.
+compile_plan() turns any of the JSON manifest shapes into a plan and validates it once, at plan time; builders
+then trust it. plans are stored in a compact binary stream (.splan) of length-prefixed records whose bulk data
+is flat floats: keyframe tracks in float32, so baked animation paths cost 4 bytes a number instead of
+pretty-printed JSON, static transforms (placements, attachment offsets) in float64 so they load back exactly as
+compiled. a file of many plans is read one plan at a time.
+pure Python (no bpy). """
+
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+
+PLAN_VERSION = 2   # 2: placements and attachments in float64 (version 1 streams, all float32, still read)
+MAGIC = b"SPLN"
+PLAN_EXT = ".splan"
+
+# file: MAGIC, u16 version, then records: u8 kind, u32 meta bytes, u32 data bytes, JSON meta, float data
+_FILE_HEADER = struct.Struct("<4sH")
+_RECORD_HEADER = struct.Struct("<BII")
+
+SCENE = 1         # meta: scene_id, frame range
+PLACEMENTS = 2    # meta: keys / asset ids / root objects; data: location + scale per placement
+TRACK = 3         # meta: target, data_path, width; data: frames, then values (frames x width)
+ATTACHMENTS = 4   # meta: children / parents; data: offset per attachment
+END = 5
+
+TRANSFORM_WIDTH = 6   # location xyz, scale xyz
+
+DOUBLE_KINDS = (PLACEMENTS, ATTACHMENTS)   # records whose data is float64 (since version 2); the rest float32
+
+
+# ---------- COMPILE + VALIDATE ----------
+def is_plan(scene):
+    return isinstance(scene, dict) and "version" in scene and "placements" in scene
+
+
+def _vector(value, default=(0.0, 0.0, 0.0)):
+    return [float(v) for v in (default if value is None else value)]
+
+
+def _floats(values):
+    return array("f", (float(v) for v in values))
+
+
+def keyframe_track(target, data_path, frames, values):
+    """ one track: `values` is one row per frame (a row is a vector, or a plain number for scalar properties) """
+    rows = [v if isinstance(v, (list, tuple)) else [v] for v in values]
+    width = len(rows[0]) if rows else 1
+    return {
+        "target": target,
+        "data_path": data_path,
+        "width": width,
+        "frames": _floats(frames),
+        "values": _floats(x for row in rows for x in row),
+    }
+
+
+def compile_plan(manifest):
+    """ a validated plan from a scene manifest as written by the planner, the assembler or the rebuild script.
+    animations: "linear_move" (start / end over frames), "keyframes" (baked: frames + values per frame,
+    optional data_path, default location) and "follow" (the follower attached to its target at its own
+    location); an already compiled plan is just validated """
+    if is_plan(manifest):
+        validate(manifest)
+        return manifest
+
+    try:
+        plan = _compile(manifest)
+    except (KeyError, TypeError, ValueError) as e:
+        raise Exception(f"Invalid scene plan {manifest.get('scene_id')}: malformed manifest ({e!r})")
+    validate(plan)
+    return plan
+
+
+def _compile(manifest):
+    plan = {
+        "version": PLAN_VERSION,
+        "scene_id": manifest.get("scene_id", "scene"),
+        "frame_start": manifest.get("frame_start", 1),
+        "frame_end": manifest.get("frame_end", 250),
+        "placements": [],
+        "tracks": [],
+        "attachments": [],
+    }
+
+    locations = {}
+    for key, data in (manifest.get("assets") or {}).items():
+        location = _vector(data.get("location"))
+        locations[key] = location
+        plan["placements"].append({
+            "key": key,
+            "asset_id": data.get("asset_id", key),
+            "root_object": data.get("root_object"),
+            "location": location,
+            "scale": _vector(data.get("scale"), (1.0, 1.0, 1.0)),
+        })
+
+    for anim in manifest.get("animations") or []:
+        kind = anim.get("type")
+        if kind == "linear_move":
+            f1, f2 = anim["frames"]
+            plan["tracks"].append(
+                keyframe_track(anim["asset_id"], "location", [f1, f2], [anim["start"], anim["end"]])
+            )
+        elif kind == "keyframes":
+            plan["tracks"].append(
+                keyframe_track(anim["asset_id"], anim.get("data_path", "location"), anim["frames"], anim["values"])
+            )
+        elif kind == "follow":
+            plan["attachments"].append({
+                "child": anim["follower"],
+                "parent": anim["target"],
+                "offset": locations.get(anim["follower"], [0.0, 0.0, 0.0]),
+            })
+        else:
+            # skipped, as the engine always has: manifests may carry types for other builders
+            print(f"[WARN] {plan['scene_id']}: unknown animation type {kind!r} dropped")
+
+    for attach in manifest.get("attachments") or []:
+        plan["attachments"].append({
+            "child": attach["child"],
+            "parent": attach["parent"],
+            "offset": _vector(attach.get("offset")),
+        })
+
+    return plan
+
+
+def _check_vector(errors, where, value, size=3):
+    if not isinstance(value, (list, tuple, array)) or len(value) != size:
+        errors.append(f"{where}: expected {size} numbers, got {value!r}")
+    elif not all(isinstance(v, (int, float)) and math.isfinite(v) for v in value):
+        errors.append(f"{where}: non-finite or non-numeric value in {value!r}")
+
+
+def validate(plan):
+    """ raise with every problem found: version, types, vector sizes, key references, track shapes """
+    errors = []
+    scene_id = plan.get("scene_id")
+
+    if plan.get("version") != PLAN_VERSION:
+        errors.append(f"version: expected {PLAN_VERSION}, got {plan.get('version')!r}")
+    if not isinstance(scene_id, str) or not scene_id:
+        errors.append(f"scene_id: expected a non-empty string, got {scene_id!r}")
+    start, end = plan.get("frame_start"), plan.get("frame_end")
+    if not isinstance(start, int) or not isinstance(end, int) or start > end:
+        errors.append(f"frame range: expected integers with start <= end, got {start!r}..{end!r}")
+
+    keys = set()
+    for i, p in enumerate(plan.get("placements", [])):
+        where = f"placements[{i}]"
+        if not isinstance(p.get("key"), str) or not isinstance(p.get("asset_id"), str):
+            errors.append(f"{where}: key and asset_id must be strings")
+        if p.get("key") in keys:
+            errors.append(f"{where}: duplicate key {p.get('key')!r}")
+        keys.add(p.get("key"))
+        _check_vector(errors, f"{where}.location", p.get("location"))
+        _check_vector(errors, f"{where}.scale", p.get("scale"))
+
+    for i, t in enumerate(plan.get("tracks", [])):
+        where = f"tracks[{i}]"
+        if t.get("target") not in keys:
+            errors.append(f"{where}: unknown target {t.get('target')!r}")
+        frames, values, width = t.get("frames", []), t.get("values", []), t.get("width", 0)
+        if not frames:
+            errors.append(f"{where}: no keyframes")
+        if width < 1 or len(values) != len(frames) * width:
+            errors.append(f"{where}: {len(values)} values for {len(frames)} frames of width {width}")
+        if any(b < a for a, b in zip(frames, frames[1:])):
+            errors.append(f"{where}: frames not in ascending order")
+        if not all(math.isfinite(v) for v in values):
+            errors.append(f"{where}: non-finite value")
+
+    children = set()
+    for i, a in enumerate(plan.get("attachments", [])):
+        where = f"attachments[{i}]"
+        for role in ("child", "parent"):
+            if a.get(role) not in keys:
+                errors.append(f"{where}: unknown {role} {a.get(role)!r}")
+        if a.get("child") == a.get("parent"):
+            errors.append(f"{where}: {a.get('child')!r} attached to itself")
+        if a.get("child") in children:
+            errors.append(f"{where}: {a.get('child')!r} attached twice")
+        children.add(a.get("child"))
+        _check_vector(errors, f"{where}.offset", a.get("offset"))
+
+    if errors:
+        raise Exception(f"Invalid scene plan {scene_id}:\n  " + "\n  ".join(errors))
+
+
+def track_rows(track):
+    """ the track's values as one list per frame; values may be an array or, in a plan built by hand, a list """
+    w = track["width"]
+    values = track["values"]
+    return [[float(v) for v in values[i:i + w]] for i in range(0, len(values), w)]
+
+
+# ---------- BINARY ENCODING ----------
+def _typecode(kind, version=PLAN_VERSION):
+    return "d" if kind in DOUBLE_KINDS and version >= 2 else "f"
+
+
+def _record(f, kind, meta=None, data=None):
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode() if meta is not None else b""
+    data_bytes = _le(data, _typecode(kind)) if data is not None else b""
+    f.write(_RECORD_HEADER.pack(kind, len(meta_bytes), len(data_bytes)))
+    f.write(meta_bytes)
+    f.write(data_bytes)
+
+
+def _le(floats, typecode="f"):
+    # the stream is little-endian
+    if not isinstance(floats, array) or floats.typecode != typecode:
+        floats = array(typecode, (float(v) for v in floats))
+    if sys.byteorder != "little":
+        floats = array(typecode, floats)
+        floats.byteswap()
+    return floats.tobytes()
+
+
+def _from_le(data, typecode="f"):
+    floats = array(typecode)
+    floats.frombytes(data)
+    if sys.byteorder != "little":
+        floats.byteswap()
+    return floats
+
+
+def write_header(f):
+    f.write(_FILE_HEADER.pack(MAGIC, PLAN_VERSION))
+
+
+def write_plan(f, plan):
+    """ append one plan's records to an open binary stream (after write_header) """
+    _record(f, SCENE, {k: plan[k] for k in ("scene_id", "frame_start", "frame_end")})
+
+    placements = plan["placements"]
+    _record(
+        f, PLACEMENTS,
+        {
+            "keys": [p["key"] for p in placements],
+            "asset_ids": [p["asset_id"] for p in placements],
+            "root_objects": [p["root_object"] for p in placements],
+        },
+        [x for p in placements for x in (*p["location"], *p["scale"])],
+    )
+
+    for t in plan["tracks"]:
+        _record(
+            f, TRACK,
+            {"target": t["target"], "data_path": t["data_path"], "width": t["width"], "keys": len(t["frames"])},
+            t["frames"] + t["values"],
+        )
+
+    attachments = plan["attachments"]
+    if attachments:
+        _record(
+            f, ATTACHMENTS,
+            {"children": [a["child"] for a in attachments], "parents": [a["parent"] for a in attachments]},
+            [x for a in attachments for x in a["offset"]],
+        )
+
+    _record(f, END)
+
+
+def save_plans(path, plans):
+    """ write plans (any iterable, consumed one at a time) to a .splan file; written to a temp name first so
+    a crash never leaves a truncated file behind. returns the number written """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    count = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            write_header(f)
+            for plan in plans:
+                write_plan(f, plan)
+                count += 1
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def save_plan(path, plan):
+    save_plans(path, [plan])
+    print("Scene plan saved:", path)
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise Exception("Truncated scene plan stream")
+    return data
+
+
+def iter_records(f):
+    """ (kind, meta, floats) per record of an open binary stream, after checking its header """
+    magic, version = _FILE_HEADER.unpack(_read_exact(f, _FILE_HEADER.size))
+    if magic != MAGIC:
+        raise Exception("Not a scene plan stream")
+    if version > PLAN_VERSION:
+        raise Exception(f"Scene plan version {version} is newer than this reader ({PLAN_VERSION})")
+
+    while True:
+        header = f.read(_RECORD_HEADER.size)
+        if not header:
+            return
+        if len(header) != _RECORD_HEADER.size:
+            raise Exception("Truncated scene plan stream")
+        kind, meta_len, data_len = _RECORD_HEADER.unpack(header)
+        meta = json.loads(_read_exact(f, meta_len)) if meta_len else None
+        yield kind, meta, _from_le(_read_exact(f, data_len), _typecode(kind, version))
+
+
+def iter_plans(f):
+    """ plans from an open binary stream, one at a time; no re-validation, that happened at compile time """
+    plan = None
+    for kind, meta, data in iter_records(f):
+        if kind == SCENE:
+            plan = {"version": PLAN_VERSION, **meta, "placements": [], "tracks": [], "attachments": []}
+        elif plan is None:
+            raise Exception("Scene plan record outside a scene")
+        elif kind == PLACEMENTS:
+            for i, key in enumerate(meta["keys"]):
+                row = data[i * TRANSFORM_WIDTH:(i + 1) * TRANSFORM_WIDTH].tolist()
+                plan["placements"].append({
+                    "key": key,
+                    "asset_id": meta["asset_ids"][i],
+                    "root_object": meta["root_objects"][i],
+                    "location": row[:3],
+                    "scale": row[3:],
+                })
+        elif kind == TRACK:
+            n = meta.pop("keys")
+            plan["tracks"].append({**meta, "frames": data[:n], "values": data[n:]})
+        elif kind == ATTACHMENTS:
+            for i, (child, parent) in enumerate(zip(meta["children"], meta["parents"])):
+                plan["attachments"].append({"child": child, "parent": parent, "offset": data[i * 3:i * 3 + 3].tolist()})
+        elif kind == END:
+            yield plan
+            plan = None
+        # unknown record kinds from newer minor writers are skipped
+
+    if plan is not None:
+        raise Exception("Truncated scene plan stream")
+
+
+def read_plans(path):
+    """ plans from a .splan file ("-" = stdin), streamed """
+    if path == "-":
+        yield from iter_plans(sys.stdin.buffer)
+        return
+    with open(path, "rb") as f:
+        yield from iter_plans(f)
+
+
+def load_plan(path):
+    for plan in read_plans(path):
+        return plan
+    raise Exception(f"No scene plan in {path}")
+
+
+def to_json(plan):
+    """ plain JSON-able copy (arrays as lists), for inspection """
+    return {
+        **plan,
+        "tracks": [{**t, "frames": [float(v) for v in t["frames"]], "values": [float(v) for v in t["values"]]}
+                   for t in plan["tracks"]],
+    }
+
+
+# Usage: python scene_plan.py compile scene.json [more.json | manifests.jsonl ...] out.splan
+#        python scene_plan.py dump plans.splan          (JSON lines, for inspection)
+if __name__ == "__main__":
+    command, paths = sys.argv[1], sys.argv[2:]
+
+    if command == "dump":
+        for plan in read_plans(paths[0]):
+            print(json.dumps(to_json(plan)))
+    elif command == "compile":
+        def manifests():
+            for path in paths[:-1]:
+                with open(path) as f:
+                    if path.endswith(".jsonl"):
+                        for line in f:
+                            if line.strip():
+                                yield compile_plan(json.loads(line))
+                    else:
+                        yield compile_plan(json.load(f))
+
+        print(f"{save_plans(paths[-1], manifests())} plans written to {paths[-1]}")
+    else:
+        raise Exception(f"Unknown command: {command} (expected compile or dump)")
@@ -1,10 +1,15 @@
 # mvp/scene_rebuilder.py
 
 import bpy
-import json
 import os
+import sys
 from mathutils import Vector
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import asset_library
+from keyframes import write_keyframes
+import scene_plan
+
 # CONFIG
 ASSETS_ROOT = "assets"
 MANIFEST_DIR = os.path.join(ASSETS_ROOT, "manifests")
@@ -15,28 +20,13 @@ ASSET_FILES = {
     "court_1": "court.glb"
 }
 
-SCENE_MANIFEST = os.path.join(MANIFEST_DIR, "scene_001.scene.json")
+SCENE_MANIFEST = os.path.join(MANIFEST_DIR, "scene_001" + scene_plan.PLAN_EXT)
 
 
 # RESET SCENE
 bpy.ops.wm.read_factory_settings(use_empty=True)
 
 
-# IMPORT ASSET (same logic as your generator)
-def import_asset(path):
-    before = set(bpy.data.objects)
-
-    if path.lower().endswith(".fbx"):
-        bpy.ops.import_scene.fbx(filepath=path)
-    elif path.lower().endswith(".glb") or path.lower().endswith(".gltf"):
-        bpy.ops.import_scene.gltf(filepath=path)
-    else:
-        raise Exception("Unsupported format: " + path)
-
-    after = set(bpy.data.objects)
-    return list(after - before)
-
-
 # WRAP ASSET (preserve hierarchy)
 def wrap_asset(name, objects):
     root = bpy.data.objects.new(name, None)
@@ -53,14 +43,14 @@ def wrap_asset(name, objects):
 if not os.path.exists(SCENE_MANIFEST):
     raise Exception("Scene manifest not found")
 
-with open(SCENE_MANIFEST, "r") as f:
-    scene_data = json.load(f)
+scene_data = scene_plan.load_plan(SCENE_MANIFEST)
 
 
 # IMPORT ALL ASSETS FROM MANIFEST
 ASSETS = {}
 
-for asset_id, data in scene_data["assets"].items():
+for data in scene_data["placements"]:
+    asset_id = data["asset_id"]
 
     if asset_id not in ASSET_FILES:
         print("Unknown asset:", asset_id)
@@ -70,14 +60,14 @@ for asset_id, data in scene_data["assets"].items():
 
     print("Importing:", asset_id)
 
-    objs = import_asset(asset_path)
-    root = wrap_asset(data["root_object"], objs)
+    imported = asset_library.load_asset(asset_path)
+    root = wrap_asset(data["root_object"] or asset_id, imported.roots)
 
-    # Apply transform from scene manifest
-    root.location = Vector(data.get("location", [0, 0, 0]))
-    root.scale = Vector(data.get("scale", [1, 1, 1]))
+    # Apply transform from scene plan
+    root.location = Vector(data["location"])
+    root.scale = Vector(data["scale"])
 
-    ASSETS[asset_id] = root
+    ASSETS[data["key"]] = root
 
 
 # APPLY SCENE FRAME RANGE
@@ -88,11 +78,7 @@ bpy.context.scene.frame_end = scene_data["frame_end"]
 # OPTIONAL: REBUILD SIMPLE LINEAR ANIMATION
 # (Only if animation exists in manifest in future)
 def animate_move(obj, start, end, f1, f2):
-    obj.location = start
-    obj.keyframe_insert(data_path="location", frame=f1)
-
-    obj.location = end
-    obj.keyframe_insert(data_path="location", frame=f2)
+    write_keyframes(obj, "location", [f1, f2], [start, end])
 
 
 print("\n[SUCCESS] Scene rebuilt deterministically from scene manifest.")
@@ -0,0 +1,305 @@
+# mvp/stub_backend.py
+""" in-memory scene_backend for running the engine without Blender: objects with parent/child hierarchies and
+4x4 NumPy transforms, mesh bounding boxes read from glTF accessor min/max, linearly interpolated keyframes.
+"rendering" evaluates the animation and writes each placement's world location per frame as JSON.
+pure Python + NumPy (no bpy). """
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from scene_backend import SceneBackend
+
+GLB_MAGIC = 0x46546C67
+CHUNK_JSON = 0x4E4F534A
+
+# Blender's glTF importer turns glTF's +Y up into +Z up: (x, y, z) -> (x, -z, y)
+Y_UP_TO_Z_UP = np.array([
+    [1, 0, 0, 0],
+    [0, 0, -1, 0],
+    [0, 1, 0, 0],
+    [0, 0, 0, 1],
+], dtype=np.float64)
+
+# formats the stub can't read (FBX) come in as one mesh of this size
+UNIT_BOUNDS = np.array([[-0.5, -0.5, 0.0], [0.5, 0.5, 1.0]])
+
+_CORNERS = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float64)
+
+
+class StubObject:
+    """ a mesh (local `bounds` as a (2, 3) min / max array) or an empty; `keys` maps (data_path, index) to
+    sorted (frame, value) pairs """
+
+    def __init__(self, name, bounds=None):
+        self.name = name
+        self.bounds = bounds
+        self.parent = None
+        self.children = []
+        self.matrix_basis = np.identity(4)
+        self.matrix_parent_inverse = np.identity(4)
+        self.instance = None
+        self.keys = {}
+
+    @property
+    def type(self):
+        return "MESH" if self.bounds is not None else "EMPTY"
+
+    def set_parent(self, parent):
+        if self.parent is not None:
+            self.parent.children.remove(self)
+        self.parent = parent
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def children_recursive(self):
+        out = []
+        stack = list(self.children)
+        while stack:
+            obj = stack.pop()
+            out.append(obj)
+            stack.extend(obj.children)
+        return out
+
+    def value_at(self, data_path, index, frame, default):
+        keys = self.keys.get((data_path, index))
+        if not keys:
+            return default
+        frames = [f for f, _ in keys]
+        return float(np.interp(frame, frames, [v for _, v in keys]))
+
+    def basis_at(self, frame=None):
+        """ matrix_basis with animated location applied at `frame` (None = as set) """
+        if frame is None or not self.keys:
+            return self.matrix_basis
+        basis = self.matrix_basis.copy()
+        for i in range(3):
+            basis[i, 3] = self.value_at("location", i, frame, basis[i, 3])
+        return basis
+
+    def matrix_world_at(self, frame=None):
+        mat = self.basis_at(frame)
+        if self.parent is not None:
+            mat = self.parent.matrix_world_at(frame) @ self.matrix_parent_inverse @ mat
+        return mat
+
+    @property
+    def matrix_world(self):
+        return self.matrix_world_at()
+
+
+class StubAsset:
+    """ what asset_import.ImportResult is in Blender: the objects of one import """
+
+    def __init__(self, name, objects):
+        self.name = name
+        self.objects = objects
+        self.linked = True
+
+    @property
+    def roots(self):
+        return [o for o in self.objects if o.parent is None]
+
+    @property
+    def meshes(self):
+        return [o for o in self.objects if o.type == "MESH"]
+
+
+# ---------- GLTF ----------
+def read_gltf(path):
+    """ the glTF JSON of a .glb or .gltf file """
+    if path.lower().endswith(".gltf"):
+        with open(path) as f:
+            return json.load(f)
+
+    with open(path, "rb") as f:
+        magic, _version, _length = struct.unpack("<III", f.read(12))
+        if magic != GLB_MAGIC:
+            raise Exception(f"Not a GLB file: {path}")
+        chunk_length, chunk_type = struct.unpack("<II", f.read(8))
+        if chunk_type != CHUNK_JSON:
+            raise Exception(f"GLB without a JSON chunk: {path}")
+        return json.loads(f.read(chunk_length))
+
+
+def _quat_matrix(x, y, z, w):
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+def _euler_matrix(x, y, z):
+    """ XYZ euler, as Blender applies it: X first, then Y, then Z """
+    cx, sx, cy, sy, cz, sz = np.cos(x), np.sin(x), np.cos(y), np.sin(y), np.cos(z), np.sin(z)
+    rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+def node_matrix(node):
+    if "matrix" in node:
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T  # glTF is column-major
+    mat = np.identity(4)
+    mat[:3, :3] = _quat_matrix(*node.get("rotation", (0, 0, 0, 1))) * np.array(node.get("scale", (1, 1, 1)))
+    mat[:3, 3] = node.get("translation", (0, 0, 0))
+    return mat
+
+
+def mesh_bounds(gltf, mesh_index):
+    """ union of the POSITION accessor min / max over the mesh's primitives (required by the glTF spec) """
+    lo, hi = np.full(3, np.inf), np.full(3, -np.inf)
+    for prim in gltf["meshes"][mesh_index]["primitives"]:
+        accessor = gltf["accessors"][prim["attributes"]["POSITION"]]
+        lo = np.minimum(lo, accessor["min"])
+        hi = np.maximum(hi, accessor["max"])
+    return np.array([lo, hi])
+
+
+def gltf_objects(gltf, prefix):
+    """ one StubObject per node, parented like the node tree, roots converted to Z-up """
+    objects = []
+    for i, node in enumerate(gltf.get("nodes", [])):
+        bounds = mesh_bounds(gltf, node["mesh"]) if "mesh" in node else None
+        obj = StubObject(node.get("name") or f"{prefix}_{i}", bounds)
+        obj.matrix_basis = node_matrix(node)
+        objects.append(obj)
+
+    for node, obj in zip(gltf.get("nodes", []), objects):
+        for child in node.get("children", []):
+            objects[child].set_parent(obj)
+
+    for obj in objects:
+        if obj.parent is None:
+            obj.matrix_basis = Y_UP_TO_Z_UP @ obj.matrix_basis
+    return objects
+
+
+# ---------- BACKEND ----------
+class Backend(SceneBackend):
+    name = "stub"
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.scene_objects = []   # objects linked to the scene directly
+        self.assets = []          # every loaded asset, stored or not
+        self.frame_range = (1, 250)
+
+    def load_asset(self, path, normalization=None):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if path.lower().endswith((".glb", ".gltf")):
+            objects = gltf_objects(read_gltf(path), name)
+        elif path.lower().endswith(".fbx"):
+            objects = [StubObject(name, UNIT_BOUNDS.copy())]
+        else:
+            raise Exception("Unsupported format: " + path)
+
+        if normalization is not None:
+            # as asset_library bakes it: the roots get the rotation + scale of the empty that would wrap them
+            matrix = np.identity(4)
+            matrix[:3, :3] = _euler_matrix(*normalization["rotation"]) * normalization["scale_factor"]
+            for obj in objects:
+                if obj.parent is None:
+                    obj.matrix_basis = matrix @ obj.matrix_basis
+
+        asset = StubAsset(name, objects)
+        self.assets.append(asset)
+        return asset
+
+    def wrap(self, name, asset):
+        root = StubObject(name)
+        for obj in asset.roots:
+            obj.set_parent(root)
+        asset.name = name
+        asset.objects.append(root)
+        return root
+
+    def store(self, asset):
+        asset.linked = False
+
+    def instance(self, name, asset):
+        placement = StubObject(name)
+        placement.instance = asset
+        self.scene_objects.append(placement)
+        return placement
+
+    def remove(self, obj):
+        obj.set_parent(None)
+        for child in list(obj.children):
+            child.set_parent(None)
+        if obj in self.scene_objects:
+            self.scene_objects.remove(obj)
+
+    def bbox(self, obj, exact=False):
+        """ the 8 bounds corners per mesh in world space, like bbox.objects_bbox; the stub keeps no vertices,
+        so exact is the same as not """
+        meshes = [o for o in obj.children_recursive if o.bounds is not None]
+        if not meshes:
+            return None
+
+        mats = np.array([m.matrix_world for m in meshes])
+        lo = np.array([m.bounds[0] for m in meshes])[:, None, :]
+        size = np.array([m.bounds[1] - m.bounds[0] for m in meshes])[:, None, :]
+        corners = lo + _CORNERS[None] * size
+        world = np.einsum("nij,nkj->nki", mats[:, :3, :3], corners) + mats[:, None, :3, 3]
+        world = world.reshape(-1, 3)
+        return world.min(axis=0), world.max(axis=0)
+
+    def set_location(self, obj, location):
+        obj.matrix_basis[:3, 3] = location
+
+    def set_rotation(self, obj, rotation):
+        scale = np.linalg.norm(obj.matrix_basis[:3, :3], axis=0)
+        obj.matrix_basis[:3, :3] = _euler_matrix(*rotation) * scale
+
+    def scale(self, obj, factor):
+        obj.matrix_basis[:3, :3] *= factor
+
+    def set_scale(self, obj, scale):
+        basis = obj.matrix_basis[:3, :3]
+        basis *= np.asarray(scale, dtype=float) / np.linalg.norm(basis, axis=0)
+
+    def attach(self, child, parent, offset):
+        child.set_parent(parent)
+        child.matrix_parent_inverse = np.identity(4)
+        child.matrix_basis[:3, 3] = offset
+
+    def update(self):
+        # world matrices are computed on access
+        pass
+
+    def keyframe(self, obj, data_path, frames, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        if len(frames) != len(values):
+            raise Exception(f"{data_path}: {len(frames)} frames but {len(values)} values")
+
+        for i in range(values.shape[1]):
+            keys = dict(obj.keys.get((data_path, i), []))
+            keys.update(zip((float(f) for f in frames), values[:, i].tolist()))
+            obj.keys[(data_path, i)] = sorted(keys.items())
+
+    def set_frame_range(self, start, end):
+        self.frame_range = (start, end)
+
+    def render(self, directory):
+        """ directory/frames.json: {"frame_start", "frame_end", "frames": [{object name: world location}]} """
+        start, end = self.frame_range
+        frames = [
+            {obj.name: obj.matrix_world_at(frame)[:3, 3].round(6).tolist() for obj in self.scene_objects}
+            for frame in range(start, end + 1)
+        ]
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "frames.json")
+        with open(path, "w") as f:
+            json.dump({"frame_start": start, "frame_end": end, "frames": frames}, f)
+        print("Rendered:", path)
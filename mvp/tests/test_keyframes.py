@@ -0,0 +1,67 @@
+# mvp/tests/test_keyframes.py
+""" keyframes.fill_fcurve against an in-memory fcurve: re-keyed frames are overwritten, not duplicated.
+runs without Blender (fill_fcurve only touches the fcurve it is given); run with pytest from the repo root. """
+
+import os
+import sys
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.modules.setdefault("bpy", types.ModuleType("bpy"))
+import keyframes
+
+
+class Point:
+    def __init__(self):
+        self.co = (0.0, 0.0)
+        self.interpolation = "BEZIER"
+
+
+class Points(list):
+    """ the parts of bpy's FCurveKeyframePoints fill_fcurve uses """
+
+    def add(self, count):
+        self.extend(Point() for _ in range(count))
+
+    def foreach_get(self, attr, out):
+        out[:] = np.array([p.co for p in self], dtype=np.float32).ravel()
+
+    def foreach_set(self, attr, values):
+        assert len(values) == len(self) * 2
+        for p, co in zip(self, np.asarray(values).reshape(-1, 2)):
+            p.co = tuple(float(v) for v in co)
+
+
+class FCurve:
+    def __init__(self):
+        self.keyframe_points = Points()
+
+    def update(self):
+        self.keyframe_points.sort(key=lambda p: p.co[0])
+
+    def keys(self):
+        return [p.co for p in self.keyframe_points]
+
+
+def test_keys_are_appended():
+    fcurve = FCurve()
+    keyframes.fill_fcurve(fcurve, [1, 10], [0.0, 1.0])
+    keyframes.fill_fcurve(fcurve, [20], [2.0])
+    assert fcurve.keys() == [(1, 0), (10, 1), (20, 2)]
+
+
+def test_same_frame_twice_overwrites():
+    fcurve = FCurve()
+    keyframes.fill_fcurve(fcurve, [1, 10], [0.0, 1.0])
+    keyframes.fill_fcurve(fcurve, [10, 30], [5.0, 3.0], interpolation="LINEAR")
+    assert fcurve.keys() == [(1, 0), (10, 5), (30, 3)]
+    assert [p.interpolation for p in fcurve.keyframe_points] == ["BEZIER", "LINEAR", "LINEAR"]
+
+
+def test_same_frame_twice_in_one_call_keeps_the_last():
+    fcurve = FCurve()
+    keyframes.fill_fcurve(fcurve, [1, 5, 1], [0.0, 1.0, 2.0], interpolation=["BEZIER", "LINEAR", "CONSTANT"])
+    assert fcurve.keys() == [(1, 2), (5, 1)]
+    assert [p.interpolation for p in fcurve.keyframe_points] == ["CONSTANT", "LINEAR"]
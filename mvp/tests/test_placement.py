@@ -0,0 +1,174 @@
+# mvp/tests/test_placement.py
+""" placement.place_objects at scale: no overlaps per level, "near" within its distance, "on" within its surface.
+pure Python; run with pytest from the repo root. """
+
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import placement
+from placement import Rect, SpatialGrid
+
+COURT = {"key": "court", "dims": (60.0, 60.0, 0.1), "position": [0, 0, 0], "floor": True}
+
+
+def check(items, positions):
+    """ assert every placement constraint holds """
+    by_key = {item["key"]: item for item in items}
+    grids = {}
+
+    def rect(key):
+        x, y, _z = positions[key]
+        return Rect.around(x, y, *by_key[key]["dims"][:2])
+
+    for item in items:
+        key = item["key"]
+        if item.get("floor"):
+            continue
+        level = item.get("on", "court" if "court" in by_key else None)
+        grid = grids.setdefault(level, SpatialGrid(1.0))
+        assert not grid.overlaps(rect(key)), f"{key} overlaps on {level}"
+        grid.insert(rect(key))
+
+        if item.get("on"):
+            assert rect(item["on"]).contains(Rect.around(*positions[key][:2], 0, 0)), f"{key} off {item['on']}"
+            target = by_key[item["on"]]
+            assert math.isclose(positions[key][2], positions[item["on"]][2] + target["dims"][2])
+        if item.get("near") and item.get("distance") is not None:
+            gap = math.dist(positions[key][:2], positions[item["near"]][:2])
+            assert gap <= item["distance"] + 1e-9, f"{key} is {gap:.2f} from {item['near']}"
+
+
+def pairs(count, distance=1.0, floor=True):
+    items = [dict(COURT)] if floor else []
+    for i in range(count):
+        items.append({"key": f"k{i}", "dims": (0.5, 0.4, 1.2)})
+        items.append({"key": f"b{i}", "dims": (0.24, 0.24, 0.24), "near": f"k{i}", "distance": distance})
+    return items
+
+
+def test_near_pairs_at_scale():
+    for count in (30, 200, 500):
+        items = pairs(count)
+        check(items, placement.place_objects(items))
+
+
+def test_near_pairs_on_open_ground():
+    items = pairs(1000, floor=False)
+    check(items, placement.place_objects(items))
+
+
+def test_near_without_distance_stays_close():
+    items = pairs(500, distance=None)
+    positions = placement.place_objects(items)
+    check(items, positions)
+    worst = max(math.dist(positions[f"k{i}"][:2], positions[f"b{i}"][:2]) for i in range(500))
+    assert worst < 1.0
+
+
+def work(items):
+    """ overlap queries and rect comparisons place_objects makes for `items`: deterministic, unlike a timing """
+    counts = {"queries": 0, "comparisons": 0}
+    first_overlap, overlaps = SpatialGrid.first_overlap, Rect.overlaps
+
+    def counted_first_overlap(self, rect):
+        counts["queries"] += 1
+        return first_overlap(self, rect)
+
+    def counted_overlaps(self, other):
+        counts["comparisons"] += 1
+        return overlaps(self, other)
+
+    SpatialGrid.first_overlap, Rect.overlaps = counted_first_overlap, counted_overlaps
+    try:
+        placement.place_objects(items)
+    finally:
+        SpatialGrid.first_overlap, Rect.overlaps = first_overlap, overlaps
+    return counts
+
+
+def test_near_pairs_scale_linearly():
+    small, large = work(pairs(500, floor=False)), work(pairs(5000, floor=False))
+    for measure in ("queries", "comparisons"):
+        # 10x the objects: linear is ~10x the work, quadratic ~100x
+        assert large[measure] < small[measure] * 15, measure
+
+
+def test_on_and_near_chains_with_bulk():
+    rng = random.Random(1)
+    items = [dict(COURT)]
+    for i in range(300):
+        items.append({"key": f"t{i}", "dims": (1.2, 0.8, 0.75)})
+        items.append({"key": f"c{i}", "dims": (0.1, 0.1, 0.1), "on": f"t{i}"})
+        items.append({"key": f"p{i}", "dims": (0.3, 0.3, 0.3), "near": f"c{i}", "distance": 1.5})
+        items.append({"key": f"x{i}", "dims": (rng.uniform(0.2, 1.5), rng.uniform(0.2, 1.5), 0.5)})
+    check(items, placement.place_objects(items))
+
+
+def test_near_a_fixed_object():
+    items = [dict(COURT), {"key": "goal", "dims": (2.0, 1.0, 2.0), "position": [10, 10, 0]}]
+    items += [{"key": f"b{i}", "dims": (0.24, 0.24, 0.24), "near": "goal", "distance": 3.0} for i in range(40)]
+    check(items, placement.place_objects(items))
+
+
+def test_circular_targets_are_reported():
+    items = [{"key": "a", "dims": (1, 1, 1), "near": "b"}, {"key": "b", "dims": (1, 1, 1), "near": "a"}]
+    try:
+        placement.place_objects(items)
+    except Exception as e:
+        assert "circular" in str(e)
+    else:
+        raise AssertionError("circular targets were placed")
+
+
+def test_fixed_positions_are_absolute():
+    items = [{"key": "court", "dims": (60.0, 60.0, 0.1), "position": [0, 0, 0], "floor": True, "surface": 0.1},
+             {"key": "goal", "dims": (2.0, 1.0, 2.0), "position": [10, 10, 0.1]},
+             {"key": "table", "dims": (1.2, 0.8, 0.75), "position": [-5, -5, 0.1]},
+             {"key": "cup", "dims": (0.1, 0.1, 0.1), "position": [-5, -5, 0.85], "on": "table"},
+             {"key": "kid", "dims": (0.5, 0.4, 1.2)}]
+    positions = placement.place_objects(items)
+    check(items, positions)
+    assert positions["goal"] == [10, 10, 0.1]
+    assert positions["cup"] == [-5, -5, 0.85]
+    assert math.isclose(positions["kid"][2], 0.1)
+
+
+def test_floor_taller_than_its_surface():
+    # an arena with 8m walls: objects stand on its ground, not on top of the walls
+    items = [{"key": "arena", "dims": (30.0, 30.0, 8.0), "position": [0, 0, 0], "floor": True},
+             {"key": "kid", "dims": (0.5, 0.4, 1.2)},
+             {"key": "ball", "dims": (0.24, 0.24, 0.24), "near": "kid", "distance": 1.0}]
+    positions = placement.place_objects(items)
+    assert positions["kid"][2] == 0.0 and positions["ball"][2] == 0.0
+
+    items[0]["surface"] = 0.2
+    positions = placement.place_objects(items)
+    assert math.isclose(positions["kid"][2], 0.2) and math.isclose(positions["ball"][2], 0.2)
+
+
+def test_floor_on_something_is_rejected():
+    items = [dict(COURT), {"key": "rug", "dims": (2.0, 2.0, 0.01), "floor": True, "on": "court"}]
+    try:
+        placement.place_objects(items)
+    except Exception as e:
+        assert "Floors stand on the ground" in str(e)
+    else:
+        raise AssertionError("a floor's \"on\" was ignored")
+
+
+def test_on_a_movable_object_near_a_fixed_one():
+    items = [{"key": "table", "dims": (2.0, 2.0, 1.0)}, {"key": "goal", "dims": (1.0, 1.0, 1.0), "position": [5, 5, 0]},
+             {"key": "cup", "dims": (0.5, 0.5, 0.5), "near": "goal", "on": "table"}]
+    check(items, placement.place_objects(items))
+
+    items = [dict(COURT), {"key": "table", "dims": (4.0, 3.0, 1.0)},
+             {"key": "goal", "dims": (1.0, 1.0, 1.0), "position": [5, 5, 0]},
+             {"key": "cup", "dims": (0.5, 0.5, 0.5), "near": "goal", "on": "table"},
+             {"key": "ball", "dims": (0.5, 0.5, 0.5), "near": "court", "on": "table"}]
+    positions = placement.place_objects(items)
+    check(items, positions)
+    # the corner of the table closest to the goal
+    assert positions["cup"][0] > positions["table"][0] and positions["cup"][1] > positions["table"][1]
@@ -0,0 +1,51 @@
+# mvp/tests/test_scene_plan.py
+""" scene_plan: compile + .splan round trip. pure Python; run with pytest from the repo root. """
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scene_plan
+
+MANIFEST = {
+    "scene_id": "kid_playing_ball",
+    "frame_start": 1,
+    "frame_end": 120,
+    "assets": {
+        "kid_1": {"asset_id": "kid_1", "root_object": "Kid", "location": [0.3, -1.7, 0.1]},
+        "ball_1": {"asset_id": "ball_1", "root_object": "Ball", "location": [1.1, 0.2, 0.0], "scale": [0.7, 0.7, 0.7]},
+    },
+    "animations": [{"asset_id": "kid_1", "type": "linear_move", "start": [0, 0, 0], "end": [3, 0, 0],
+                    "frames": [1, 120]}],
+    "attachments": [{"child": "ball_1", "parent": "kid_1", "offset": [0.3, 0, 1]}],
+}
+
+
+def round_trip(plan):
+    f = io.BytesIO()
+    scene_plan.write_header(f)
+    scene_plan.write_plan(f, plan)
+    f.seek(0)
+    return next(scene_plan.iter_plans(f))
+
+
+def test_round_trip_keeps_transforms_exact():
+    plan = scene_plan.compile_plan(MANIFEST)
+    loaded = round_trip(plan)
+    assert loaded == plan
+    assert loaded["placements"][0]["location"] == [0.3, -1.7, 0.1]
+    assert loaded["attachments"][0]["offset"] == [0.3, 0.0, 1.0]
+
+
+def test_unknown_animation_types_are_dropped():
+    manifest = dict(MANIFEST, animations=MANIFEST["animations"] + [{"asset_id": "kid_1", "type": "wiggle"}])
+    plan = scene_plan.compile_plan(manifest)
+    assert len(plan["tracks"]) == 1
+
+
+def test_track_rows_of_plain_lists():
+    track = {"target": "kid_1", "data_path": "location", "width": 3, "frames": [1, 2], "values": [0, 0, 0, 1, 2, 3]}
+    assert scene_plan.track_rows(track) == [[0.0, 0.0, 0.0], [1.0, 2.0, 3.0]]
+    assert scene_plan.track_rows(scene_plan.keyframe_track("kid_1", "location", [1, 2], [[0, 0, 0], [1, 2, 3]])) == \
+        [[0.0, 0.0, 0.0], [1.0, 2.0, 3.0]]
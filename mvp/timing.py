@@ -0,0 +1,211 @@
+# mvp/timing.py
+""" lightweight per-stage instrumentation: `with stage("import"):` / `@timed("render")` time a block into the
+active job record, records go out as JSON lines, and Timings aggregates them into percentiles.
+pure Python (no bpy), so the Blender builders and the Flask runner share it. """
+
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# every stage / lap is also printed as a `[timing]` line when set; off by default, as the same numbers are in the
+# job records (and the runner's /stats/timings)
+VERBOSE = os.environ.get("TIMING_VERBOSE", "") not in ("", "0")
+
+_local = threading.local()
+
+
+def _log(*args):
+    if VERBOSE:
+        print("[timing]", *args)
+
+
+def max_rss_mb():
+    """ this process's memory high-water mark over its whole lifetime, so in a resident worker it is the largest
+    of every job so far, not the current one's (ru_maxrss is KiB on Linux, bytes on macOS) """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def rss_mb():
+    """ this process's resident memory right now, from /proc/self/statm; None where there is no /proc """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+class JobRecord:
+    """ stage -> seconds for one job, plus free-form fields and the resident memory before and after it """
+
+    def __init__(self, job_id=None, **fields):
+        self.job_id = job_id
+        self.fields = fields
+        self.stages = {}
+        self.started_at = time.time()
+        self.rss_before_mb = rss_mb()
+        self.error = None
+
+    def add(self, name, seconds):
+        # a stage entered more than once (e.g. one import per asset) accumulates
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, stages, prefix=""):
+        """ fold in stage timings measured elsewhere, e.g. inside the Blender worker """
+        for name, seconds in (stages or {}).items():
+            self.add(prefix + name, seconds)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "started_at": self.started_at,
+            "total": time.time() - self.started_at,
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "rss_before_mb": _round(self.rss_before_mb),
+            "rss_after_mb": _round(rss_mb()),
+            # cumulative over the process's lifetime, not this job's own peak
+            "process_peak_rss_mb": round(max_rss_mb(), 1),
+            "error": self.error,
+            **self.fields,
+        }
+
+
+def current():
+    """ the record `stage()` writes to on this thread, or None """
+    return getattr(_local, "record", None)
+
+
+@contextmanager
+def job(job_id=None, **fields):
+    """ make a fresh JobRecord the active one on this thread for the duration of the block """
+    previous = current()
+    record = _local.record = JobRecord(job_id, **fields)
+    try:
+        yield record
+    except Exception as e:
+        record.error = str(e)
+        raise
+    finally:
+        _local.record = previous
+
+
+@contextmanager
+def stage(name):
+    """ time the block into the active record (still fine to use with none active) """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        record = current()
+        if record is not None:
+            record.add(name, seconds)
+        _log(f"{name}: {seconds:.3f}s")
+
+
+class Laps:
+    """ for long linear scripts: lap(name) books the time since the previous lap (or creation) as `name` """
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        seconds, self.last = now - self.last, now
+        record = current()
+        if record is not None:
+            record.add(name, seconds)
+        _log(f"{name}: {seconds:.3f}s")
+        return seconds
+
+
+def timed(name=None):
+    """ decorator form of stage(); defaults to the function name """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiled(path=None):
+    """ cProfile the block and dump stats to `path` (open with pstats / snakeviz); no-op when path is None """
+    if not path:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profiler.dump_stats(path)
+        _log("profile written:", path)
+
+
+_write_lock = threading.Lock()
+
+
+def write_record(record, path):
+    """ append one record as a JSON line """
+    data = record.to_dict() if isinstance(record, JobRecord) else record
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _write_lock, open(path, "a") as f:
+        f.write(json.dumps(data) + "\n")
+
+
+def percentile(sorted_values, p):
+    """ linear-interpolated percentile (0-100) of an already sorted list """
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Timings:
+    """ rolling window of the last `window` values per stage, summarized as percentiles """
+
+    def __init__(self, window=1000, percentiles=(50, 90, 99)):
+        self.window = window
+        self.percentiles = percentiles
+        self.values = defaultdict(lambda: deque(maxlen=window))
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        data = record.to_dict() if isinstance(record, JobRecord) else record
+        with self.lock:
+            for name, seconds in data["stages"].items():
+                self.values[name].append(seconds)
+            self.values["total"].append(data["total"])
+
+    def summary(self):
+        with self.lock:
+            snapshot = {name: sorted(values) for name, values in self.values.items()}
+
+        return {
+            name: {
+                "count": len(values),
+                "mean": round(sum(values) / len(values), 4),
+                **{f"p{p}": round(percentile(values, p), 4) for p in self.percentiles},
+            }
+            for name, values in snapshot.items() if values
+        }
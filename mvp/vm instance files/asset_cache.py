@@ -0,0 +1,138 @@
+# asset_cache.py
+""" on-disk asset cache keyed by Drive file id + content version, with LRU eviction and per-key download locks """
+
+import os
+import re
+import stat
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+import metrics
+
+
+# ---------- CONFIG ----------
+ASSET_CACHE_MAX_BYTES = int(float(os.environ.get("ASSET_CACHE_MAX_GB", "20")) * 1024 ** 3)
+FILE_ID = re.compile(r"[A-Za-z0-9_-]+")   # Drive file ids; anything else could name a path outside the cache
+EXT = re.compile(r"(\.[A-Za-z0-9]+)?")
+ENTRY = re.compile(r"[A-Za-z0-9_-]+_[A-Za-z0-9]+(\.[A-Za-z0-9]+)?")   # what path_for names files
+
+
+CACHE_REQUESTS = metrics.Counter("blender_asset_cache_requests_total", "Asset cache lookups", ("result",))
+CACHE_EVICTIONS = metrics.Counter("blender_asset_cache_evicted_bytes_total", "Bytes evicted from the asset cache")
+
+
+class AssetCache:
+    """ files live at <root>/<file_id>_<version><ext>; mtime doubles as the LRU clock """
+
+    def __init__(self, root, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.key_locks = {}   # path -> [lock, callers holding or waiting on it]
+        self.pins = Counter()  # paths used by running jobs, never evicted
+        os.makedirs(root, exist_ok=True)
+
+        # leftovers from a crash mid-download
+        for name in os.listdir(root):
+            if name.endswith(".part"):
+                os.remove(os.path.join(root, name))
+
+    def path_for(self, file_id, version, ext):
+        if not FILE_ID.fullmatch(file_id or ""):
+            raise Exception(f"Invalid asset file id: {file_id!r}")
+        if not EXT.fullmatch(ext):
+            raise Exception(f"Invalid asset extension: {ext!r}")
+        safe_version = "".join(c for c in version if c.isalnum()) or "latest"
+        return os.path.join(self.root, f"{file_id}_{safe_version}{ext}")
+
+    @contextmanager
+    def _key_lock(self, path):
+        """ hold the path's download lock; it is dropped once nobody holds or waits on it """
+        with self.lock:
+            entry = self.key_locks.setdefault(path, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.key_locks[path]
+
+    def get(self, file_id, version, ext, fetch):
+        """ return a local path for the asset, calling fetch(tmp_path) only on a miss.
+        the path stays pinned until release() so eviction can't pull it from under a render """
+        path = self.path_for(file_id, version, ext)
+
+        # pinned before looking, so an evict() running in between can't delete the file once it was found
+        with self.lock:
+            self.pins[path] += 1
+
+        try:
+            # concurrent jobs needing the same asset wait here and share one download
+            with self._key_lock(path):
+                if os.path.exists(path):
+                    print("Asset cache hit:", path)
+                    CACHE_REQUESTS.inc(result="hit")
+                    os.utime(path)
+                else:
+                    print("Asset cache miss:", path)
+                    CACHE_REQUESTS.inc(result="miss")
+                    tmp_path = f"{path}.{threading.get_ident()}.part"
+                    try:
+                        fetch(tmp_path)
+                        os.replace(tmp_path, path)  # atomic: readers never see a partial file
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+        except BaseException:
+            self.release([path])
+            raise
+
+        self.evict()
+        return path
+
+    def release(self, paths):
+        with self.lock:
+            for path in paths:
+                self.pins[path] -= 1
+                if self.pins[path] <= 0:
+                    del self.pins[path]
+
+    def _entries(self):
+        """ (mtime, size, path) of the cache's own <file_id>_<version><ext> files; anything else under root (the
+        compiled asset library, partial writes) isn't ours to evict """
+        for name in os.listdir(self.root):
+            if not ENTRY.fullmatch(name):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                yield st.st_mtime, st.st_size, path
+
+    def evict(self):
+        """ remove least recently used unpinned files until the cache fits max_bytes; never raises, so a full
+        or misbehaving disk can't fail the fetch that triggered it """
+        with self.lock:
+            entries = list(self._entries())
+            total = sum(size for _, size, _ in entries)
+
+            # least recently used first
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path in self.pins:
+                    continue
+                print("Asset cache evict:", path)
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print("Asset cache evict failed:", path, e)
+                    continue
+                total -= size
+                CACHE_EVICTIONS.inc(size)
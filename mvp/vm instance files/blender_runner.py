@@ -1,16 +1,34 @@
 # blender_runner.py
-""" Flask server to receive rendering jobs, download assets from Google Drive, run Blender, and upload results to GCS. """
+""" Flask server to receive rendering jobs, download assets from Google Drive, run Blender, and upload results to GCS.
+Jobs are queued and processed in the background; poll /jobs/<id> for the result. """
 
 import os
-import subprocess
 import io
-from flask import Flask, request, jsonify
+import re
+import atexit
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from google.cloud import storage
 
+from worker_pool import WorkerPool, BlenderJobError
+from job_queue import JobQueue, QueueFull
+from asset_cache import AssetCache
+from frame_shards import plan_chunks, prepare_sequence, read_spec, render_shards, encode_sequence, sequence_dir
+from render_cache import RenderCache, render_key, script_version
+import metrics
+
+# shared engine helpers live one level up, in mvp/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import timing
+
 
 # ---------- CONFIG ----------
 SERVICE_ACCOUNT_FILE = "service_account.json"
@@ -18,39 +36,129 @@ SCOPES = ["https://www.googleapis.com/auth/drive"]
 
 ASSET_DIR = "assets"
 OUTPUT_DIR = "outputs"
-BLENDER_SCRIPT = "scene_builder.py"
 GCS_BUCKET_NAME = "blender-renders-output"
 
+DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "6"))   # parallel Drive downloads
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "2"))       # background GCS uploads
+ANIMATION_SHARDS = int(os.environ.get("ANIMATION_SHARDS", "0"))            # frame chunks per animation; 0 = pool size
+
+TIMINGS_PATH = os.path.join(OUTPUT_DIR, "timings.jsonl")   # one JSON line of stage timings per job
+PROFILE_DIR = os.path.join(OUTPUT_DIR, "profiles")         # cProfile dumps for jobs sent with "cprofile": true
+
 os.makedirs(ASSET_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+# ---------- METRICS ----------
+# Scraped from /metrics; gauges with fn= are read at scrape time
+# finished jobs are counted by JOBS_FINISHED: their records are pruned, so a gauge over them would drop
+JOB_STATES = ("queued", "running", "uploading", "waiting")
+JOBS = metrics.Gauge(
+    "blender_jobs", "Unfinished jobs by status", ("status",),
+    fn=lambda: {(s,): job_queue.status_counts().get(s, 0) for s in JOB_STATES}
+)
+JOBS_FINISHED = metrics.Counter("blender_jobs_finished_total", "Finished jobs by outcome", ("status", "cache"))
+QUEUE_DEPTH = metrics.Gauge("blender_queue_depth", "Jobs waiting for a render slot", fn=lambda: job_queue.depth())
+IN_FLIGHT = metrics.Gauge(
+    "blender_jobs_in_flight", "Jobs running or uploading",
+    fn=lambda: sum(n for s, n in job_queue.status_counts().items() if s in ("running", "uploading"))
+)
+STAGE_SECONDS = metrics.Histogram("blender_stage_seconds", "Job stage latency (see /stats/timings)", ("stage",))
+ASSET_BYTES = metrics.Counter("blender_asset_bytes_total", "Bytes moved to / from cloud storage", ("direction",))
+RENDER_CACHE = metrics.Counter("blender_render_cache_requests_total", "Render cache lookups", ("result",))
+WORKERS = metrics.Gauge(
+    "blender_workers", "Resident Blender workers by state", ("state",),
+    fn=lambda: {(state,): n for state, n in worker_pool.states().items()}
+)
+
+
 # ---------- GOOGLE DRIVE ----------
 credentials = service_account.Credentials.from_service_account_file(
     SERVICE_ACCOUNT_FILE, scopes=SCOPES
 )
-drive_service = build("drive", "v3", credentials=credentials)
+# googleapiclient's http transport is not thread-safe: one client per download thread
+_drive_local = threading.local()
+
+
+def get_drive_service():
+    if not hasattr(_drive_local, "service"):
+        _drive_local.service = build("drive", "v3", credentials=credentials)
+    return _drive_local.service
 
 
 def download_file(file_id, local_path):
     print("Downloading:", file_id)
 
-    request = drive_service.files().get_media(fileId=file_id)
-    fh = io.FileIO(local_path, "wb")
-    downloader = MediaIoBaseDownload(fh, request)
+    request = get_drive_service().files().get_media(fileId=file_id)
+    with io.FileIO(local_path, "wb") as fh:
+        downloader = MediaIoBaseDownload(fh, request)
 
-    done = False
-    while not done:
-        status, done = downloader.next_chunk()
-        if status:
-            print(f"Progress: {int(status.progress() * 100)}%")
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+            if status:
+                print(f"Progress: {int(status.progress() * 100)}%")
 
     if not os.path.exists(local_path) or os.path.getsize(local_path) < 1000:
         raise Exception("Download failed or file corrupted")
 
+    ASSET_BYTES.inc(os.path.getsize(local_path), direction="download")
     print("Downloaded:", local_path)
 
 
+# Drive files are cached under their id + md5, so a re-used model is only fetched once
+asset_cache = AssetCache(ASSET_DIR)
+
+
+def asset_version(file_id):
+    """ content version of a Drive file (md5, else head revision) from one metadata call """
+    meta = get_drive_service().files().get(
+        fileId=file_id, fields="md5Checksum,headRevisionId"
+    ).execute()
+    return meta.get("md5Checksum") or meta.get("headRevisionId") or "latest"
+
+
+def fetch_asset(file_id, filename, version=None):
+    """ return a cached local path for a Drive file, downloading only if its content changed """
+    version = version or asset_version(file_id)
+    ext = os.path.splitext(filename)[1].lower()
+
+    return asset_cache.get(
+        file_id, version, ext,
+        lambda tmp_path: download_file(file_id, tmp_path)
+    )
+
+
+# Shared across jobs, so DOWNLOAD_CONCURRENCY bounds the total load on Drive
+download_pool = ThreadPoolExecutor(DOWNLOAD_CONCURRENCY, thread_name_prefix="download")
+
+
+def asset_versions(assets):
+    """ content versions of all of a job's assets, looked up concurrently """
+    return list(download_pool.map(lambda a: asset_version(a["id"]), assets))
+
+
+def fetch_assets(assets, versions=None):
+    """ fetch all of a job's assets concurrently; returns local paths in request order """
+    versions = versions or [None] * len(assets)
+    futures = [download_pool.submit(fetch_asset, a["id"], a["name"], v) for a, v in zip(assets, versions)]
+
+    local_paths = []
+    error = None
+    for fut in futures:
+        try:
+            local_paths.append(fut.result())
+        except Exception as e:
+            error = error or e
+
+    if error:
+        # unpin whatever did download before failing the job
+        asset_cache.release(local_paths)
+        raise error
+
+    return local_paths
+
+
 # ---------- GCS ----------
 gcs_client = storage.Client.from_service_account_json(SERVICE_ACCOUNT_FILE)
 bucket = gcs_client.bucket(GCS_BUCKET_NAME)
@@ -63,75 +171,314 @@ def upload_to_gcs(local_file_path, remote_filename):
     blob = bucket.blob(remote_filename)
     blob.upload_from_filename(local_file_path)
     blob.make_public()
+    ASSET_BYTES.inc(os.path.getsize(local_file_path), direction="upload")
 
     print("Uploaded:", blob.public_url)
     return blob.public_url
 
 
+# Uploads run here so a render slot can start its next job right away
+upload_pool = ThreadPoolExecutor(UPLOAD_CONCURRENCY, thread_name_prefix="upload")
+
+
+def upload_in_background(local_file_path, remote_filename, record=None):
+    """ returns a Future resolving to the job result once the upload is done.
+    the upload time is booked on `record` (it runs off the job's thread) """
+    def upload():
+        t0 = time.perf_counter()
+        url = upload_to_gcs(local_file_path, remote_filename)
+        if record is not None:
+            record.add("upload", time.perf_counter() - t0)
+        return {"gcs_url": url, "blob": remote_filename}
+
+    return upload_pool.submit(upload)
+
+
+# ---------- RENDER CACHE ----------
+# Results keyed by scene parameters + asset content + builder script versions + render settings
+render_cache = RenderCache(os.path.join(OUTPUT_DIR, "render_cache.sqlite"))
+SCRIPT_VERSION = script_version()
+
+
+def cached_result(key):
+    """ the stored result for `key`, unless its blob has since been removed from the bucket """
+    result = render_cache.lookup(key)
+    if result is None:
+        return None
+    if not bucket.blob(result["blob"]).exists():
+        render_cache.forget(key)
+        return None
+    return result
+
+
+# ---------- TIMINGS ----------
+# Rolling per-stage percentiles for /stats/timings; every record is also appended to TIMINGS_PATH
+timing_stats = timing.Timings()
+
+
+def finish_record(record, error=None):
+    if error is not None:
+        record.error = str(error)
+    data = record.to_dict()
+    timing.write_record(data, TIMINGS_PATH)
+    timing_stats.add(data)
+
+    JOBS_FINISHED.inc(status="error" if error else "success", cache=data.get("cache", "none"))
+    for name, seconds in data["stages"].items():
+        STAGE_SECONDS.observe(seconds, stage=name)
+    STAGE_SECONDS.observe(data["total"], stage="total")
+
+
+# ---------- BLENDER WORKERS ----------
+# Resident Blender processes (size: BLENDER_POOL_SIZE); booted once, reused for every job
+worker_pool = WorkerPool()
+atexit.register(worker_pool.shutdown)
+
+
+# ---------- JOB PIPELINE ----------
+def job_dir(job_id):
+    """ per-job work dir for animation frames; a retry with the same job id finds its frames here """
+    return os.path.join(OUTPUT_DIR, "jobs", job_id)
+
+
+def render_animation(local_paths, output_name, data):
+    """ split the frames still missing from the job's sequence across the resident workers, render them
+    in parallel as PNG sequences (scene_builder_2.build_scene), then encode everything into one MP4.
+    returns the local MP4 path """
+    frame_start = int(data.get("frame_start", 1))
+    frame_end = int(data.get("frame_end", 10))
+    fps = int(data.get("fps", 24))
+    profile, time_budget = data.get("profile"), data.get("time_budget")
+
+    output_local_path = os.path.join(job_dir(data["job_id"]), output_name + ".mp4")
+    output_file = os.path.relpath(output_local_path, OUTPUT_DIR)  # workers write relative to OUTPUT_DIR
+
+    # frames from an earlier attempt are only reused if they were rendered from the same inputs
+    spec = {
+        "assets": [os.path.basename(p) for p in local_paths],  # cache names carry the content version
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "profile": profile,
+        "time_budget": time_budget,
+    }
+    directory = sequence_dir(output_local_path)
+
+    # a time budget is turned into one sample count for the whole job (every shard renders with it, so noise
+    # doesn't change at shard boundaries); a resumed job keeps the count its first frames were rendered with
+    record = timing.current()
+    samples = None
+    if time_budget:
+        previous = read_spec(directory)
+        if previous is not None and dict(previous, samples=None) == dict(spec, samples=None):
+            samples = previous.get("samples")
+        if samples is None:
+            with timing.stage("calibrate"):
+                result = worker_pool.run_job(local_paths, output_file, (frame_start, frame_end), profile,
+                                             time_budget, calibrate=True)
+            samples = result["samples"]
+            print(f"Calibrated {output_name}: {samples} samples for {time_budget}s/frame")
+    spec["samples"] = samples
+    prepare_sequence(directory, spec)
+
+    shards = ANIMATION_SHARDS or len(worker_pool.workers)
+    chunks = plan_chunks(directory, frame_start, frame_end, shards)
+    todo = sum(end - start + 1 for start, end in chunks)
+    print(f"Rendering {output_name}: {todo} of frames {frame_start}-{frame_end} left, {len(chunks)} shards")
+
+    def render_chunk(start, end):
+        cprofile = os.path.join(PROFILE_DIR, f"{data['job_id']}_{start}.prof") if data.get("cprofile") else None
+        return worker_pool.run_job(local_paths, output_file, (start, end), profile, time_budget, cprofile, samples)
+
+    if chunks:
+        with timing.stage("render"):
+            results = render_shards(render_chunk, chunks, len(chunks))
+        # worker stages are summed over shards (Blender time, not wall time)
+        for result in results:
+            record.merge(result.get("timings"), prefix="blender.")
+
+    # -------- ENCODE (last, so an interrupted job never loses rendered frames) --------
+    with timing.stage("encode"):
+        return encode_sequence(directory, frame_start, frame_end, fps, output_local_path)
+
+
+def render_job(data, versions, key):
+    """ download -> render -> upload on a cache miss; returns the upload Future """
+    assets = data["assets"]
+    output_name = data.get("output_name", "render")
+    animation = bool(data.get("animation"))
+
+    # outputs are named by content, so a cached URL is never overwritten by a different render
+    output_base = f"{output_name}_{key[:12]}"
+    output_local_path = os.path.join(OUTPUT_DIR, output_base + ".png")
+
+    record = timing.current()
+
+    # -------- DOWNLOAD --------
+    with timing.stage("download"):
+        local_paths = fetch_assets(assets, versions)
+    record.fields["asset_bytes"] = sum(os.path.getsize(p) for p in local_paths)
+    try:
+        # -------- RUN BLENDER --------
+        # Runs scene_builder(_2).build_scene() on idle resident workers
+        print("Rendering:", output_name, "assets:", local_paths)
+        try:
+            if animation:
+                output_local_path = render_animation(local_paths, output_base, data)
+            else:
+                cprofile = os.path.join(PROFILE_DIR, data["job_id"] + ".prof") if data.get("cprofile") else None
+                with timing.stage("render"):
+                    result = worker_pool.run_job(local_paths, output_base + ".png", profile=data.get("profile"),
+                                                 time_budget=data.get("time_budget"), cprofile=cprofile)
+                record.merge(result.get("timings"), prefix="blender.")
+                for field in ("rss_before_mb", "rss_after_mb", "worker_peak_rss_mb"):
+                    record.fields["blender_" + field] = result.get(field)
+        except BlenderJobError as e:
+            raise Exception(f"Blender execution failed: {e}")
+    finally:
+        asset_cache.release(local_paths)
+
+    # -------- UPLOAD --------
+    upload = upload_in_background(output_local_path, output_base + os.path.splitext(output_local_path)[1], record)
+    if animation:
+        # frames are only dropped once the video is safely in GCS
+        work_dir = job_dir(data["job_id"])
+        upload.add_done_callback(
+            lambda f: f.exception() is None and shutil.rmtree(work_dir, ignore_errors=True)
+        )
+    return upload
+
+
+def process_job(data):
+    """ one job on a render slot thread: cache lookup, else download -> render -> upload.
+    returns the result directly on a cache hit, otherwise a Future the job completes with.
+    jobs with "animation": true render frame_start..frame_end to an MP4 instead of a still.
+    "profile" (preview / draft / final) and "time_budget" (seconds per frame) set the render quality.
+    per-stage timings of every job are appended to TIMINGS_PATH once it finishes """
+    with timing.job(data["job_id"], animation=bool(data.get("animation")), profile=data.get("profile")) as record:
+        try:
+            result = run_pipeline(data, record)
+        except Exception as e:
+            finish_record(record, e)
+            raise
+
+    if isinstance(result, Future):
+        result.add_done_callback(lambda f: finish_record(record, f.exception()))
+    else:
+        finish_record(record)
+    return result
+
+
+def follow(future, job_status):
+    """ a Future completing with `future`, shown in the job queue as `job_status` until then """
+    follower = Future()
+    follower.job_status = job_status
+
+    def done(f):
+        if f.exception() is not None:
+            follower.set_exception(f.exception())
+        else:
+            follower.set_result(f.result())
+
+    future.add_done_callback(done)
+    return follower
+
+
+def run_pipeline(data, record):
+    # -------- CACHE --------
+    with timing.stage("cache_lookup"):
+        versions = asset_versions(data["assets"])
+        key = render_key(data, versions, SCRIPT_VERSION)
+
+    # identical jobs already rendering: wait for that render instead of starting another
+    future, owner = render_cache.claim(key)
+    if not owner:
+        print("Joining in-flight render:", key[:12])
+        record.fields["cache"] = "coalesced"
+        RENDER_CACHE.inc(result="coalesced")
+        return follow(future, "waiting")
+
+    try:
+        hit = cached_result(key)
+        if hit is not None:
+            print("Render cache hit:", key[:12])
+            record.fields["cache"] = "hit"
+            RENDER_CACHE.inc(result="hit")
+            render_cache.finish(key, hit)
+            return dict(hit, cached=True)
+
+        record.fields["cache"] = "miss"
+        RENDER_CACHE.inc(result="miss")
+        upload = render_job(data, versions, key)
+    except Exception as e:
+        render_cache.finish(key, error=e)
+        raise
+
+    upload.add_done_callback(
+        lambda f: render_cache.finish(key, None if f.exception() else f.result(), f.exception())
+    )
+    return future
+
+
+# Bounded queue drained by RENDER_SLOTS scheduler threads
+job_queue = JobQueue(process_job)
+
+
 # ---------- FLASK ----------
 app = Flask(__name__)
 
 
 @app.route("/run-job", methods=["POST"])
 def run_job():
+    data = request.get_json(silent=True) or {}
+
+    if not data.get("assets"):
+        return jsonify({"error": "No assets provided"}), 400
+
+    # a caller-chosen job_id makes retries idempotent: a failed or interrupted
+    # animation with the same id resumes from the frames it already rendered
+    job_id = data.get("job_id")
+    if job_id is not None and not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", str(job_id)):
+        return jsonify({"error": "Invalid job_id"}), 400
+
     try:
-        data = request.get_json()
-        assets = data.get("assets", [])
-        output_name = data.get("output_name", "render")
+        job_id = job_queue.submit(data, job_id)
+    except QueueFull as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
 
-        if not assets:
-            return jsonify({"error": "No assets provided"}), 400
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}"
+    }), 202
 
-        # -------- DOWNLOAD --------
-        local_paths = []
-        for asset in assets:
-            filename = asset["name"]
-            file_id = asset["id"]
-            local_path = os.path.join(ASSET_DIR, filename)
-            download_file(file_id, local_path)
-            local_paths.append(local_path)
 
-        # Convert list -> comma string (IMPORTANT)
-        asset_arg = ",".join(local_paths)
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """ Prometheus text exposition format """
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
-        # -------- RUN BLENDER --------
-        cmd = [
-            "xvfb-run",
-            "-s", "-screen 0 1024x768x24",
-            "blender",
-            "-b",
-            "-noaudio",
-            "-P", BLENDER_SCRIPT,
-            "--",
-            asset_arg,
-            output_name + ".png"
-        ]
-
-        print("Running:", " ".join(cmd))
-        subprocess.run(cmd, check=True)
-
-        # -------- UPLOAD --------
-        output_local_path = os.path.join(OUTPUT_DIR, output_name + ".png")
-        public_url = upload_to_gcs(output_local_path, output_name + ".png")
 
-        return jsonify({
-            "status": "success",
-            "gcs_url": public_url
-        })
+@app.route("/stats/timings", methods=["GET"])
+def stats_timings():
+    """ per-stage count / mean / p50 / p90 / p99 seconds over the last 1000 jobs """
+    return jsonify(timing_stats.summary())
 
-    except subprocess.CalledProcessError as e:
-        return jsonify({
-            "status": "error",
-            "message": "Blender execution failed",
-            "details": str(e)
-        }), 500
 
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+
+    return jsonify(job)
 
 
 if __name__ == "__main__":
+    # boot the workers before taking requests; under another server (e.g. gunicorn importing `app`), the first
+    # job starts the scheduler threads (JobQueue.submit) and the workers (WorkerPool.run_job)
+    worker_pool.start()
+    job_queue.start()
     app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -0,0 +1,83 @@
+# blender_worker.py
+""" resident Blender worker: stays loaded and renders jobs sent by worker_pool.py over a local socket """
+
+import sys
+import os
+import traceback
+from multiprocessing.connection import Listener
+
+# Blender does not put the -P script's folder on sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scene_builder
+import scene_builder_2
+import timing
+
+
+# ---------------- Parse Args ----------------
+# Usage: blender -b -noaudio -P blender_worker.py -- <port>
+# The auth key is passed through BLENDER_WORKER_AUTHKEY so it does not show up in `ps`.
+args = sys.argv
+sep = args.index("--")
+
+port = int(args[sep + 1])
+authkey = os.environ["BLENDER_WORKER_AUTHKEY"].encode()
+
+
+# ---------------- Job Loop ----------------
+def handle(job):
+    # build_scene() starts with read_factory_settings, so nothing from
+    # the previous job survives into this one
+    profile, time_budget = job.get("profile"), job.get("time_budget")
+
+    # stage timings come back to the runner with the result; "cprofile" names a .prof file
+    # to capture the whole build with cProfile
+    samples = None
+    with timing.job() as record, timing.profiled(job.get("cprofile")):
+        if job.get("calibrate"):
+            # sample count for a time-budgeted animation, measured once for all of its shards
+            samples = scene_builder_2.build_scene(job["assets"], job["output"], job["frames"], profile, time_budget,
+                                                  calibrate=True)
+        elif job.get("frames"):
+            # one shard of an animation (see frame_shards.py)
+            samples = scene_builder_2.build_scene(job["assets"], job["output"], job["frames"], profile, time_budget,
+                                                  job.get("samples"))
+        else:
+            scene_builder.build_scene(job["assets"], job["output"], profile, time_budget)
+
+    memory = record.to_dict()
+    return {
+        "status": "success",
+        "output": job["output"],
+        "samples": samples,
+        "timings": record.stages,
+        # this job's memory is the change in resident size; the peak covers every job this worker has run
+        "rss_before_mb": memory["rss_before_mb"],
+        "rss_after_mb": memory["rss_after_mb"],
+        "worker_peak_rss_mb": memory["process_peak_rss_mb"],
+    }
+
+
+with Listener(("127.0.0.1", port), authkey=authkey) as listener:
+    print("Blender worker ready on port", port)
+
+    # one pool connection per worker; if it drops, the pool restarts us
+    with listener.accept() as conn:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+
+            if job is None:  # shutdown request
+                break
+
+            try:
+                result = handle(job)
+            except Exception as e:
+                traceback.print_exc()
+                result = {"status": "error", "message": str(e)}
+
+            conn.send(result)
+
+print("Blender worker exiting")
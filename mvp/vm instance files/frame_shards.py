@@ -0,0 +1,184 @@
+# frame_shards.py
+""" sharded animation renders: split frame_start..frame_end into chunks, render each chunk to a PNG sequence in
+its own Blender process (resident pool workers, fresh `blender -b` processes, or other VMs sharing the
+output dir), then encode the joined sequence to one video with ffmpeg.
+finished frames are tracked in the sequence's frame manifest, so re-running the same output only renders
+what an interrupted run left missing. """
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# frame manifest helpers are shared with the Blender side, one level up in mvp/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_manifest import frame_runs, missing_frames
+
+
+# ---------- CONFIG ----------
+BLENDER_BIN = os.environ.get("BLENDER_BIN", "blender")
+FFMPEG_BIN = os.environ.get("FFMPEG_BIN", "ffmpeg")
+MIN_SHARD_FRAMES = 5      # smaller chunks spend more time loading the scene than rendering it
+SEQUENCE_PATTERN = "frame_%04d.png"  # what frame_range.render_sequence() writes
+SPEC_NAME = "sequence.json"          # what the frames in a sequence dir were rendered for
+
+
+def split_frames(frame_start, frame_end, shards, min_frames=MIN_SHARD_FRAMES):
+    """ contiguous inclusive (start, end) chunks covering frame_start..frame_end, at most `shards` of them """
+    total = frame_end - frame_start + 1
+    if total <= 0:
+        raise Exception(f"Empty frame range: {frame_start}-{frame_end}")
+
+    shards = max(1, min(shards, total // max(min_frames, 1) or 1))
+    size, extra = divmod(total, shards)
+
+    chunks = []
+    start = frame_start
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0) - 1
+        chunks.append((start, end))
+        start = end + 1
+    return chunks
+
+
+def plan_chunks(directory, frame_start, frame_end, shards, min_frames=MIN_SHARD_FRAMES):
+    """ chunks covering only the frames still missing from `directory`; [] when the sequence is complete.
+    shards are shared out between the missing runs by their length """
+    missing = missing_frames(directory, frame_start, frame_end)
+    if not missing:
+        return []
+
+    chunks = []
+    for start, end in frame_runs(missing):
+        share = round(shards * (end - start + 1) / len(missing))
+        chunks += split_frames(start, end, max(1, share), min_frames)
+    return chunks
+
+
+def sequence_dir(output_path):
+    """ outputs/clip.mp4 -> outputs/clip_frames """
+    return os.path.splitext(output_path)[0] + "_frames"
+
+
+def read_spec(directory):
+    """ the spec the frames in `directory` were rendered for, or None """
+    spec_path = os.path.join(directory, SPEC_NAME)
+    if not os.path.exists(spec_path):
+        return None
+    with open(spec_path) as f:
+        return json.load(f)
+
+
+def prepare_sequence(directory, spec):
+    """ make `directory` ready to (re)render the sequence described by `spec` (any JSON-able dict).
+    frames left by an earlier run of the same spec are kept for resuming; anything else is cleared """
+    spec_path = os.path.join(directory, SPEC_NAME)
+    previous = read_spec(directory)
+    if previous is not None:
+        if previous == spec:
+            return directory
+        print("Sequence settings changed, discarding old frames:", directory)
+        shutil.rmtree(directory)
+
+    os.makedirs(directory, exist_ok=True)
+    with open(spec_path, "w") as f:
+        json.dump(spec, f)
+    return directory
+
+
+def encode_sequence(directory, frame_start, frame_end, fps, output_path):
+    """ encode directory/frame_####.png (frame_start..frame_end) into an H.264 MP4 """
+    missing = missing_frames(directory, frame_start, frame_end)
+    if missing:
+        raise Exception(f"{len(missing)} frames missing from {directory} (first: {missing[0]})")
+
+    cmd = [
+        FFMPEG_BIN, "-y", "-loglevel", "error",
+        "-framerate", str(fps),
+        "-start_number", str(frame_start),
+        "-i", os.path.join(directory, SEQUENCE_PATTERN),
+        "-frames:v", str(frame_end - frame_start + 1),
+        "-c:v", "libx264",
+        "-pix_fmt", "yuv420p",
+        "-crf", "18",
+        output_path,
+    ]
+    print("Encoding:", " ".join(cmd))
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg failed: {result.stderr.strip()}")
+    return output_path
+
+
+def render_shards(render_chunk, chunks, concurrency):
+    """ run render_chunk(start, end) for every chunk, `concurrency` at a time, and return their results in
+    chunk order; raises the first failure after all chunks have finished, so a retry only has to redo
+    the failed ones """
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="shard") as pool:
+        futures = [pool.submit(render_chunk, start, end) for start, end in chunks]
+
+    results = []
+    error = None
+    for (start, end), fut in zip(chunks, futures):
+        try:
+            results.append(fut.result())
+        except Exception as e:
+            print(f"Shard {start}-{end} failed: {e}")
+            error = error or e
+    if error:
+        raise error
+    return results
+
+
+# ---------- STANDALONE SCRIPTS ----------
+def blender_shard(script, frame_start, frame_end, directory, threads=0, profile=None):
+    """ one `blender -b -P script -- --frames S E --sequence DIR` process (scripts use frame_range.render_animation) """
+    cmd = [
+        BLENDER_BIN, "-b", "-noaudio",
+        "-t", str(threads),  # 0 = all cores; shards split them instead of oversubscribing
+        "-P", script,
+        "--",
+        "--frames", str(frame_start), str(frame_end),
+        "--sequence", directory,
+    ]
+    if profile:
+        cmd += ["--profile", profile]
+    print("Running:", " ".join(cmd))
+
+    result = subprocess.run(cmd)
+    if result.returncode != 0:
+        raise Exception(f"Blender exited with {result.returncode} on frames {frame_start}-{frame_end}")
+
+
+def render_script(script, frame_start, frame_end, output_path, shards, fps=30, profile=None):
+    """ render a step script's animation in `shards` parallel Blender processes, then encode it.
+    re-running after a crash picks up where the last run stopped """
+    directory = prepare_sequence(sequence_dir(output_path), {
+        "script": os.path.abspath(script), "frame_start": frame_start, "frame_end": frame_end,
+        "profile": profile,
+    })
+
+    chunks = plan_chunks(directory, frame_start, frame_end, shards)
+    if chunks:
+        threads = max(1, (os.cpu_count() or 1) // len(chunks))
+        render_shards(
+            lambda start, end: blender_shard(script, start, end, directory, threads, profile),
+            chunks, len(chunks)
+        )
+    return encode_sequence(directory, frame_start, frame_end, fps, output_path)
+
+
+if __name__ == "__main__":
+    # Usage: python frame_shards.py <script.py> <frame_start> <frame_end> <output.mp4> [shards] [fps] [profile]
+    # e.g.   python frame_shards.py ../../blender/step5_cinematic.py 1 200 outputs/step5.mp4 8 30 preview
+    args = sys.argv[1:]
+    if len(args) < 4:
+        sys.exit("Usage: frame_shards.py <script.py> <frame_start> <frame_end> <output.mp4> [shards] [fps] [profile]")
+
+    shards = int(args[4]) if len(args) > 4 else max(1, (os.cpu_count() or 1) // 4)
+    fps = int(args[5]) if len(args) > 5 else 30
+    profile = args[6] if len(args) > 6 else None
+    print("Done:", render_script(args[0], int(args[1]), int(args[2]), args[3], shards, fps, profile))
@@ -0,0 +1,130 @@
+# job_queue.py
+""" bounded in-process job queue: /run-job enqueues and returns an id, scheduler threads drain it onto render slots """
+
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+
+
+# ---------- CONFIG ----------
+RENDER_SLOTS = int(os.environ.get("RENDER_SLOTS", os.environ.get("BLENDER_POOL_SIZE", "2")))
+MAX_QUEUED_JOBS = int(os.environ.get("MAX_QUEUED_JOBS", "100"))
+MAX_FINISHED_JOBS = 1000  # finished job records kept for /jobs/<id>
+
+
+class QueueFull(Exception):
+    """ raised by submit() when MAX_QUEUED_JOBS are already waiting """
+
+
+class JobQueue:
+    """ runs handler(payload) for each submitted job on `slots` scheduler threads; the payload the handler
+    sees carries its "job_id". a handler may return a Future to hand off its tail (e.g. the upload) and
+    free the slot early; the job shows as "uploading" meanwhile, or as the Future's `job_status` if it has one """
+
+    def __init__(self, handler, slots=RENDER_SLOTS, max_queued=MAX_QUEUED_JOBS):
+        self.handler = handler
+        self.slots = slots
+        self.pending = queue.Queue(maxsize=max_queued)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def start(self):
+        """ start the scheduler threads; submit() does it on first use, so the queue works under any server
+        (not just `python blender_runner.py`). starting twice is a no-op """
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.slots):
+                t = threading.Thread(target=self._scheduler, name=f"render-slot-{i}", daemon=True)
+                t.start()
+                self.threads.append(t)
+
+    def submit(self, payload, job_id=None):
+        """ queue a job and return its id. re-submitting a caller-chosen job_id that is still queued,
+        running or done returns it unchanged; one that failed is queued again (and can resume its work) """
+        self.start()
+        job_id = job_id or uuid.uuid4().hex
+        record = {
+            "job_id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+
+        with self.lock:
+            previous = self.jobs.get(job_id)
+            if previous is not None and previous["status"] != "error":
+                return job_id
+            self.jobs[job_id] = record
+        try:
+            self.pending.put_nowait((job_id, dict(payload, job_id=job_id)))
+        except queue.Full:
+            with self.lock:
+                if previous is None:
+                    del self.jobs[job_id]
+                else:
+                    self.jobs[job_id] = previous
+            raise QueueFull(f"Job queue is full ({self.pending.maxsize} waiting)")
+
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            record = self.jobs.get(job_id)
+            return dict(record) if record else None
+
+    def depth(self):
+        return self.pending.qsize()
+
+    def status_counts(self):
+        """ number of known job records per status """
+        with self.lock:
+            return dict(Counter(r["status"] for r in self.jobs.values()))
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _prune(self):
+        # drop the oldest finished records; queued/running ones are always kept
+        with self.lock:
+            finished = [jid for jid, r in self.jobs.items() if r["status"] in ("success", "error")]
+            for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self.jobs[jid]
+
+    def _finish(self, job_id, result=None, error=None):
+        if error is None:
+            self._update(job_id, status="success", result=result, finished_at=time.time())
+        else:
+            self._update(job_id, status="error", error=str(error), finished_at=time.time())
+        self._prune()
+
+    def _finish_future(self, job_id, future):
+        error = future.exception()
+        self._finish(job_id, result=None if error else future.result(), error=error)
+
+    def _scheduler(self):
+        while True:
+            job_id, payload = self.pending.get()
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                result = self.handler(payload)
+                if isinstance(result, Future):
+                    self._update(job_id, status=getattr(result, "job_status", "uploading"))
+                    result.add_done_callback(lambda f, job_id=job_id: self._finish_future(job_id, f))
+                else:
+                    self._finish(job_id, result=result)
+            except Exception as e:
+                traceback.print_exc()
+                self._finish(job_id, error=e)
+            finally:
+                self.pending.task_done()
@@ -0,0 +1,111 @@
+# render_cache.py
+""" render result cache: a job's output is keyed by a canonical hash of everything that decides its pixels
+(scene parameters, asset content versions, builder script versions, render settings). a hit skips Blender
+entirely, and identical jobs arriving while one is rendering wait for it instead of rendering again. """
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+
+# ---------- CONFIG ----------
+# fields of a /run-job payload that do not change the rendered output
+IGNORED_FIELDS = ("job_id", "output_name", "cprofile")
+
+# everything the resident workers run; editing any of them invalidates old results
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_FILES = [
+    os.path.join(HERE, "blender_worker.py"),
+    os.path.join(HERE, "scene_builder.py"),
+    os.path.join(HERE, "scene_builder_2.py"),
+    os.path.join(HERE, "..", "asset_import.py"),
+    os.path.join(HERE, "..", "asset_library.py"),
+    os.path.join(HERE, "..", "bbox.py"),
+    os.path.join(HERE, "..", "frame_manifest.py"),
+    os.path.join(HERE, "..", "frame_range.py"),
+    os.path.join(HERE, "..", "render_profiles.py"),
+]
+
+
+def script_version(paths=SCRIPT_FILES):
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def canonical(value):
+    """ stable JSON text: sorted keys, no whitespace, so equal payloads hash equally """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def render_key(payload, asset_versions, version):
+    """ cache key of a job: payload minus IGNORED_FIELDS, with each asset reduced to id + content version
+    (file names don't matter, content does) """
+    scene = {k: v for k, v in payload.items() if k not in IGNORED_FIELDS and k != "assets"}
+    spec = {
+        "scene": scene,
+        "assets": [[a["id"], v] for a, v in zip(payload["assets"], asset_versions)],
+        "script_version": version,
+    }
+    return hashlib.sha256(canonical(spec).encode()).hexdigest()
+
+
+class RenderCache:
+    """ key -> result dict in SQLite, plus the Futures of renders currently in flight """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS renders (key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL)"
+        )
+        self.lock = threading.Lock()
+        self.inflight = {}
+
+    def lookup(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT result FROM renders WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, key, result):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO renders VALUES (?, ?, ?)", (key, canonical(result), time.time())
+            )
+
+    def forget(self, key):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM renders WHERE key = ?", (key,))
+
+    def claim(self, key):
+        """ (future, owner). the first caller for a key owns the render and must finish() it;
+        later callers get the same future and just wait on it """
+        with self.lock:
+            if key in self.inflight:
+                return self.inflight[key], False
+            future = Future()
+            self.inflight[key] = future
+            return future, True
+
+    def finish(self, key, result=None, error=None):
+        """ resolve the in-flight render; successful results are stored for later hits. a failed store only
+        loses the cache entry: waiting jobs still get the result """
+        try:
+            if error is None:
+                try:
+                    self.store(key, result)
+                except Exception as e:
+                    print("Render cache store failed:", key[:12], e)
+        finally:
+            with self.lock:
+                future = self.inflight.pop(key)
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
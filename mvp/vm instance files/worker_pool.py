@@ -0,0 +1,270 @@
+# worker_pool.py
+""" pool of long-lived Blender processes (blender_worker.py) so jobs skip Blender + Xvfb startup """
+
+import os
+import queue
+import secrets
+import socket
+import subprocess
+import threading
+import time
+from multiprocessing.connection import Client
+
+import metrics
+
+
+# ---------- CONFIG ----------
+POOL_SIZE = int(os.environ.get("BLENDER_POOL_SIZE", "2"))
+WORKER_SCRIPT = "blender_worker.py"
+STARTUP_TIMEOUT = 120    # seconds to wait for a worker to open its socket
+JOB_TIMEOUT = 60 * 60    # seconds before a stuck render is killed
+WORKER_THREADS = int(os.environ.get("BLENDER_WORKER_THREADS", "0"))  # render threads per worker; 0 = cores / pool
+RESTART_BACKOFF = (1, 60)  # seconds between attempts to bring a failed worker back: first, max (doubling)
+
+
+WORKER_EXITS = metrics.Counter(
+    "blender_worker_exits_total", "Blender worker process exits by exit code ('timeout' = killed on JOB_TIMEOUT)",
+    ("code",)
+)
+WORKER_JOBS = metrics.Counter("blender_worker_jobs_total", "Jobs run on Blender workers by outcome", ("status",))
+WORKER_BUSY_SECONDS = metrics.Counter("blender_worker_busy_seconds_total", "Seconds workers spent running jobs")
+
+
+class BlenderJobError(Exception):
+    """ raised when a worker reports a failed job or dies while running one """
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BlenderWorker:
+    """ one resident `blender -b -P blender_worker.py` process and its connection """
+
+    def __init__(self, index, threads=0):
+        self.index = index
+        self.threads = threads
+        self.proc = None
+        self.conn = None
+        self.failures = 0     # failed starts in a row
+        self.retry_at = 0.0   # no start attempt before this time (backoff after failed starts)
+        self.restarting = False
+
+    def start(self):
+        try:
+            self._start()
+        except Exception:
+            self.failures += 1
+            first, most = RESTART_BACKOFF
+            self.retry_at = time.time() + min(first * 2 ** (self.failures - 1), most)
+            raise
+        self.failures = 0
+
+    def _start(self):
+        port = _free_port()
+        authkey = secrets.token_hex(16)
+
+        cmd = [
+            "xvfb-run",
+            "-a",  # each worker gets its own X display
+            "-s", "-screen 0 1024x768x24",
+            "blender",
+            "-b",
+            "-noaudio",
+            "-t", str(self.threads),  # the pool's workers split the cores instead of each taking all of them
+            "-P", WORKER_SCRIPT,
+            "--",
+            str(port)
+        ]
+
+        print(f"Starting worker {self.index}:", " ".join(cmd))
+        env = dict(os.environ, BLENDER_WORKER_AUTHKEY=authkey)
+        try:
+            self.proc = subprocess.Popen(cmd, env=env)
+        except OSError as e:
+            raise BlenderJobError(f"Worker {self.index} could not be started: {e}")
+
+        # Blender takes a few seconds to boot before the socket is open
+        deadline = time.time() + STARTUP_TIMEOUT
+        while True:
+            if self.proc.poll() is not None:
+                code, self.proc = self.proc.returncode, None
+                WORKER_EXITS.inc(code=code)
+                raise BlenderJobError(f"Worker {self.index} exited during startup ({code})")
+            try:
+                self.conn = Client(("127.0.0.1", port), authkey=authkey.encode())
+                break
+            except ConnectionRefusedError:
+                if time.time() > deadline:
+                    self.stop()
+                    raise BlenderJobError(f"Worker {self.index} did not start in {STARTUP_TIMEOUT}s")
+                time.sleep(0.5)
+
+        print(f"Worker {self.index} ready")
+
+    def stop(self):
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+                self.conn.close()
+            except OSError:
+                pass
+            self.conn = None
+
+        if self.proc is not None:
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+            WORKER_EXITS.inc(code=self.proc.returncode)
+        self.proc = None
+
+    def restart(self, reason=None):
+        self.restarting = True
+        try:
+            self._restart(reason)
+        finally:
+            self.restarting = False
+
+    def _restart(self, reason):
+        if self.conn is not None:
+            self.conn.close()
+        if self.proc is not None:
+            if reason is None:
+                try:
+                    self.proc.wait(timeout=5)  # crashed: collect its exit code
+                except subprocess.TimeoutExpired:
+                    reason = "hung"
+            if self.proc.poll() is None:
+                self.proc.kill()
+                self.proc.wait()
+            WORKER_EXITS.inc(code=reason or self.proc.returncode)
+        self.conn = None
+        self.proc = None
+        try:
+            self.start()
+        except BlenderJobError as e:
+            # stays down (conn is None) until the pool revives it
+            print(f"Worker {self.index} restart failed: {e}")
+
+    def run(self, job):
+        if self.conn is None:
+            raise BlenderJobError(f"Worker {self.index} is not running")
+        t0 = time.time()
+        try:
+            self.conn.send(job)
+            if not self.conn.poll(JOB_TIMEOUT):
+                self.restart("timeout")
+                raise BlenderJobError(f"Job timed out after {JOB_TIMEOUT}s")
+            result = self.conn.recv()
+        except (EOFError, OSError) as e:
+            # worker crashed mid-job; bring up a fresh one for the next job
+            WORKER_JOBS.inc(status="crashed")
+            self.restart()
+            raise BlenderJobError(f"Worker {self.index} died: {e}")
+        except BlenderJobError:
+            WORKER_JOBS.inc(status="timeout")
+            raise
+        finally:
+            WORKER_BUSY_SECONDS.inc(time.time() - t0)
+
+        if result.get("status") != "success":
+            WORKER_JOBS.inc(status="error")
+            raise BlenderJobError(result.get("message", "Blender job failed"))
+
+        WORKER_JOBS.inc(status="success")
+        return result
+
+
+class WorkerPool:
+    """ hands each job to the next idle worker; blocks while all workers are busy """
+
+    def __init__(self, size=POOL_SIZE):
+        threads = WORKER_THREADS or max(1, (os.cpu_count() or 1) // size)
+        self.workers = [BlenderWorker(i, threads) for i in range(size)]
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = False
+        self.generation = 0   # bumped on shutdown, so revivals from before it give up
+        self.down = set()     # workers out of the pool while _revive retries starting them
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+            for worker in self.workers:
+                try:
+                    worker.start()
+                except BlenderJobError as e:
+                    print(f"Worker {worker.index} failed to start: {e}")
+                    self._revive(worker)
+                    continue
+                self.idle.put(worker)
+
+    def _revive(self, worker):
+        """ keep a worker that is down out of the pool and retry starting it, with backoff, in the background;
+        it rejoins the idle workers once it is up """
+        generation = self.generation
+        self.down.add(worker)
+
+        def retry():
+            while True:
+                time.sleep(max(worker.retry_at - time.time(), 0))
+                if not self.started or self.generation != generation:
+                    return
+                try:
+                    worker.start()
+                except BlenderJobError as e:
+                    print(f"Worker {worker.index} still down: {e}")
+                    continue
+                self.down.discard(worker)
+                self.idle.put(worker)
+                return
+
+        threading.Thread(target=retry, name=f"revive-worker-{worker.index}", daemon=True).start()
+
+    def shutdown(self):
+        with self.lock:
+            for worker in self.workers:
+                worker.stop()
+            self.idle = queue.Queue()
+            self.down = set()
+            self.started = False
+            self.generation += 1
+
+    def states(self):
+        """ worker count by state: idle, busy (running a job), down (restarting after a crash / timeout, or
+        backing off between attempts to start it) """
+        if not self.started:
+            return {"idle": len(self.workers), "busy": 0, "down": 0}
+        down = len(self.down | {worker for worker in self.workers if worker.restarting})
+        idle = self.idle.qsize()
+        return {"idle": idle, "busy": max(len(self.workers) - idle - down, 0), "down": down}
+
+    def run_job(self, assets, output_file, frames=None, profile=None, time_budget=None, cprofile=None,
+                samples=None, calibrate=False):
+        """ frames=(start, end) renders that range of the animation as a PNG sequence.
+        profile / time_budget select the render quality (render_profiles.py); an explicit `samples` overrides
+        both. calibrate=True only builds the animation's scene and returns the time budget's sample count
+        in the result's "samples", for every shard of the job to render with.
+        cprofile: path of a .prof file to capture the Blender-side build in.
+        the result carries the worker's per-stage "timings" """
+        self.start()
+        job = {"assets": assets, "output": output_file, "profile": profile, "time_budget": time_budget,
+               "cprofile": cprofile, "samples": samples, "calibrate": calibrate}
+        if frames is not None:
+            job["frames"] = list(frames)
+
+        worker = self.idle.get()
+        try:
+            return worker.run(job)
+        finally:
+            if worker.conn is None:
+                # a restart after a crash / timeout failed: out of the pool until it is back up
+                self._revive(worker)
+            else:
+                self.idle.put(worker)